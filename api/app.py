@@ -1,16 +1,46 @@
-from flask import Flask, jsonify, request
+from flask import Flask, Response, jsonify, request
 from flask_cors import CORS
 from minio.error import S3Error
+import json
 import os
+import time
 
 from config import (
     ORIGINAL_BUCKET,
-    MAX_FILE_SIZE_MB
+    MAX_FILE_SIZE_MB,
+    USE_EXTERNAL_SEPARATOR,
+    PRELOAD_SEPARATION_MODEL,
+    JOB_EXECUTOR,
+    SEPARATION_BATCH_SIZE,
+    ALLOWED_SEPARATION_PROFILES,
+    DEFAULT_SEPARATION_PROFILE,
+    JOB_EVENTS_MAX_SECONDS,
+    JOB_EVENTS_KEEPALIVE_SECONDS,
+    JOB_LONG_POLL_MAX_SECONDS,
+    JOB_WAITERS_RETRY_SECONDS,
+    ALLOWED_JOB_PRIORITIES
 )
-from validators import validate_uploaded_file
+from validators import validate_uploaded_file, probe_uploaded_audio
 from services import save_uploaded_file
 from storage import setup_storage
-from job_queue import init_queue, create_job, get_job_status
+from job_queue import (
+    init_queue,
+    check_admission,
+    create_job,
+    create_completed_job,
+    attach_to_inflight_job,
+    get_job_status,
+    wait_for_job_status,
+    acquire_waiter_slot,
+    release_waiter_slot,
+    touch_job,
+    cancel_job,
+    FINAL_STATUSES
+)
+from result_cache import compute_content_hash, lookup_cached_result
+from model_registry import preload_model
+from job_scheduler import DEFAULT_PRIORITY
+from metrics import track_stages, stage, render as render_metrics
 
 app = Flask(__name__)
 CORS(app)
@@ -18,11 +48,33 @@ CORS(app)
 # Flask 설정
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE_MB * 1024 * 1024
 
-# MinIO 클라이언트 초기화 (버킷 설정 포함)
-minio_client = setup_storage()
+minio_client = None  # init_app()에서 설정
+
+
+def init_app():
+    """
+    API 서버 프로세스 초기화 (MinIO 버킷 설정, 대기열 초기화, 모델 미리 로드)
+
+    spawn으로 시작된 실행기 풀 워커는 메인 스크립트(python app.py)를 __mp_main__으로 다시
+    실행하므로 모듈 최상위가 아닌 서버 프로세스에서만 호출
+    (python app.py: __main__ 블록, gunicorn: gunicorn.conf.py의 post_worker_init)
+    """
+    global minio_client
+
+    # MinIO 클라이언트 초기화 (버킷 설정 포함)
+    minio_client = setup_storage()
+
+    # 대기열 초기화
+    init_queue(minio_client)
 
-# 대기열 초기화
-init_queue(minio_client)
+    # demucs 모델 미리 로드 (로컬 분리 + 스레드 실행기에서만, 프로세스 실행기는 워커 프로세스에서 로드)
+    if not USE_EXTERNAL_SEPARATOR and PRELOAD_SEPARATION_MODEL and JOB_EXECUTOR == 'thread':
+        preload_model()
+
+    # 구간 배치는 같은 프로세스에서 분리되는 작업끼리만 묶이므로, 프로세스 실행기(워커당 작업 1개)에서는 묶이지 않음
+    if not USE_EXTERNAL_SEPARATOR and SEPARATION_BATCH_SIZE > 1 and JOB_EXECUTOR == 'process':
+        print(f"Warning: SEPARATION_BATCH_SIZE={SEPARATION_BATCH_SIZE} has no effect with JOB_EXECUTOR=process "
+              f"(windows are only batched across jobs in the same process, use JOB_EXECUTOR=thread)")
 
 
 # 파일 크기 초과 에러 핸들러
@@ -47,22 +99,74 @@ def analyze_track():
 
     Returns:
         - 202 Accepted: 작업이 대기열에 추가됨 (job_id, position 포함)
+                        또는 캐시 적중으로 바로 완료됨 (status: completed)
         - 400/413/500: 에러 발생
+        - 503: 대기열이 가득 찼거나 예상 대기 시간이 너무 김
     """
     # 1. 파일 유효성 검사
     file, error = validate_uploaded_file('music_file')
     if error:
         return file  # error가 있으면 file에 error response가 들어있음
 
+    # 오디오 헤더 확인 (손상/형식 불일치 파일은 대기열에 넣기 전에 거절)
+    audio_info, error = probe_uploaded_audio(file)
+    if error:
+        return audio_info
+
     # 2. vocal_type 파라미터 받기 (기본값: female)
     vocal_type = request.form.get('vocal_type', 'female')
 
-    # 3. 파일 저장
+    # 3. profile 파라미터 받기 (분리 품질 프로필, 기본값: 서버 설정)
+    profile = request.form.get('profile', DEFAULT_SEPARATION_PROFILE)
+    if profile != DEFAULT_SEPARATION_PROFILE and profile not in ALLOWED_SEPARATION_PROFILES:
+        allowed_profiles = ', '.join(ALLOWED_SEPARATION_PROFILES)
+        return jsonify({
+            'message': f'지원하지 않는 분리 프로필입니다. 지원 프로필: {allowed_profiles}'
+        }), 400
+
+    # priority 파라미터 받기 (우선순위 등급, 기본값: normal)
+    priority = request.form.get('priority', DEFAULT_PRIORITY)
+    if priority != DEFAULT_PRIORITY and priority not in ALLOWED_JOB_PRIORITIES:
+        return jsonify({
+            'message': f'지정할 수 없는 우선순위입니다. 지원 우선순위: {", ".join(ALLOWED_JOB_PRIORITIES)}'
+        }), 400
+
     try:
-        file_info = save_uploaded_file(file, minio_client, ORIGINAL_BUCKET)
+        with track_stages() as timings:
+            # 4. 캐시 조회 (같은 파일 + 같은 분석 조건이면 바로 완료)
+            with stage('cache_lookup'):
+                content_hash = compute_content_hash(file)
+                cached_result = lookup_cached_result(
+                    minio_client, content_hash, vocal_type, profile, file.filename
+                )
+            if cached_result:
+                return jsonify(create_completed_job(cached_result, vocal_type, profile)), 202
 
-        # 4. 대기열에 작업 추가
-        job_result = create_job(file_info, vocal_type)
+            # 같은 파일 + 같은 분석 조건의 작업이 대기/처리 중이면 그 작업에 연결 (대기열 자리 사용 안 함)
+            attached = attach_to_inflight_job(content_hash, vocal_type, profile, file.filename)
+            if attached:
+                return jsonify(attached), 202
+
+            # 5. 접수 판단 (음원 길이로 예상 대기 시간 계산, 너무 길면 저장 전에 거절)
+            admission = check_admission(audio_info['duration'], profile, priority)
+            if not admission['admit']:
+                wait_minutes = max(1, round(admission['expected_wait_seconds'] / 60))
+                response = jsonify({
+                    'message': f'현재 예상 대기 시간이 너무 깁니다 (약 {wait_minutes}분). 잠시 후 다시 시도해주세요.',
+                    'expected_wait_seconds': round(admission['expected_wait_seconds'])
+                })
+                response.headers['Retry-After'] = str(round(admission['expected_wait_seconds']))
+                return response, 503
+
+            # 6. 파일 저장
+            with stage('upload'):
+                file_info = save_uploaded_file(file, minio_client, ORIGINAL_BUCKET)
+            file_info['content_hash'] = content_hash
+            file_info['duration'] = audio_info['duration']
+            file_info['audio_info'] = audio_info
+
+        # 7. 대기열에 작업 추가 (요청 처리 중 측정한 단계 시간 포함)
+        job_result = create_job(file_info, vocal_type, profile, timings=timings, priority=admission['priority'])
 
         # 대기열 가득 참
         if job_result.get('error'):
@@ -84,13 +188,30 @@ def analyze_track():
 @app.route('/jobs/<job_id>/status', methods=['GET'])
 def get_status(job_id):
     """
-    작업 상태 조회 (polling용)
+    작업 상태 조회 (polling/long-poll용)
+
+    Query:
+        wait: 상태가 바뀔 때까지 기다릴 최대 시간 (초, JOB_LONG_POLL_MAX_SECONDS까지)
+        state: 마지막으로 받은 상태 토큰 (응답의 state, 이와 다를 때 바로 응답)
 
     Returns:
-        - 200: 상태 정보 (status, position/message/result)
+        - 200: 상태 정보 (status, state, position/stage/message/result)
         - 404: 존재하지 않는 작업
+        - 503: 대기 연결이 JOB_WAITERS_MAX개를 넘음 (Retry-After 후 다시 요청)
     """
-    status = get_job_status(job_id)
+    wait = min(max(request.args.get('wait', 0, type=float), 0), JOB_LONG_POLL_MAX_SECONDS)
+    state = request.args.get('state')
+    touch_job(job_id)
+
+    if wait > 0 and state:
+        if not acquire_waiter_slot():
+            return waiters_full_response()
+        try:
+            status = wait_for_job_status(job_id, state, wait)
+        finally:
+            release_waiter_slot()
+    else:
+        status = get_job_status(job_id)
 
     if status is None:
         return jsonify({
@@ -100,5 +221,104 @@ def get_status(job_id):
     return jsonify(status), 200
 
 
+@app.route('/jobs/<job_id>/events', methods=['GET'])
+def stream_status(job_id):
+    """
+    작업 상태 알림 (Server-Sent Events)
+
+    상태(대기 순번, 처리 단계, 완료/실패)가 바뀔 때마다 status 이벤트를 보내고,
+    완료/실패 이벤트를 보낸 뒤 연결 종료. JOB_EVENTS_MAX_SECONDS가 지나면 연결을
+    끊으며, 브라우저가 Last-Event-ID(마지막 상태 토큰)로 재연결하면 이어서 전송
+
+    Returns:
+        - 200: text/event-stream
+        - 404: 존재하지 않는 작업
+        - 503: 대기 연결이 JOB_WAITERS_MAX개를 넘음 (클라이언트는 long-poll로 전환)
+    """
+    if get_job_status(job_id) is None:
+        return jsonify({
+            'error': '존재하지 않는 작업입니다.'
+        }), 404
+
+    if not acquire_waiter_slot():
+        return waiters_full_response()
+
+    last_state = request.headers.get('Last-Event-ID')
+
+    def generate(state):
+        deadline = time.monotonic() + JOB_EVENTS_MAX_SECONDS
+        yield 'retry: 3000\n\n'
+        while True:
+            touch_job(job_id)
+            remaining = deadline - time.monotonic()
+            status = wait_for_job_status(job_id, state, min(JOB_EVENTS_KEEPALIVE_SECONDS, max(remaining, 0)))
+            if status is None:
+                return
+
+            finished = status['status'] in FINAL_STATUSES
+            if status['state'] != state or finished:
+                state = status['state']
+                yield f"id: {state}\nevent: status\ndata: {json.dumps(status, ensure_ascii=False)}\n\n"
+            else:
+                yield ': keep-alive\n\n'
+
+            if finished or remaining <= 0:
+                return
+
+    response = Response(generate(last_state), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'  # nginx 응답 버퍼링 끄기
+    })
+    # 스트림이 끝나거나 클라이언트가 끊으면 서버가 응답을 닫을 때 슬롯 반환
+    response.call_on_close(release_waiter_slot)
+    return response
+
+
+def waiters_full_response():
+    """대기 연결 수 초과 응답 (503 + Retry-After)"""
+    response = jsonify({
+        'error': '상태 알림 연결이 너무 많습니다. 잠시 후 다시 시도해주세요.',
+        'retry_after': JOB_WAITERS_RETRY_SECONDS
+    })
+    response.headers['Retry-After'] = str(JOB_WAITERS_RETRY_SECONDS)
+    return response, 503
+
+
+@app.route('/jobs/<job_id>', methods=['DELETE'])
+def delete_job(job_id):
+    """
+    작업 취소
+
+    대기 중인 작업은 바로 취소되고, 처리 중인 작업은 다음 단계/구간 경계에서 중단
+
+    Returns:
+        - 200: 취소됨 (status: cancelled)
+        - 202: 처리 중인 작업에 취소 요청됨 (status: processing, 중단되면 cancelled로 바뀜)
+        - 404: 존재하지 않는 작업
+        - 409: 이미 끝났거나 같은 결과를 기다리는 다른 요청이 있는 작업
+    """
+    result = cancel_job(job_id)
+    if result is None:
+        return jsonify({
+            'error': '존재하지 않는 작업입니다.'
+        }), 404
+
+    if result.get('error'):
+        return jsonify(result), 409
+
+    return jsonify(result), 200 if result['status'] == 'cancelled' else 202
+
+
+@app.route('/metrics', methods=['GET'])
+def get_metrics():
+    """
+    작업 단계 시간/대기열/캐시/MinIO 전송량 지표 (Prometheus 텍스트 형식)
+
+    gunicorn worker마다 따로 집계되므로 요청을 받은 worker의 값만 반환
+    """
+    return Response(render_metrics(), mimetype='text/plain; version=0.0.4')
+
+
 if __name__ == '__main__':
+    init_app()
     app.run(host='0.0.0.0', port=5000, debug=True)
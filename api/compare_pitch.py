@@ -0,0 +1,149 @@
+"""
+음정 분석 front-end 비교 스크립트
+
+분리된 vocal 파일을 기준 설정(원본 레이트, C2~C7, 프레임 2048 / hop 512)과
+현재 설정(PITCH_ANALYSIS_SR, PITCH_FRAME_LENGTH, PITCH_HOP_LENGTH, PITCH_RANGE_BY_VOCAL_TYPE)으로
+분석하여 소요 시간과 음표 일치율(기준 대비)을 출력
+
+--chunked: 분할 pyin(chunked_pyin)을 구간 워커 수별로 실행하여 소요 시간, 속도 향상(분할 안 한
+실행 대비)과 음표 일치율(분할 안 한 결과 대비)을 출력 (워커 시작/librosa import/numba 컴파일 시간 제외)
+
+사용법 (api 컨테이너 안에서, 환경변수로 비교할 설정 지정):
+    PITCH_ANALYSIS_SR=16000 PITCH_FRAME_LENGTH=1024 PITCH_RANGE_BY_VOCAL_TYPE=true \
+        python compare_pitch.py --vocal-type female vocal1.wav [vocal2.wav ...]
+    PITCH_CHUNK_SECONDS=10 python compare_pitch.py --chunked --workers 1,2,4,8 vocal1.wav [vocal2.wav ...]
+"""
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import librosa
+import numpy as np
+
+from config import PITCH_CHUNK_SECONDS, PITCH_CHUNK_OVERLAP_SECONDS
+from compare_separation import note_agreement
+from cpu_scheduler import get_available_cores, chunk_pool_initializer, limit_threads
+from utils import (
+    extract_pitch_info_from_audio,
+    get_pitch_params,
+    to_analysis_rate,
+    run_pyin,
+    chunked_pyin,
+    segment_notes
+)
+
+
+BENCHMARK_CHUNK_SECONDS = 10  # --chunked에서 PITCH_CHUNK_SECONDS가 0일 때 사용할 구간 길이
+BENCHMARK_WORKERS = (1, 2, 4, 8)
+
+BASELINE_PARAMS = {
+    'fmin': 'C2',
+    'fmax': 'C7',
+    'analysis_sr': 0,
+    'frame_length': 2048,
+    'hop_length': 512
+}
+
+
+def run_params(y, sr, params: dict):
+    """한 가지 설정으로 음정 분석 실행"""
+    start = time.perf_counter()
+    notes = extract_pitch_info_from_audio(y, sr, params=params)
+    return notes, time.perf_counter() - start
+
+
+def compare_file(path: str, vocal_type: str = None):
+    """파일 하나에 대해 기준 설정과 현재 설정 비교 결과 출력"""
+    y, sr = librosa.load(path, sr=None)
+    params = get_pitch_params(vocal_type)
+    baseline = dict(params, **BASELINE_PARAMS)
+
+    base_notes, base_time = run_params(y, sr, baseline)
+    notes, elapsed = run_params(y, sr, params)
+
+    print(f"\n=== {os.path.basename(path)} ({sr} Hz) ===")
+    print(f"settings  analysis_sr: {params['analysis_sr'] or sr}  range: {params['fmin']}~{params['fmax']}  "
+          f"frame/hop: {params['frame_length']}/{params['hop_length']}")
+    print(f"pitch time  baseline: {base_time:.1f}s  current: {elapsed:.1f}s  (x{base_time / elapsed:.2f})")
+    print(f"notes  baseline: {len(base_notes)}  current: {len(notes)}  "
+          f"agreement: {note_agreement(base_notes, notes) * 100:.1f}%  "
+          f"reverse: {note_agreement(notes, base_notes) * 100:.1f}%")
+
+
+def frames_to_notes(frames: tuple, sr: int, params: dict) -> list:
+    """pyin 프레임 결과를 음표 리스트로 변환"""
+    f0, voiced_flag, voiced_probs = frames
+    times = librosa.frames_to_time(np.arange(len(f0)), sr=sr, hop_length=params['hop_length'])
+    return segment_notes(f0, voiced_flag, voiced_probs, times)
+
+
+def _warm_up(params: dict):
+    """구간 워커 준비 (librosa import, numba 컴파일을 측정에서 제외)"""
+    run_pyin(np.zeros(22050, dtype=np.float32), 22050, params)
+
+
+def benchmark_chunked(path: str, vocal_type: str = None, worker_counts=BENCHMARK_WORKERS):
+    """파일 하나에 대해 분할 pyin의 구간 워커 수별 소요 시간/일치율 출력"""
+    y, sr = librosa.load(path, sr=None)
+    params = get_pitch_params(vocal_type)
+    y, sr = to_analysis_rate(y, sr, params)
+    chunk_seconds = PITCH_CHUNK_SECONDS or BENCHMARK_CHUNK_SECONDS
+    cores = get_available_cores()
+
+    # 기준: 분할 없이 한 프로세스(스레드 1개)에서 실행
+    _warm_up(params)
+    start = time.perf_counter()
+    base_notes = frames_to_notes(run_pyin(y, sr, params), sr, params)
+    base_time = time.perf_counter() - start
+
+    print(f"\n=== {os.path.basename(path)} ({len(y) / sr:.1f}s at {sr} Hz, "
+          f"chunk {chunk_seconds:g}s + overlap {PITCH_CHUNK_OVERLAP_SECONDS:g}s, {len(cores)} cores) ===")
+    print(f"unchunked  {base_time:.2f}s  notes: {len(base_notes)}")
+
+    mp_context = multiprocessing.get_context('spawn')
+    for n_workers in worker_counts:
+        pool_init, pool_initargs = chunk_pool_initializer(mp_context, cores)
+        with ProcessPoolExecutor(n_workers, mp_context=mp_context,
+                                 initializer=pool_init, initargs=pool_initargs) as pool:
+            list(pool.map(_warm_up, [params] * n_workers))
+            start = time.perf_counter()
+            frames = chunked_pyin(y, sr, chunk_seconds, PITCH_CHUNK_OVERLAP_SECONDS, params, executor=pool)
+            elapsed = time.perf_counter() - start
+
+        notes = frames_to_notes(frames, sr, params)
+        print(f"workers {n_workers:<3} {elapsed:.2f}s  (x{base_time / elapsed:.2f})  notes: {len(notes)}  "
+              f"agreement: {note_agreement(base_notes, notes) * 100:.1f}%  "
+              f"reverse: {note_agreement(notes, base_notes) * 100:.1f}%"
+              f"{'  (more workers than cores)' if n_workers > len(cores) else ''}")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    vocal_type = None
+    chunked = False
+    worker_counts = BENCHMARK_WORKERS
+    while args and args[0].startswith('--'):
+        option = args.pop(0)
+        if option == '--chunked':
+            chunked = True
+        elif option == '--vocal-type' and args:
+            vocal_type = args.pop(0)
+        elif option == '--workers' and args:
+            worker_counts = [int(n) for n in args.pop(0).split(',')]
+        else:
+            print(__doc__)
+            sys.exit(1)
+
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+
+    if chunked:
+        limit_threads(1)  # 기준 실행도 구간 워커와 같은 스레드 1개로 비교
+        for audio_path in args:
+            benchmark_chunked(audio_path, vocal_type, worker_counts)
+    else:
+        for audio_path in args:
+            compare_file(audio_path, vocal_type)
@@ -0,0 +1,119 @@
+"""
+분리 방식 품질/속도 비교 스크립트
+
+같은 음원을 기본 프로필(DEFAULT_SEPARATION_PROFILE) 설정으로 두 가지 방식으로 분리하여
+소요 시간, stem SDR(기준 방식 대비), 음정 분석 결과(음표) 일치율을 출력
+- 기본: full 모드(기준)와 vocals 모드 비교
+- --backend int8: eager 백엔드(기준)와 int8 백엔드 비교 (같은 분리 모드)
+- --profile fast: 기본 프로필(기준)과 지정한 프로필 비교
+
+사용법 (api 컨테이너 안에서):
+    python compare_separation.py song1.mp3 [song2.wav ...]
+    python compare_separation.py --backend int8 song1.mp3 [song2.wav ...]
+    python compare_separation.py --profile fast song1.mp3 [song2.wav ...]
+"""
+import os
+import sys
+import time
+import numpy as np
+
+from config import SEPARATION_PROFILES, DEFAULT_SEPARATION_PROFILE
+from services import separate_stems
+from model_registry import get_model
+from utils import extract_pitch_info_from_audio
+
+
+def signal_to_distortion_ratio(reference, estimate) -> float:
+    """SDR(dB) 계산 (reference 기준으로 estimate의 오차 비율)"""
+    noise = reference - estimate
+    reference_energy = np.sum(reference.astype(np.float64) ** 2)
+    noise_energy = np.sum(noise.astype(np.float64) ** 2)
+    if noise_energy == 0:
+        return float('inf')
+    return 10 * np.log10((reference_energy + 1e-12) / noise_energy)
+
+
+def note_agreement(reference_notes: list, notes: list) -> float:
+    """
+    음표 일치율 계산 (reference 음표 중 같은 음 이름이 시작 시간 ±50ms 안에 있는 비율)
+    """
+    if not reference_notes:
+        return 1.0 if not notes else 0.0
+
+    matched = 0
+    for ref in reference_notes:
+        for note in notes:
+            if note['note'] == ref['note'] and abs(note['start_time'] - ref['start_time']) <= 0.05:
+                matched += 1
+                break
+    return matched / len(reference_notes)
+
+
+def run_settings(file_data: bytes, filename: str, settings: dict):
+    """한 가지 분리 설정으로 분리 + 음정 분석 실행"""
+    # 모델 로드 시간이 비교에 섞이지 않도록 미리 로드
+    get_model(settings['model'], settings['backend'])
+
+    start = time.perf_counter()
+    vocal, mr, samplerate = separate_stems(file_data, filename, settings)
+    separation_time = time.perf_counter() - start
+
+    notes = extract_pitch_info_from_audio(vocal.mean(axis=1), samplerate)
+    return vocal, mr, notes, separation_time
+
+
+def compare_file(path: str, variants: list):
+    """
+    파일 하나에 대해 두 분리 방식 비교 결과 출력
+
+    Args:
+        path: 음원 파일 경로
+        variants: [(기준 이름, 분리 설정), (비교 이름, 분리 설정)]
+    """
+    with open(path, 'rb') as f:
+        file_data = f.read()
+    filename = os.path.basename(path)
+
+    (base_name, base_settings), (name, settings) = variants
+    base_vocal, base_mr, base_notes, base_time = run_settings(file_data, filename, base_settings)
+    vocal, mr, notes, elapsed = run_settings(file_data, filename, settings)
+
+    print(f"\n=== {filename} ===")
+    print(f"separation time  {base_name}: {base_time:.1f}s  {name}: {elapsed:.1f}s  "
+          f"(x{base_time / elapsed:.2f})")
+    print(f"vocal SDR vs {base_name}: {signal_to_distortion_ratio(base_vocal, vocal):.2f} dB")
+    print(f"MR SDR vs {base_name}:    {signal_to_distortion_ratio(base_mr, mr):.2f} dB")
+    print(f"notes  {base_name}: {len(base_notes)}  {name}: {len(notes)}  "
+          f"agreement: {note_agreement(base_notes, notes) * 100:.1f}%")
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    base_settings = SEPARATION_PROFILES[DEFAULT_SEPARATION_PROFILE]
+
+    if len(args) >= 2 and args[0] == '--backend':
+        backend = args[1]
+        args = args[2:]
+        variants = [
+            ('eager', dict(base_settings, backend='eager')),
+            (backend, dict(base_settings, backend=backend))
+        ]
+    elif len(args) >= 2 and args[0] == '--profile':
+        profile = args[1]
+        args = args[2:]
+        variants = [
+            (DEFAULT_SEPARATION_PROFILE, base_settings),
+            (profile, SEPARATION_PROFILES[profile])
+        ]
+    else:
+        variants = [
+            ('full', dict(base_settings, mode='full')),
+            ('vocals', dict(base_settings, mode='vocals'))
+        ]
+
+    if not args:
+        print(__doc__)
+        sys.exit(1)
+
+    for audio_path in args:
+        compare_file(audio_path, variants)
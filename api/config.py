@@ -16,11 +16,162 @@ ALLOWED_EXTENSIONS = {'wav', 'mp3', 'flac', 'ogg'}
 MAX_FILE_SIZE_MB = int(os.environ.get('MAX_FILE_SIZE_MB', '7'))
 MAX_QUEUE_SIZE = int(os.environ.get('MAX_QUEUE_SIZE', '3'))
 
+# 작업 순서/접수 설정
+# fifo: 들어온 순서대로, sjf: 예상 처리 시간이 짧은 작업부터 (대기 1초당 SJF_AGING_FACTOR초씩 우선)
+JOB_SCHEDULER = os.environ.get('JOB_SCHEDULER', 'fifo').lower()
+SJF_AGING_FACTOR = float(os.environ.get('SJF_AGING_FACTOR', '1'))
+# 요청에서 지정할 수 있는 우선순위 등급 (쉼표로 구분, high/normal/low)
+ALLOWED_JOB_PRIORITIES = [
+    name.strip() for name in os.environ.get('ALLOWED_JOB_PRIORITIES', 'normal').split(',') if name.strip()
+]
+# 예상 대기 시간이 이 값(초)을 넘으면 접수 거절(reject) 또는 low 등급으로 접수(defer) (0: 사용 안 함)
+MAX_QUEUE_WAIT_SECONDS = float(os.environ.get('MAX_QUEUE_WAIT_SECONDS', '0'))
+ADMISSION_MODE = os.environ.get('ADMISSION_MODE', 'reject').lower()
+
+# 작업 실행 설정
+# process: 별도 프로세스 풀에서 실행 (GIL 회피), thread: API 프로세스의 스레드 풀에서 실행
+JOB_EXECUTOR = os.environ.get('JOB_EXECUTOR', 'process').lower()
+SEPARATION_WORKERS = int(os.environ.get('SEPARATION_WORKERS', '1'))  # 동시 음원 분리 슬롯 수
+PITCH_WORKERS = int(os.environ.get('PITCH_WORKERS', '2'))  # 음정 분석 워커 수
+
+# CPU 코어 배분 설정 (분리 슬롯/음정 분석 워커가 같은 코어를 두고 스레드 경쟁하지 않도록 제한)
+# CPU_SCHEDULING: 워커별 torch/OpenMP/BLAS/numba 스레드 수를 배정된 코어 수로 제한
+# CPU_PINNING: 워커 프로세스를 배정된 코어에 고정 (프로세스 실행기에서만 적용)
+CPU_SCHEDULING = os.environ.get('CPU_SCHEDULING', 'true').lower() == 'true'
+CPU_PINNING = os.environ.get('CPU_PINNING', 'false').lower() == 'true'
+CPU_CORES = os.environ.get('CPU_CORES', '')  # 사용할 코어 목록 (예: "0-15", 비우면 전체)
+PITCH_THREADS = int(os.environ.get('PITCH_THREADS', '1'))  # 음정 분석 워커당 스레드(코어) 수
+
+# 음정 분석(pyin) 분할 실행 설정
+# PITCH_CHUNK_SECONDS > 0 이면 긴 보컬을 구간별로 나눠 여러 프로세스에서 동시에 분석 (0: 분할 안 함)
+PITCH_CHUNK_SECONDS = float(os.environ.get('PITCH_CHUNK_SECONDS', '0'))
+PITCH_CHUNK_OVERLAP_SECONDS = float(os.environ.get('PITCH_CHUNK_OVERLAP_SECONDS', '1'))  # 구간 앞뒤로 겹쳐 분석할 길이
+# 음정 분석 워커당 구간 워커 수 (워커에 배정된 코어 수까지만 사용, 프로세스 실행기에서는 PITCH_THREADS)
+# 예: PITCH_WORKERS=2, PITCH_THREADS=4 -> 워커당 구간 워커 4개, 전체 8개 (1개 이하면 워커 안에서 차례로 실행)
+# 구간별 분리(SEPARATION_WINDOW_SECONDS > 0)에서는 분리 워커가 음정 분석 코어를 나눠 받아 같은 방식으로 사용
+PITCH_CHUNK_WORKERS = int(os.environ.get('PITCH_CHUNK_WORKERS', '4'))
+
+# 음정 분석 front-end 설정 (비용은 샘플링 레이트, 프레임/hop 크기, 분석 음역 넓이에 비례)
+# PITCH_ANALYSIS_SR > 0 이면 vocal을 이 샘플링 레이트로 낮춘 뒤 분석 (0: 원본 레이트 그대로)
+PITCH_ANALYSIS_SR = int(os.environ.get('PITCH_ANALYSIS_SR', '0'))
+PITCH_FRAME_LENGTH = int(os.environ.get('PITCH_FRAME_LENGTH', '2048'))  # pyin 프레임 길이 (분석 레이트 기준 샘플)
+PITCH_HOP_LENGTH = int(os.environ.get('PITCH_HOP_LENGTH', '0'))  # pyin hop (샘플, 0: 프레임 길이의 1/4)
+# true면 vocal_type에 맞춰 분석 음역을 좁힘 (false: 모든 보컬을 C2~C7로 분석)
+PITCH_RANGE_BY_VOCAL_TYPE = os.environ.get('PITCH_RANGE_BY_VOCAL_TYPE', 'false').lower() == 'true'
+
+# 작업 저장소 설정
+# memory: 프로세스 메모리 (gunicorn worker 1개 전용), sqlite: 파일 DB (여러 worker 공유, 재시작 후 유지)
+JOB_STORE = os.environ.get('JOB_STORE', 'memory').lower()
+JOB_STORE_PATH = os.environ.get('JOB_STORE_PATH', '/tmp/my-pitch/jobs.sqlite3')
+JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', '2'))  # 다른 worker가 추가한 작업 확인 주기 (초)
+
+# 작업 상태 알림 설정 (SSE 스트림 / long-poll)
+JOB_EVENTS_MAX_SECONDS = float(os.environ.get('JOB_EVENTS_MAX_SECONDS', '300'))  # SSE 연결 최대 유지 시간 (이후 클라이언트가 재연결)
+JOB_EVENTS_KEEPALIVE_SECONDS = float(os.environ.get('JOB_EVENTS_KEEPALIVE_SECONDS', '15'))  # 변경이 없을 때 keep-alive 전송 주기
+JOB_LONG_POLL_MAX_SECONDS = float(os.environ.get('JOB_LONG_POLL_MAX_SECONDS', '30'))  # long-poll 최대 대기 시간
+# gunicorn worker당 동시에 대기할 수 있는 SSE 스트림 + long-poll 수 (넘으면 503 + Retry-After, 0: 제한 없음)
+# 대기 연결마다 요청 스레드를 하나씩 차지하므로 GUNICORN_THREADS보다 작게 두어 업로드/취소/지표 요청용 스레드를 남김
+# 기본값: GUNICORN_THREADS의 3/4 (256 스레드 -> 대기 192 + 나머지 요청 64)
+JOB_WAITERS_MAX = int(os.environ.get('JOB_WAITERS_MAX') or int(os.environ.get('GUNICORN_THREADS') or '256') * 3 // 4)
+JOB_WAITERS_RETRY_SECONDS = int(os.environ.get('JOB_WAITERS_RETRY_SECONDS', '5'))  # 거절 시 Retry-After (초)
+
+# 작업 소요 시간 예측 설정 (완료된 작업 기록으로 학습)
+JOB_HISTORY_PATH = os.environ.get('JOB_HISTORY_PATH', '/tmp/my-pitch/job_history.json')
+JOB_HISTORY_MAX_ENTRIES = int(os.environ.get('JOB_HISTORY_MAX_ENTRIES', '500'))
+
+# 작업 보관 설정 (완료/실패 작업을 저장소에서 정리하여 메모리/DB 크기 제한)
+JOB_RETENTION_SECONDS = float(os.environ.get('JOB_RETENTION_SECONDS', '3600'))  # 끝난 작업 보관 시간 (0=시간 제한 없음)
+JOB_RETENTION_MAX_JOBS = int(os.environ.get('JOB_RETENTION_MAX_JOBS', '500'))  # 보관할 끝난 작업 최대 수 (0=제한 없음)
+JOB_CLEANUP_INTERVAL = float(os.environ.get('JOB_CLEANUP_INTERVAL', '60'))  # 정리 주기 (초)
+# 이 시간 동안 상태 조회(polling/long-poll/SSE)가 없는 대기 작업은 버려진 것으로 보고 취소 (0=사용 안 함)
+# long-poll 최대 대기 시간, SSE keep-alive 주기보다 충분히 길게 설정
+JOB_ABANDON_SECONDS = float(os.environ.get('JOB_ABANDON_SECONDS', '0'))
+# 정리한 작업의 상태를 MinIO에 옮겨 두어 늦은 상태 조회에도 응답 (presigned URL 유효 시간만큼 보관)
+JOB_ARCHIVE_ENABLED = os.environ.get('JOB_ARCHIVE_ENABLED', 'false').lower() == 'true'
+JOB_ARCHIVE_TTL_HOURS = int(os.environ.get('JOB_ARCHIVE_TTL_HOURS', '24'))
+
+# 스토리지 전송 설정 (메모리 사용량이 파일 길이와 무관하도록 나눠서 전송)
+STORAGE_PART_SIZE_MB = int(os.environ.get('STORAGE_PART_SIZE_MB', '5'))  # MinIO 멀티파트 파트 크기 (최소 5MB)
+STREAM_CHUNK_SIZE_KB = int(os.environ.get('STREAM_CHUNK_SIZE_KB', '256'))  # 다운로드/인코딩 청크 크기
+TRANSFER_WORKERS = int(os.environ.get('TRANSFER_WORKERS', '4'))  # vocal/MR 동시 전송 스레드 수
+
+# 분석 결과 캐시 설정 (같은 파일 + 같은 분석 조건이면 재사용)
+RESULT_CACHE_ENABLED = os.environ.get('RESULT_CACHE_ENABLED', 'true').lower() == 'true'
+RESULT_CACHE_TTL_HOURS = int(os.environ.get('RESULT_CACHE_TTL_HOURS', '168'))  # 7일
+# 최대 항목 수는 gunicorn worker별 LRU 인덱스 기준 (전체 항목은 worker 수 x 최대 항목 수까지 가능)
+# 만료된 항목은 정리 스레드(JOB_CLEANUP_INTERVAL)가 1시간마다 MinIO 목록을 기준으로 삭제
+RESULT_CACHE_MAX_ENTRIES = int(os.environ.get('RESULT_CACHE_MAX_ENTRIES', '1000'))
+# 같은 파일 + 같은 분석 조건의 작업이 대기/처리 중이면 새 작업을 만들지 않고 그 결과를 함께 사용
+JOB_COALESCE_ENABLED = os.environ.get('JOB_COALESCE_ENABLED', 'true').lower() == 'true'
+
 # 음원 분리 방식 설정
 # True: 외부 서버(Colab) 사용 (개발 환경)
 # False: 로컬에서 demucs 직접 실행 (배포 환경)
 USE_EXTERNAL_SEPARATOR = os.environ.get('USE_EXTERNAL_SEPARATOR', 'false').lower() == 'true'
 
+# demucs 모델 설정 (로컬 분리 시 사용)
+DEMUCS_MODEL_NAME = os.environ.get('DEMUCS_MODEL_NAME', 'htdemucs_ft')
+# 분리 방식: full(모든 소스 분리 후 vocal 외 소스를 합쳐 MR 생성),
+#           vocals(vocal 전용 모델만 실행하고 MR = 원본 - vocal)
+# 기본값 변경(vocals, fast 기본 프로필, int8)은 compare_separation.py 결과 확인 전까지 보류 (README 참고)
+SEPARATION_MODE = os.environ.get('SEPARATION_MODE', 'full').lower()
+if SEPARATION_MODE not in ('full', 'vocals'):
+    print(f"⚠️  알 수 없는 SEPARATION_MODE '{SEPARATION_MODE}', full 모드 사용")
+    SEPARATION_MODE = 'full'
+
+# 분리 추론 백엔드
+# eager: PyTorch 기본 (fp32), int8: Linear/LSTM 레이어 동적 int8 양자화 (CPU 전용, GPU나 양자화 실패 시 eager)
+SEPARATION_BACKEND = os.environ.get('SEPARATION_BACKEND', 'eager').lower()
+if SEPARATION_BACKEND not in ('eager', 'int8'):
+    print(f"⚠️  알 수 없는 SEPARATION_BACKEND '{SEPARATION_BACKEND}', eager 사용")
+    SEPARATION_BACKEND = 'eager'
+# 양자화된 모델 저장 경로 (재시작 시 다시 양자화하지 않음, 비우면 저장 안 함)
+SEPARATION_BACKEND_CACHE_DIR = os.environ.get('SEPARATION_BACKEND_CACHE_DIR', '/tmp/my-pitch/models')
+
+# 분리 품질 프로필 (요청마다 선택, 속도와 품질을 교환)
+# - model: demucs 모델 이름, shifts: 랜덤 시프트 평균 횟수 (추론 횟수 배수)
+# - overlap: 구간 간 겹침 비율, segment: 구간 길이(초, None이면 모델 기본값)
+# - mode: 분리 방식 (full/vocals), backend: 추론 백엔드 (eager/int8)
+SEPARATION_PROFILES = {
+    'fast': {'model': 'htdemucs', 'shifts': 0, 'overlap': 0.1, 'segment': None, 'mode': 'vocals',
+             'backend': SEPARATION_BACKEND},
+    'balanced': {'model': DEMUCS_MODEL_NAME, 'shifts': 1, 'overlap': 0.25, 'segment': None, 'mode': SEPARATION_MODE,
+                 'backend': SEPARATION_BACKEND},
+    'best': {'model': DEMUCS_MODEL_NAME, 'shifts': 3, 'overlap': 0.25, 'segment': None, 'mode': SEPARATION_MODE,
+             'backend': SEPARATION_BACKEND},
+}
+# 요청에서 선택할 수 있는 프로필 (쉼표 구분)
+ALLOWED_SEPARATION_PROFILES = [
+    name.strip() for name in os.environ.get('ALLOWED_SEPARATION_PROFILES', 'fast,balanced,best').split(',')
+    if name.strip() in SEPARATION_PROFILES
+]
+# 요청에 프로필이 없을 때 사용할 기본 프로필
+DEFAULT_SEPARATION_PROFILE = os.environ.get('DEFAULT_SEPARATION_PROFILE', 'best')
+if DEFAULT_SEPARATION_PROFILE not in SEPARATION_PROFILES:
+    print(f"⚠️  알 수 없는 DEFAULT_SEPARATION_PROFILE '{DEFAULT_SEPARATION_PROFILE}', best 프로필 사용")
+    DEFAULT_SEPARATION_PROFILE = 'best'
+
+# SEPARATION_WINDOW_SECONDS > 0 이면 원본을 구간별로 나눠 분리하고, 완성된 구간부터
+# 업로드/음정 분석을 함께 진행 (메모리 사용량이 곡 길이가 아닌 구간 길이에 비례, 0: 한 번에 분리)
+SEPARATION_WINDOW_SECONDS = float(os.environ.get('SEPARATION_WINDOW_SECONDS', '0'))
+SEPARATION_WINDOW_OVERLAP_SECONDS = float(os.environ.get('SEPARATION_WINDOW_OVERLAP_SECONDS', '2'))  # 구간 간 cross-fade 길이
+# 구간별 분리 시 여러 작업의 같은 길이 구간을 묶어 한 번에 실행 (1: 묶지 않음)
+# 같은 프로세스에서 여러 작업이 분리될 때만 묶이므로 JOB_EXECUTOR=thread, SEPARATION_WORKERS > 1과 함께 사용
+# (JOB_EXECUTOR=process면 시작 시 경고, 구간별 분리 중인 다른 작업이 없으면 기다리지 않음)
+SEPARATION_BATCH_SIZE = int(os.environ.get('SEPARATION_BATCH_SIZE', '1'))
+SEPARATION_BATCH_WAIT_MS = float(os.environ.get('SEPARATION_BATCH_WAIT_MS', '200'))  # 배치를 채우기 위해 기다릴 최대 시간
+
+# True: 워커 시작 시 모델을 미리 로드, False: 첫 작업에서 로드
+PRELOAD_SEPARATION_MODEL = os.environ.get('PRELOAD_SEPARATION_MODEL', 'true').lower() == 'true'
+
+# 외부 분석 서버 연결 설정 (USE_EXTERNAL_SEPARATOR=true일 때 사용)
+ANALYSIS_POOL_SIZE = int(os.environ.get('ANALYSIS_POOL_SIZE', '4'))  # 유지할 연결 수
+ANALYSIS_MAX_RETRIES = int(os.environ.get('ANALYSIS_MAX_RETRIES', '3'))  # 연결 실패 시 재시도 횟수
+ANALYSIS_RETRY_BACKOFF = float(os.environ.get('ANALYSIS_RETRY_BACKOFF', '0.5'))  # 재시도 간격 계수 (초)
+ANALYSIS_CONNECT_TIMEOUT = float(os.environ.get('ANALYSIS_CONNECT_TIMEOUT', '10'))  # 연결 타임아웃 (초)
+ANALYSIS_READ_TIMEOUT = float(os.environ.get('ANALYSIS_READ_TIMEOUT', '530'))  # 분석 응답 대기 (nginx 10분보다 짧게)
+ANALYSIS_DOWNLOAD_READ_TIMEOUT = float(os.environ.get('ANALYSIS_DOWNLOAD_READ_TIMEOUT', '60'))  # 분리 파일 다운로드 응답 대기
+
 # 환경별 설정값
 if USE_EXTERNAL_SEPARATOR:
     # 개발 환경: 외부 서버 URL 필수
@@ -0,0 +1,106 @@
+"""
+CPU 코어 배분 효과 측정 스크립트
+
+같은 음원으로 작업 N개를 세 가지 방식으로 실행하여 전체 소요 시간 비교
+- sequential: 한 번에 하나씩 실행 (스레드 제한 없음)
+- concurrent: 동시에 실행 (스레드 제한 없음, 작업마다 모든 코어 사용)
+- scheduled: 동시에 실행 (cpu_scheduler 배분대로 작업마다 코어를 나눠 스레드 제한 + 고정)
+
+작업 하나 = 음원 분리(기본 프로필) + 음정 분석. --pitch-only면 원본 신호로 음정 분석만 실행
+
+사용법 (api 컨테이너 안에서):
+    python cpu_benchmark.py song.mp3 [--jobs 2] [--pitch-only]
+"""
+import argparse
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from config import SEPARATION_PROFILES, DEFAULT_SEPARATION_PROFILE
+from cpu_scheduler import plan_cpu_allocation, limit_threads
+
+
+def run_job(path: str, pitch_only: bool) -> float:
+    """작업 하나 실행 후 소요 시간(초) 반환"""
+    import librosa
+    from utils import extract_pitch_info_from_audio
+
+    start = time.perf_counter()
+    if pitch_only:
+        y, sr = librosa.load(path, sr=None)
+        extract_pitch_info_from_audio(y, sr)
+    else:
+        from services import separate_stems
+        with open(path, 'rb') as f:
+            file_data = f.read()
+        vocal, _, samplerate = separate_stems(
+            file_data, os.path.basename(path), SEPARATION_PROFILES[DEFAULT_SEPARATION_PROFILE]
+        )
+        extract_pitch_info_from_audio(vocal.mean(axis=1), samplerate)
+    return time.perf_counter() - start
+
+
+def warm_up(pitch_only: bool):
+    """모델 로드/JIT 컴파일 시간이 측정에 섞이지 않도록 미리 실행"""
+    import numpy as np
+    from utils import run_pyin
+
+    run_pyin(np.zeros(22050, dtype=np.float32), 22050)
+    if not pitch_only:
+        from model_registry import get_model
+        get_model(SEPARATION_PROFILES[DEFAULT_SEPARATION_PROFILE]['model'])
+
+
+def init_unlimited(pitch_only: bool):
+    warm_up(pitch_only)
+
+
+def init_scheduled(counter, plan: dict, pitch_only: bool):
+    """배분 계획의 분리 슬롯 하나를 작업 프로세스에 배정"""
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    cores = plan['separation'][index % len(plan['separation'])]
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+    limit_threads(len(cores), use_torch=not pitch_only)
+    warm_up(pitch_only)
+
+
+def run_scenario(name: str, path: str, jobs: int, pitch_only: bool) -> float:
+    """시나리오 하나 실행 후 전체 소요 시간(초) 반환"""
+    mp_context = multiprocessing.get_context('spawn')
+
+    if name == 'scheduled':
+        # 작업마다 음정 분석까지 함께 하므로 코어를 전부 분리 슬롯으로 나눔
+        plan = plan_cpu_allocation(separation_workers=jobs, pitch_workers=1, pitch_threads=0)
+        initializer, initargs = init_scheduled, (mp_context.Value('i', 0), plan, pitch_only)
+    else:
+        initializer, initargs = init_unlimited, (pitch_only,)
+
+    workers = 1 if name == 'sequential' else jobs
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context,
+                             initializer=initializer, initargs=initargs) as executor:
+        # 워커 프로세스를 모두 띄우고 초기화(워밍업)가 끝난 뒤 측정
+        list(executor.map(time.sleep, [0.5] * workers))
+
+        start = time.perf_counter()
+        job_times = list(executor.map(run_job, [path] * jobs, [pitch_only] * jobs))
+        elapsed = time.perf_counter() - start
+
+    print(f"{name:<11} total: {elapsed:7.1f}s  jobs: {', '.join(f'{t:.1f}s' for t in job_times)}")
+    return elapsed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='CPU 코어 배분 효과 측정')
+    parser.add_argument('audio_path')
+    parser.add_argument('--jobs', type=int, default=2, help='동시에 실행할 작업 수')
+    parser.add_argument('--pitch-only', action='store_true', help='음원 분리 없이 음정 분석만 실행')
+    args = parser.parse_args()
+
+    print(f"cores: {len(plan_cpu_allocation(separation_workers=1, pitch_threads=0)['separation'][0])}, "
+          f"jobs: {args.jobs}, pitch only: {args.pitch_only}")
+    for scenario in ('sequential', 'concurrent', 'scheduled'):
+        run_scenario(scenario, args.audio_path, args.jobs, args.pitch_only)
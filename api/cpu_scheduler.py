@@ -0,0 +1,257 @@
+"""
+CPU 코어 배분 모듈
+
+음원 분리 슬롯과 음정 분석 워커에 코어를 나눠 배정하고, 워커마다
+torch/OpenMP/BLAS/numba 스레드 수를 배정된 코어 수로 제한 (필요하면 코어에 고정)
+여러 작업이 동시에 실행될 때 같은 코어를 두고 스레드가 경쟁하는 것을 방지
+"""
+import os
+
+from config import (
+    USE_EXTERNAL_SEPARATOR,
+    SEPARATION_WORKERS,
+    PITCH_WORKERS,
+    CPU_SCHEDULING,
+    CPU_PINNING,
+    CPU_CORES,
+    PITCH_THREADS
+)
+
+
+# 스레드 수를 환경변수로만 받는 라이브러리용 (이후 생성되는 하위 프로세스에도 적용)
+THREAD_ENV_VARS = ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'NUMEXPR_NUM_THREADS')
+
+_thread_limits = None  # threadpoolctl 제한 객체 (해제되지 않도록 보관)
+_shared_process_configured = False
+_worker_cores = None  # 현재 워커 프로세스에 배정된 코어 (configure_worker에서 설정)
+_worker_role = None   # 현재 워커 프로세스의 역할과 순번 (configure_worker에서 설정)
+_worker_index = 0
+
+
+def parse_core_list(spec: str) -> list:
+    """
+    코어 목록 문자열 변환 (예: "0-3,8" -> [0, 1, 2, 3, 8])
+    """
+    cores = []
+    for part in spec.split(','):
+        part = part.strip()
+        if not part:
+            continue
+        if '-' in part:
+            first, last = part.split('-', 1)
+            cores.extend(range(int(first), int(last) + 1))
+        else:
+            cores.append(int(part))
+    return sorted(set(cores))
+
+
+def get_available_cores() -> list:
+    """사용할 코어 목록 반환 (CPU_CORES 설정, 없으면 현재 프로세스에 허용된 코어 전체)"""
+    if CPU_CORES:
+        return parse_core_list(CPU_CORES)
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def plan_cpu_allocation(cores: list = None, separation_workers: int = SEPARATION_WORKERS,
+                        pitch_workers: int = PITCH_WORKERS, pitch_threads: int = PITCH_THREADS) -> dict:
+    """
+    코어 배분 계획 생성
+
+    음정 분석 워커에 pitch_threads개씩 먼저 배정하고(분리 슬롯마다 최소 1코어는 남김),
+    나머지를 분리 슬롯에 고르게 나눔. 코어가 부족하면 여러 워커가 같은 코어를 공유
+
+    Args:
+        cores: 사용할 코어 목록 (None이면 get_available_cores())
+        separation_workers: 분리 슬롯 수
+        pitch_workers: 음정 분석 워커 수
+        pitch_threads: 음정 분석 워커당 스레드 수
+
+    Returns:
+        dict: {'separation': [[슬롯별 코어], ...], 'pitch': [[워커별 코어], ...]}
+    """
+    if cores is None:
+        cores = get_available_cores()
+    separation_workers = max(1, separation_workers)
+    pitch_workers = max(1, pitch_workers)
+
+    pitch_count = min(pitch_workers * pitch_threads, max(0, len(cores) - separation_workers))
+    separation_cores = cores[:len(cores) - pitch_count]
+    pitch_cores = cores[len(cores) - pitch_count:] if pitch_count else list(cores)
+
+    def split(pool: list, n_workers: int, per_worker: int) -> list:
+        if len(pool) < n_workers * per_worker:
+            # 코어가 모자라면 돌아가며 공유
+            return [[pool[(i * per_worker + j) % len(pool)] for j in range(per_worker)] for i in range(n_workers)]
+        return [pool[i * per_worker:(i + 1) * per_worker] for i in range(n_workers)]
+
+    return {
+        'separation': split(separation_cores, separation_workers, max(1, len(separation_cores) // separation_workers)),
+        'pitch': split(pitch_cores, pitch_workers, max(1, pitch_threads))
+    }
+
+
+def limit_threads(n_threads: int, use_torch: bool = False):
+    """
+    현재 프로세스의 연산 라이브러리 스레드 수 제한
+
+    Args:
+        n_threads: 최대 스레드 수
+        use_torch: torch 스레드도 제한할지 여부 (음원 분리 워커)
+    """
+    global _thread_limits
+
+    for name in THREAD_ENV_VARS:
+        os.environ[name] = str(n_threads)
+
+    # 이미 로드된 OpenMP/BLAS 라이브러리는 threadpoolctl로 제한 (librosa 의존성으로 설치됨)
+    try:
+        from threadpoolctl import threadpool_limits
+        _thread_limits = threadpool_limits(limits=n_threads)
+    except ImportError:
+        pass
+
+    # librosa(pyin)가 사용하는 numba 병렬 스레드
+    import numba
+    numba.set_num_threads(min(n_threads, numba.config.NUMBA_NUM_THREADS))
+
+    if use_torch:
+        import torch as th  # pyright: ignore[reportMissingImports]
+        th.set_num_threads(n_threads)
+        try:
+            # 연산 간 병렬 실행은 쓰지 않으므로 1로 고정 (첫 연산 전에만 설정 가능)
+            th.set_num_interop_threads(1)
+        except RuntimeError:
+            pass
+
+
+def configure_worker(role: str, index: int, plan: dict = None):
+    """
+    워커 프로세스에 코어 배정 (스레드 수 제한, CPU_PINNING이면 코어 고정)
+
+    Args:
+        role: 'separation' 또는 'pitch'
+        index: 같은 역할 워커 중 순번
+        plan: 코어 배분 계획 (None이면 설정값으로 생성)
+    """
+    global _worker_cores, _worker_role, _worker_index
+
+    if plan is None:
+        plan = plan_cpu_allocation()
+    slots = plan[role]
+    cores = slots[index % len(slots)]
+    _worker_cores = cores  # 하위 풀(분할 pyin)은 이 코어를 나눠 사용
+    _worker_role = role
+    _worker_index = index
+
+    if not CPU_SCHEDULING:
+        return
+
+    pinned = False
+    if CPU_PINNING and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, cores)
+        pinned = True
+
+    limit_threads(len(cores), use_torch=role == 'separation' and not USE_EXTERNAL_SEPARATOR)
+    print(f"[{role} worker {index}] threads: {len(cores)}, cores: {cores}{' (pinned)' if pinned else ''}")
+
+
+def configure_shared_process():
+    """
+    스레드 실행기용 설정 (분리/음정 분석이 모두 API 프로세스의 스레드에서 실행)
+
+    OpenMP/torch 스레드 수는 프로세스 단위라 역할별로 나눌 수 없으므로,
+    동시에 실행되는 분리 슬롯 하나가 쓸 코어 수로 제한하고 코어 고정은 하지 않음
+    """
+    global _shared_process_configured
+    if not CPU_SCHEDULING or _shared_process_configured:
+        return
+    _shared_process_configured = True
+
+    n_threads = len(plan_cpu_allocation()['separation'][0])
+    limit_threads(n_threads, use_torch=not USE_EXTERNAL_SEPARATOR)
+    print(f"[shared process] threads: {n_threads}")
+
+
+def get_process_cores(role: str = 'pitch') -> list:
+    """
+    현재 프로세스가 쓸 수 있는 코어 몫 (하위 풀 크기/코어 배정용)
+
+    - 같은 역할의 프로세스 풀 워커: configure_worker에서 배정된 코어
+    - 다른 역할의 프로세스 풀 워커(구간별 분리 중 음정 분석을 하는 분리 워커): 그 역할의 코어를
+      같은 역할 워커끼리 나눈 몫 (구간별 분리에서는 음정 분석 워커가 쓰이지 않음)
+    - API 프로세스(스레드 실행기): 역할 전체에 배정된 코어 (같은 역할의 스레드가 하나의 하위 풀을 공유)
+    """
+    if _worker_cores is not None and _worker_role == role:
+        return list(_worker_cores)
+
+    plan = plan_cpu_allocation()
+    cores = sorted({core for slot in plan[role] for core in slot})
+    if _worker_role is not None:
+        n_workers = len(plan[_worker_role])
+        share = cores[_worker_index % n_workers::n_workers]
+        return share or [cores[_worker_index % len(cores)]]
+    return cores
+
+
+def _init_chunk_worker(cores: list, counter):
+    """하위 풀 워커 초기화 (부모 프로세스 코어 중 하나를 배정, 스레드 1개로 제한)"""
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    if not CPU_SCHEDULING:
+        return
+
+    core = cores[index % len(cores)]
+    pinned = False
+    if CPU_PINNING and hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, [core])
+        pinned = True
+
+    limit_threads(1)
+    print(f"[chunk worker {index}] parent pid: {os.getppid()}, core: {core}{' (pinned)' if pinned else ''}")
+
+
+def chunk_pool_initializer(mp_context, cores: list) -> tuple:
+    """
+    워커 안에서 만드는 하위 ProcessPoolExecutor용 initializer/initargs 생성
+
+    하위 풀 워커는 부모 워커에 배정된 코어(cores)를 하나씩 나눠 쓰므로
+    다른 워커의 코어를 침범하지 않음 (spawn된 프로세스는 부모의 코어 고정도 물려받음)
+
+    Args:
+        mp_context: 하위 풀의 multiprocessing context
+        cores: 나눠 쓸 코어 목록 (get_process_cores())
+
+    Returns:
+        tuple: (initializer, initargs)
+    """
+    counter = mp_context.Value('i', 0)
+    return _init_chunk_worker, (cores, counter)
+
+
+def _init_pool_worker(role: str, counter, initializer):
+    """프로세스 풀 워커 초기화 (순번 배정 -> 코어 배정 -> 추가 초기화)"""
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    configure_worker(role, index)
+    if initializer is not None:
+        initializer()
+
+
+def pool_initializer(role: str, mp_context, initializer=None) -> tuple:
+    """
+    ProcessPoolExecutor용 initializer/initargs 생성
+
+    Args:
+        role: 'separation' 또는 'pitch'
+        mp_context: 프로세스 풀의 multiprocessing context
+        initializer: 코어 배정 후 추가로 실행할 함수
+
+    Returns:
+        tuple: (initializer, initargs)
+    """
+    counter = mp_context.Value('i', 0)  # 워커 순번 (워커끼리 공유)
+    return _init_pool_worker, (role, counter, initializer)
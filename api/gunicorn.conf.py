@@ -9,11 +9,20 @@ bind = "0.0.0.0:5000"
 backlog = 2048
 
 # Worker 프로세스
-# demucs가 GPU/CPU를 많이 사용하므로 1개씩 순차 처리 (리소스 제한 환경)
-# 트래픽 증가 및 하드웨어 업그레이드 시 2~4로 증가 권장
-workers = int(os.environ.get("GUNICORN_WORKERS", "1"))
-worker_class = "sync"  # 오디오 처리는 CPU 집약적이므로 sync worker 사용
-max_requests = 0  # Worker 재시작 비활성화 (인메모리 job_queue 유지를 위해 필수)
+# JOB_STORE=memory: 대기열이 worker 메모리에 있으므로 반드시 1개, 재시작 비활성화
+# JOB_STORE=sqlite: 여러 worker가 대기열을 공유하므로 증가 및 주기적 재시작 가능
+# (음원 분리 슬롯은 worker마다 SEPARATION_WORKERS개씩 생김)
+_shared_job_store = os.environ.get("JOB_STORE", "memory").lower() != "memory"
+workers = int(os.environ.get("GUNICORN_WORKERS", "1")) if _shared_job_store else 1
+# 오디오 처리는 실행기 풀에서 하므로 요청 스레드는 대부분 대기(SSE/long-poll)에 쓰임
+# SSE 스트림/long-poll 하나가 스레드 하나를 최대 JOB_EVENTS_MAX_SECONDS 동안 차지하므로
+# 동시 대기는 JOB_WAITERS_MAX(기본 threads의 3/4)개로 제한하고, 넘으면 503 + Retry-After로 거절
+# 크기 산정: 동시 대기 연결 수 ≈ 상태를 구독 중인 클라이언트(탭) 수
+#   threads >= 동시 대기 연결 수 / workers + 업로드/취소/지표 요청용 여유 (기본 64)
+#   대기 스레드는 CPU를 쓰지 않고 스레드당 스택 메모리(약 8MB 가상, 실사용 수십KB)만 차지
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", "256"))
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "0")) if _shared_job_store else 0
 timeout = 600  # 오디오 처리 시간을 고려한 긴 타임아웃 (10분, nginx와 동일)
 
 # 로깅
@@ -31,6 +40,11 @@ def post_fork(server, worker):
     """Worker 생성 후 - PID 로깅"""
     server.log.info(f"Worker spawned (pid: {worker.pid})")
 
+def post_worker_init(worker):
+    """Worker 앱 로드 후 - MinIO/대기열 초기화 (spawn된 실행기 풀 워커에서는 실행되지 않음)"""
+    from app import init_app
+    init_app()
+
 def worker_abort(worker):
     """Worker 타임아웃 - 경고 로깅"""
     worker.log.warning(f"Worker timeout (pid: {worker.pid})")
@@ -0,0 +1,71 @@
+"""
+외부 분석 서버용 HTTP 세션 관리 모듈
+
+프로세스당 하나의 requests.Session을 공유하여 TCP/TLS 연결을 재사용하고,
+연결 실패 시 backoff 재시도를 적용
+"""
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from config import (
+    ANALYSIS_POOL_SIZE,
+    ANALYSIS_MAX_RETRIES,
+    ANALYSIS_RETRY_BACKOFF
+)
+
+
+_session = None
+_adapter = None
+_session_lock = threading.Lock()
+
+
+def get_analysis_session() -> requests.Session:
+    """분석 서버용 공유 세션 반환 (최초 호출 시 생성)"""
+    global _session, _adapter
+    with _session_lock:
+        if _session is None:
+            # 연결 단계 오류만 재시도 (요청이 전송되기 전이므로 POST도 안전)
+            retry = Retry(
+                total=ANALYSIS_MAX_RETRIES,
+                connect=ANALYSIS_MAX_RETRIES,
+                read=0,
+                status=0,
+                other=0,
+                backoff_factor=ANALYSIS_RETRY_BACKOFF
+            )
+            _adapter = HTTPAdapter(
+                pool_connections=1,  # 분석 서버 호스트 하나만 사용
+                pool_maxsize=ANALYSIS_POOL_SIZE,
+                max_retries=retry
+            )
+            session = requests.Session()
+            session.mount('http://', _adapter)
+            session.mount('https://', _adapter)
+            _session = session
+        return _session
+
+
+def get_connection_stats() -> dict:
+    """
+    현재 프로세스의 분석 서버 연결 통계 반환
+
+    Returns:
+        dict: {'requests': 보낸 요청 수, 'new_connections': 새로 연 연결 수,
+               'reused_connections': 기존 연결을 재사용한 요청 수}
+    """
+    stats = {'requests': 0, 'new_connections': 0, 'reused_connections': 0}
+    if _adapter is None:
+        return stats
+
+    pools = _adapter.poolmanager.pools
+    for key in list(pools.keys()):
+        pool = pools.get(key)
+        if pool is None:
+            continue
+        stats['requests'] += pool.num_requests
+        stats['new_connections'] += pool.num_connections
+
+    stats['reused_connections'] = max(0, stats['requests'] - stats['new_connections'])
+    return stats
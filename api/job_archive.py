@@ -0,0 +1,96 @@
+"""
+작업 결과 보관 모듈
+
+보관 기간이 지나 작업 저장소에서 정리되는 완료/실패 작업의 상태를 MinIO에 옮겨 두고,
+저장소에 없는 작업을 조회할 때 대신 읽어 응답 (JOB_ARCHIVE_ENABLED)
+결과의 presigned URL이 만료되는 JOB_ARCHIVE_TTL_HOURS가 지나면 삭제
+"""
+import json
+import time
+from io import BytesIO
+from minio import Minio
+
+from config import SEPARATED_BUCKET, JOB_ARCHIVE_TTL_HOURS
+from metrics import add_storage_bytes
+
+
+ARCHIVE_PREFIX = 'jobs'  # SEPARATED_BUCKET 내 보관 작업 저장 경로
+ARCHIVED_FIELDS = ('status', 'profile', 'result', 'error', 'timings', 'created_at', 'finished_at')
+
+
+def _object_name(job_id: str) -> str:
+    return f"{ARCHIVE_PREFIX}/{job_id}.json"
+
+
+def _is_expired(finished_at: float) -> bool:
+    return time.time() - finished_at > JOB_ARCHIVE_TTL_HOURS * 3600
+
+
+def archive_job(minio_client: Minio, job_id: str, job: dict):
+    """
+    완료/실패 작업의 상태를 MinIO에 저장
+
+    Args:
+        minio_client: MinIO 클라이언트 인스턴스
+        job_id: 작업 ID
+        job: 작업 정보 (조회 응답에 필요한 필드만 저장)
+    """
+    entry = {field: job.get(field) for field in ARCHIVED_FIELDS}
+    data = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+
+    minio_client.put_object(
+        SEPARATED_BUCKET,
+        _object_name(job_id),
+        BytesIO(data),
+        len(data),
+        content_type='application/json'
+    )
+    add_storage_bytes('upload', len(data))
+
+
+def load_archived_job(minio_client: Minio, job_id: str):
+    """
+    보관된 작업 상태 읽기
+
+    Returns:
+        dict: 작업 정보 또는 없거나 만료되었으면 None
+    """
+    try:
+        response = minio_client.get_object(SEPARATED_BUCKET, _object_name(job_id))
+        try:
+            data = response.read()
+            add_storage_bytes('download', len(data))
+            job = json.loads(data)
+        finally:
+            response.close()
+            response.release_conn()
+    except Exception:
+        return None
+
+    if _is_expired(job.get('finished_at') or 0):
+        _remove_archived_job(minio_client, job_id)
+        return None
+    return job
+
+
+def _remove_archived_job(minio_client: Minio, job_id: str):
+    try:
+        minio_client.remove_object(SEPARATED_BUCKET, _object_name(job_id))
+    except Exception as e:
+        print(f"Failed to remove archived job {job_id}: {str(e)}")
+
+
+def remove_expired_archives(minio_client: Minio) -> int:
+    """
+    만료된 보관 작업 삭제 (조회되지 않은 항목 정리)
+
+    Returns:
+        int: 삭제한 항목 수
+    """
+    removed = 0
+    for obj in minio_client.list_objects(SEPARATED_BUCKET, prefix=f"{ARCHIVE_PREFIX}/"):
+        if obj.last_modified is None or not _is_expired(obj.last_modified.timestamp()):
+            continue
+        _remove_archived_job(minio_client, obj.object_name[len(ARCHIVE_PREFIX) + 1:-len('.json')])
+        removed += 1
+    return removed
@@ -0,0 +1,148 @@
+"""
+작업 소요 시간 예측 모듈
+
+완료된 작업 기록(프로필, 음원 길이, 단계별 소요 시간)으로 프로필/단계마다
+소요 시간 = 고정 시간 + 음원 1초당 시간 × 음원 길이
+를 최소제곱으로 맞춰 대기/처리 중인 작업의 남은 시간을 예측
+- separation: 분리 슬롯을 잡은 시점부터 분리 결과를 받을 때까지
+- pitch: 분리 이후 완료까지 (분리 파일 전송, 음정 분석, 결과 정리)
+기록은 JOB_HISTORY_PATH(JSON)에 저장되어 재시작 후에도 유지 (gunicorn worker마다 따로 학습)
+"""
+import json
+import os
+import threading
+from collections import deque
+
+from config import JOB_HISTORY_PATH, JOB_HISTORY_MAX_ENTRIES
+
+
+ESTIMATE_STAGES = ('separation', 'pitch')
+MIN_SAMPLES_FOR_FIT = 3        # 직선을 맞출 최소 기록 수 (미만이면 음원 1초당 평균 시간 사용)
+DEFAULT_AUDIO_SECONDS = 210.0  # 음원 길이를 모를 때 가정하는 길이 (초)
+# 기록이 하나도 없을 때 사용하는 음원 1초당 소요 시간 (CPU 기준 대략값)
+DEFAULT_SECONDS_PER_AUDIO_SECOND = {'separation': 1.0, 'pitch': 0.3}
+
+
+class JobEstimator:
+    """완료 기록 기반 단계별 소요 시간 예측기"""
+
+    def __init__(self, path: str, max_entries: int):
+        """
+        Args:
+            path: 기록 파일 경로 (비우면 저장하지 않음)
+            max_entries: 보관할 최근 기록 수
+        """
+        self.path = path
+        self.history = deque(maxlen=max_entries)  # [{profile, duration, seconds: {단계: 초}}, ...]
+        self.models = {}  # {(profile, stage): (고정 시간, 음원 1초당 시간)}
+        self.lock = threading.Lock()
+        self._load()
+
+    def _load(self):
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                self.history.extend(json.load(f))
+            self._fit()
+            print(f"Loaded {len(self.history)} job history entries for ETA estimation")
+        except (OSError, ValueError) as e:
+            print(f"Failed to load job history: {str(e)}")
+
+    def _save(self, entries: list):
+        if not self.path:
+            return
+        try:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            # 쓰는 도중 다른 worker가 읽어도 깨지지 않도록 임시 파일에 쓴 뒤 교체
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            os.replace(temp_path, self.path)
+        except OSError as e:
+            print(f"Failed to save job history: {str(e)}")
+
+    def _fit(self):
+        """프로필/단계별 직선 다시 맞추기 (lock 안에서 호출)"""
+        samples = {}  # {(profile, stage): [(음원 길이, 소요 시간), ...]}
+        for entry in self.history:
+            for stage, seconds in entry['seconds'].items():
+                samples.setdefault((entry['profile'], stage), []).append((entry['duration'], seconds))
+
+        models = {}
+        for key, points in samples.items():
+            total_duration = sum(d for d, _ in points)
+            total_seconds = sum(t for _, t in points)
+            ratio_model = (0.0, total_seconds / total_duration) if total_duration > 0 else (total_seconds / len(points), 0.0)
+
+            if len(points) < MIN_SAMPLES_FOR_FIT:
+                models[key] = ratio_model
+                continue
+
+            mean_d = total_duration / len(points)
+            mean_t = total_seconds / len(points)
+            var_d = sum((d - mean_d) ** 2 for d, _ in points)
+            if var_d == 0:
+                models[key] = ratio_model
+                continue
+
+            slope = sum((d - mean_d) * (t - mean_t) for d, t in points) / var_d
+            intercept = mean_t - slope * mean_d
+            # 길이가 비슷한 기록만 있으면 기울기가 음수/절편이 음수로 나올 수 있어 비율 모델 사용
+            models[key] = (intercept, slope) if slope >= 0 and intercept >= 0 else ratio_model
+        self.models = models
+
+    def record(self, profile: str, duration: float, stage_seconds: dict):
+        """
+        완료된 작업 기록 추가
+
+        Args:
+            profile: 분리 프로필 이름 (외부 서버 분리는 'external')
+            duration: 음원 길이 (초)
+            stage_seconds: {단계 이름: 소요 시간(초)} (ESTIMATE_STAGES만 사용)
+        """
+        if not duration or duration <= 0:
+            return
+        entry = {
+            'profile': profile,
+            'duration': float(duration),
+            'seconds': {stage: float(seconds) for stage, seconds in stage_seconds.items() if stage in ESTIMATE_STAGES}
+        }
+        with self.lock:
+            self.history.append(entry)
+            self._fit()
+            entries = list(self.history)
+        self._save(entries)
+
+    def predict(self, profile: str, duration: float = None) -> dict:
+        """
+        단계별 예상 소요 시간
+
+        Args:
+            profile: 분리 프로필 이름
+            duration: 음원 길이 (초, 모르면 DEFAULT_AUDIO_SECONDS)
+
+        Returns:
+            dict: {단계 이름: 예상 시간(초)}
+        """
+        if not duration or duration <= 0:
+            duration = DEFAULT_AUDIO_SECONDS
+
+        with self.lock:
+            models = self.models
+
+        prediction = {}
+        for stage in ESTIMATE_STAGES:
+            model = models.get((profile, stage))
+            if model is None:
+                # 해당 프로필 기록이 없으면 다른 프로필 기록 중 가장 느린 값, 그것도 없으면 기본값
+                slopes = [m[1] for (_, s), m in models.items() if s == stage]
+                model = (0.0, max(slopes) if slopes else DEFAULT_SECONDS_PER_AUDIO_SECOND[stage])
+            intercept, slope = model
+            prediction[stage] = intercept + slope * duration
+        return prediction
+
+
+job_estimator = JobEstimator(JOB_HISTORY_PATH, JOB_HISTORY_MAX_ENTRIES)
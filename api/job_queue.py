@@ -1,92 +1,231 @@
 """
-작업 대기열 관리 모듈 (인메모리)
+작업 대기열 관리 모듈
 
-동시 요청 시 순차 처리를 위한 대기열 시스템
+동시 요청을 대기열에 쌓고, 음원 분리 슬롯(SEPARATION_WORKERS)이 빌 때마다
+순서대로 꺼내 실행하는 시스템. 음정 분석은 별도의 더 넓은 풀에서 실행
+작업 상태는 작업 저장소(JOB_STORE)에 보관하고, 상태가 바뀔 때마다
+상태 알림 대기자(SSE/long-poll)를 깨움. 상태 조회에는 진행률과
+완료 기록으로 학습한 예상 시간(ETA)을 함께 반환
+끝난 작업은 보관 기간/개수 제한(JOB_RETENTION_*)에 따라 주기적으로 저장소에서 정리
+같은 파일 + 같은 분석 조건의 요청은 대기/처리 중인 작업에 연결(attached)하여 결과를 함께 사용
+취소된 작업은 대기열에서 빠지고, 처리 중이면 다음 단계/구간 경계에서 중단한 뒤 파일 정리
 """
+import heapq
+from concurrent.futures import wait as wait_futures
 import threading
+import time
 import uuid
 import os
-from collections import deque
 from datetime import datetime
 from minio import Minio
 
 from config import (
     ORIGINAL_BUCKET,
     USE_EXTERNAL_SEPARATOR,
-    MAX_QUEUE_SIZE
+    MAX_QUEUE_SIZE,
+    SEPARATION_WORKERS,
+    PITCH_WORKERS,
+    JOB_STORE,
+    JOB_POLL_INTERVAL,
+    DEFAULT_SEPARATION_PROFILE,
+    MAX_QUEUE_WAIT_SECONDS,
+    ADMISSION_MODE,
+    JOB_RETENTION_SECONDS,
+    JOB_RETENTION_MAX_JOBS,
+    JOB_CLEANUP_INTERVAL,
+    JOB_ABANDON_SECONDS,
+    JOB_ARCHIVE_ENABLED,
+    JOB_COALESCE_ENABLED,
+    RESULT_CACHE_ENABLED,
+    JOB_WAITERS_MAX,
+    SEPARATION_WINDOW_SECONDS
 )
-from services import (
-    send_file_to_analysis_server,
-    analyze_vocal_pitch_from_minio,
-    download_and_save_separated_files,
-    separate_audio_locally
+from tasks import (
+    create_executor,
+    init_separation_worker,
+    run_separation,
+    run_pitch_analysis
 )
+from services import start_separated_file_transfers, remove_job_files
+from http_client import get_connection_stats
 from storage import generate_presigned_url
+from result_cache import build_cache_key, store_result, remove_expired_entries
+from job_store import create_job_store
+from job_archive import archive_job, load_archived_job, remove_expired_archives
+from metrics import Counter, Gauge, jobs_in_progress, record_job_timings, merge_counters, track_stages
+from job_estimator import job_estimator
+from progress import (
+    set_listener as set_progress_listener,
+    JobCancelled,
+    cancel as cancel_running_job,
+    clear_cancelled,
+    is_cancelled,
+    expect_transfers,
+    forget_transfers
+)
+from job_scheduler import order_jobs, choose_next, DEFAULT_PRIORITY
 
 
-# ===== 대기열 상태 (인메모리) =====
-job_queue = {}          # {job_id: {status, position, result, file_info, ...}}
-waiting_list = deque()  # 대기 중인 job_id 순서
-queue_lock = threading.Lock()  # 스레드 안전을 위한 락
+# ===== 대기열 상태 =====
+job_store = create_job_store()  # 작업 정보 + 대기 순서
 job_event = threading.Event()  # 작업 도착 신호 (polling 대신 사용)
+job_updates = threading.Condition()  # 작업 상태 변경 신호 (상태 알림 대기자용)
+job_update_version = 0  # 상태가 바뀔 때마다 증가
+separation_slots = threading.BoundedSemaphore(SEPARATION_WORKERS)  # 음원 분리 동시 실행 제한
+# SSE/long-poll 동시 대기 제한 (요청 스레드를 남겨 두기 위함, 0이면 제한 없음)
+waiter_slots = threading.BoundedSemaphore(JOB_WAITERS_MAX) if JOB_WAITERS_MAX > 0 else None
 worker_thread = None
+cleanup_thread = None   # 끝난 작업 정리 스레드 (init_queue에서 시작)
+separation_executor = None  # 음원 분리 실행기 (start_worker에서 생성)
+pitch_executor = None       # 음정 분석 실행기 (start_worker에서 생성)
 minio_client = None     # app.py에서 설정
 
+FINAL_STATUSES = ('completed', 'failed', 'cancelled')  # 더 이상 바뀌지 않는 상태
+
+# 처리 단계별 안내 메시지
+STAGE_MESSAGES = {
+    'separation': '음원 분리 중입니다...',
+    'pitch': '음정 분석 중입니다...',
+    'finalizing': '악보를 만드는 중입니다...'
+}
+
+MIN_PROGRESS_FOR_ETA = 0.05  # 보고된 진행률로 남은 시간을 계산할 최소 진행률 (미만이면 예측 시간 사용)
+ARCHIVE_SWEEP_INTERVAL = 3600  # 만료된 보관 작업 삭제 주기 (초)
+CACHE_SWEEP_INTERVAL = 3600  # 만료된 결과 캐시 항목 삭제 주기 (초)
+TOUCH_INTERVAL = 5  # 상태 조회 시각을 저장소에 기록하는 최소 간격 (초)
+STEM_TRANSFER_TIMEOUT = 600  # 분리 파일 전송 최대 대기 시간 (초, 워커가 완료를 알리지 못한 경우 대비)
+
+queue_depth = Gauge('mypitch_queue_depth', 'Jobs waiting in the queue', callback=job_store.count_waiting)
+predicted_backlog = Gauge(
+    'mypitch_predicted_backlog_seconds',
+    'Predicted seconds until all queued jobs finish separation',
+    callback=lambda: estimate_queue()['drain_seconds']
+)
+stored_jobs = Gauge('mypitch_stored_jobs', 'Jobs kept in the job store', callback=job_store.count_jobs)
+evicted_jobs = Counter('mypitch_evicted_jobs_total', 'Finished jobs removed from the job store', ('status',))
+coalesced_jobs = Counter('mypitch_coalesced_jobs_total', 'Requests attached to an identical in-flight job')
+cancelled_jobs = Counter('mypitch_cancelled_jobs_total', 'Jobs cancelled before finishing', ('reason', 'stage'))
+status_waiters = Gauge('mypitch_status_waiters', 'SSE streams and long-polls currently waiting for a status change')
+rejected_waiters = Counter('mypitch_status_waiters_rejected_total', 'SSE/long-poll requests rejected at JOB_WAITERS_MAX')
+
 
 def init_queue(client: Minio):
-    """대기열 초기화 (MinIO 클라이언트 설정)"""
+    """대기열 초기화 (MinIO 클라이언트 설정, 중단된 작업 복구)"""
     global minio_client
     minio_client = client
 
+    recovered = job_store.recover_jobs()
+    if recovered:
+        print(f"Recovered {recovered} interrupted job(s)")
+
+    start_cleanup_worker()
+
+    # 공유 저장소는 다른 worker가 추가한 작업도 처리하도록 바로 시작
+    if JOB_STORE != 'memory' or recovered:
+        start_worker()
+
+
+def notify_job_update():
+    """작업 상태 변경을 대기 중인 상태 알림 요청에 알림"""
+    global job_update_version
+    with job_updates:
+        job_update_version += 1
+        job_updates.notify_all()
+
+
+def update_job(job_id: str, **fields):
+    """작업 정보 갱신 후 상태 변경 알림"""
+    job_store.update_job(job_id, **fields)
+    notify_job_update()
+
+
+def on_progress(job_id: str, stage: str, fraction: float):
+    """실행기에서 보고한 진행률을 작업 상태에 반영 (현재 단계의 보고만 사용)"""
+    job = job_store.get_job(job_id)
+    if job is not None and job['status'] == 'processing' and job.get('stage') == stage:
+        update_job(job_id, progress=round(fraction, 2))
+        # 다른 worker가 받은 취소 요청을 실행 중인 단계에 전달
+        if job.get('cancel_requested'):
+            cancel_running_job(job_id)
+
+
+set_progress_listener(on_progress)
+
 
 def get_position(job_id: str) -> int:
-    """대기열에서 현재 위치 반환 (1부터 시작, 없으면 0)"""
-    try:
-        return list(waiting_list).index(job_id) + 1
-    except ValueError:
-        return 0
+    """대기열에서 현재 위치 반환 (스케줄러의 실행 순서 기준, 1부터 시작, 처리 중이거나 없으면 0)"""
+    for position, (waiting_job_id, _) in enumerate(order_jobs(job_store.list_jobs('waiting')), 1):
+        if waiting_job_id == job_id:
+            return position
+    return 0
 
 
 def get_queue_length() -> int:
     """현재 대기열 길이 반환"""
-    return len(waiting_list)
+    return job_store.count_waiting()
+
+
+def check_admission(duration: float, profile: str, priority: str = DEFAULT_PRIORITY) -> dict:
+    """
+    예상 대기 시간 기반 접수 판단 (파일 저장 전에 호출)
+
+    새 작업을 스케줄러 순서대로 대기열에 넣었을 때의 예상 대기 시간이
+    MAX_QUEUE_WAIT_SECONDS를 넘으면 거절(reject)하거나 low 등급으로 접수(defer)
+
+    Args:
+        duration: 음원 길이 (초, 모르면 None)
+        profile: 분리 품질 프로필 이름
+        priority: 요청한 우선순위 등급
+
+    Returns:
+        dict: {'admit': 접수 여부, 'priority': 접수할 우선순위 등급, 'expected_wait_seconds': 예상 대기 시간(초)}
+    """
+    candidate = {
+        'file_info': {'duration': duration},
+        'profile': profile,
+        'priority': priority,
+        'enqueued_at': time.time()
+    }
+    candidate['cost'] = sum(predict_job(candidate).values())
+    expected_wait = estimate_queue(extra_job=('', candidate))['waits']['']
 
+    if MAX_QUEUE_WAIT_SECONDS <= 0 or expected_wait <= MAX_QUEUE_WAIT_SECONDS:
+        return {'admit': True, 'priority': priority, 'expected_wait_seconds': expected_wait}
+    if ADMISSION_MODE == 'defer':
+        return {'admit': True, 'priority': 'low', 'expected_wait_seconds': expected_wait}
+    return {'admit': False, 'priority': priority, 'expected_wait_seconds': expected_wait}
 
-def create_job(file_info: dict, vocal_type: str) -> dict:
+
+def create_job(file_info: dict, vocal_type: str, profile: str, timings: dict = None,
+               priority: str = DEFAULT_PRIORITY) -> dict:
     """
     새 작업 생성 및 대기열에 추가
 
     Args:
-        file_info: 파일 정보 (original_filename, unique_filename, file_data 등)
+        file_info: 파일 정보 (original_filename, unique_filename, content_hash, duration 등)
         vocal_type: 보컬 타입 (female/male)
+        profile: 분리 품질 프로필 이름
+        timings: 요청 처리 중 측정한 단계 시간 (업로드 등)
+        priority: 우선순위 등급 (high/normal/low)
 
     Returns:
         dict: {job_id, status, position, message} 또는 {error, message}
     """
-    with queue_lock:
-        # 대기열 제한 확인
-        if len(waiting_list) >= MAX_QUEUE_SIZE:
-            return {
-                'error': True,
-                'message': f'현재 대기열이 가득 찼습니다 ({MAX_QUEUE_SIZE}명). 잠시 후 다시 시도해주세요.'
-            }
-
-        job_id = str(uuid.uuid4())
+    job_id = str(uuid.uuid4())
+    job = new_waiting_job(file_info, vocal_type, profile, timings, priority)
 
-        job_queue[job_id] = {
-            'status': 'waiting',
-            'file_info': file_info,
-            'vocal_type': vocal_type,
-            'result': None,
-            'error': None,
-            'created_at': datetime.now().isoformat()
+    # 대기열 제한 확인 후 추가 (처리 중인 작업은 제외, 대기 중인 작업만 계산)
+    if job_store.add_job(job_id, job, max_waiting=MAX_QUEUE_SIZE) is None:
+        return {
+            'error': True,
+            'message': f'현재 대기열이 가득 찼습니다 ({MAX_QUEUE_SIZE}명). 잠시 후 다시 시도해주세요.'
         }
-        waiting_list.append(job_id)
-        position = len(waiting_list)
+    position = get_position(job_id)
 
     # 워커 시작 및 작업 도착 신호
     start_worker()
     job_event.set()  # Worker 쓰레드에 "작업 도착" 신호
+    notify_job_update()
 
     return {
         'job_id': job_id,
@@ -96,6 +235,204 @@ def create_job(file_info: dict, vocal_type: str) -> dict:
     }
 
 
+def new_waiting_job(file_info: dict, vocal_type: str, profile: str, timings: dict = None,
+                    priority: str = DEFAULT_PRIORITY) -> dict:
+    """대기 작업 정보 생성 (예상 처리 시간, 연결용 키 포함)"""
+    job = {
+        'status': 'waiting',
+        'file_info': file_info,
+        'vocal_type': vocal_type,
+        'profile': profile,
+        'priority': priority,
+        'result': None,
+        'error': None,
+        'timings': dict(timings or {}),
+        'created_at': datetime.now().isoformat(),
+        'enqueued_at': time.time()
+    }
+    # 스케줄러(sjf)가 비교할 예상 처리 시간
+    job['cost'] = sum(predict_job(job).values())
+    # 같은 요청을 이 작업에 연결하기 위한 키 (결과 캐시 키와 동일)
+    if file_info.get('content_hash'):
+        job['dedup_key'] = build_cache_key(file_info['content_hash'], vocal_type, profile)
+    return job
+
+
+def create_completed_job(result: dict, vocal_type: str, profile: str) -> dict:
+    """
+    이미 결과가 있는 작업 생성 (캐시 적중 시 대기열 없이 바로 완료)
+
+    Args:
+        result: 작업 결과 (clef, original_filename, file_url, notes)
+        vocal_type: 보컬 타입 (female/male)
+        profile: 분리 품질 프로필 이름
+
+    Returns:
+        dict: {job_id, status, message}
+    """
+    job_id = str(uuid.uuid4())
+
+    job_store.add_job(job_id, {
+        'status': 'completed',
+        'file_info': None,
+        'vocal_type': vocal_type,
+        'profile': profile,
+        'result': result,
+        'error': None,
+        'created_at': datetime.now().isoformat(),
+        'finished_at': time.time()
+    })
+
+    return {
+        'job_id': job_id,
+        'status': 'completed',
+        'message': '완료되었습니다.'
+    }
+
+
+def find_inflight_job(dedup_key: str) -> str:
+    """같은 키로 대기/처리 중인 작업 ID 반환 (없으면 None)"""
+    for status in ('processing', 'waiting'):
+        for job_id, job in job_store.list_jobs(status):
+            if job.get('dedup_key') == dedup_key and not job.get('cancel_requested'):
+                return job_id
+    return None
+
+
+def attach_to_inflight_job(content_hash: str, vocal_type: str, profile: str, original_filename: str) -> dict:
+    """
+    같은 파일 + 같은 분석 조건으로 대기/처리 중인 작업이 있으면 그 작업에 연결된 작업 생성
+    (연결된 작업은 대기열 자리를 차지하지 않고, 원래 작업이 끝나면 같은 결과로 완료)
+
+    Args:
+        content_hash: 업로드 파일 해시
+        vocal_type: 보컬 타입 (female/male)
+        profile: 분리 품질 프로필 이름
+        original_filename: 이번 요청의 원본 파일명
+
+    Returns:
+        dict: {job_id, status, position, message} 또는 연결할 작업이 없으면 None
+    """
+    if not JOB_COALESCE_ENABLED:
+        return None
+
+    primary_job_id = find_inflight_job(build_cache_key(content_hash, vocal_type, profile))
+    if primary_job_id is None:
+        return None
+
+    job_id = str(uuid.uuid4())
+    job_store.add_job(job_id, {
+        'status': 'attached',
+        'primary_job_id': primary_job_id,
+        'file_info': {'original_filename': original_filename},
+        'vocal_type': vocal_type,
+        'profile': profile,
+        'result': None,
+        'error': None,
+        'created_at': datetime.now().isoformat()
+    })
+
+    # 찾은 뒤 연결하기 전에 원래 작업이 취소되었으면 (취소 시점에는 연결된 작업이 없었음)
+    # 연결을 되돌리고 새 작업으로 처리 (이미 다른 작업으로 다시 연결되었으면 그대로 사용)
+    primary = job_store.get_job(primary_job_id)
+    if primary is None or primary['status'] == 'cancelled' or primary.get('cancel_requested'):
+        current = job_store.get_job(job_id)
+        if current is not None and current.get('primary_job_id') == primary_job_id:
+            job_store.remove_jobs([job_id])
+            print(f"[{job_id}] In-flight job {primary_job_id} was cancelled, enqueueing a new job")
+            return None
+
+    # 연결하는 사이에 원래 작업이 끝났으면 바로 결과 반영
+    settle_attached_jobs(primary_job_id)
+    coalesced_jobs.inc()
+    print(f"[{job_id}] Attached to in-flight job {primary_job_id}")
+
+    status = get_job_status(job_id)
+    return {
+        'job_id': job_id,
+        'status': status['status'],
+        'position': status.get('position', 0),
+        'message': status['message']
+    }
+
+
+def promote_attached_jobs(primary_job_id: str, primary: dict) -> str:
+    """
+    취소된 작업에 연결된 작업이 있으면 같은 파일로 새 대기 작업을 만들고 다시 연결
+    (취소 확인과 연결이 동시에 일어나 취소하지 않은 요청까지 취소되는 것 방지, 원본 파일 삭제 전에 호출)
+
+    Args:
+        primary_job_id: 취소된 작업 ID
+        primary: 취소된 작업 정보
+
+    Returns:
+        str: 새 대기 작업 ID (연결된 작업이 없으면 None)
+    """
+    attached = [
+        job_id for job_id, job in job_store.list_jobs('attached')
+        if job.get('primary_job_id') == primary_job_id
+    ]
+    if not attached:
+        return None
+
+    # 연결된 작업은 대기열 자리를 차지하지 않았으므로 대기열 제한 없이 추가
+    job_id = str(uuid.uuid4())
+    job = new_waiting_job(
+        primary['file_info'],
+        primary['vocal_type'],
+        primary.get('profile', DEFAULT_SEPARATION_PROFILE),
+        priority=primary.get('priority', DEFAULT_PRIORITY)
+    )
+    job_store.add_job(job_id, job)
+    for attached_job_id in attached:
+        job_store.update_job(attached_job_id, primary_job_id=job_id)
+    print(f"[{job_id}] Re-enqueued cancelled job {primary_job_id} for {len(attached)} attached request(s)")
+
+    start_worker()
+    job_event.set()
+    notify_job_update()
+    return job_id
+
+
+def settle_attached_jobs(primary_job_id: str):
+    """
+    원래 작업이 끝났으면 연결된 작업에 같은 결과 반영 (원본 파일명은 각 요청의 것 사용)
+    원래 작업이 취소되었으면 취소 상태는 넘기지 않음 (promote_attached_jobs로 다시 연결하지 못한 경우 실패 처리)
+    """
+    primary = job_store.get_job(primary_job_id)
+    if primary is None or primary['status'] not in FINAL_STATUSES:
+        return
+
+    settled = False
+    for job_id, job in job_store.list_jobs('attached'):
+        if job.get('primary_job_id') != primary_job_id:
+            continue
+        if primary['status'] == 'cancelled':
+            job_store.update_job(
+                job_id,
+                status='failed',
+                error='같은 파일을 처리하던 작업이 취소되었습니다. 다시 요청해주세요.',
+                finished_at=primary.get('finished_at', time.time())
+            )
+            settled = True
+            continue
+        result = primary['result']
+        if result is not None:
+            original_filename = os.path.splitext(job['file_info']['original_filename'])[0]
+            result = dict(result, original_filename=original_filename)
+        job_store.update_job(
+            job_id,
+            status=primary['status'],
+            result=result,
+            error=primary['error'],
+            finished_at=primary.get('finished_at', time.time())
+        )
+        settled = True
+
+    if settled:
+        notify_job_update()
+
+
 def get_job_status(job_id: str) -> dict:
     """
     작업 상태 조회
@@ -106,23 +443,64 @@ def get_job_status(job_id: str) -> dict:
     Returns:
         dict: 상태 정보 또는 None
     """
-    if job_id not in job_queue:
+    job = job_store.get_job(job_id)
+    if job is None and JOB_ARCHIVE_ENABLED:
+        # 보관 기간이 지나 저장소에서 정리된 작업
+        job = load_archived_job(minio_client, job_id)
+    if job is None:
         return None
 
-    job = job_queue[job_id]
+    if job['status'] == 'attached':
+        # 원래 작업의 상태를 이 작업 ID로 응답
+        response = get_job_status(job['primary_job_id'])
+        if response is None:
+            return {
+                'job_id': job_id,
+                'status': 'failed',
+                'profile': job.get('profile'),
+                'message': '처리 중 오류가 발생했습니다.',
+                'error': '연결된 작업을 찾을 수 없습니다.',
+                'state': 'failed:0::0'
+            }
+        response['job_id'] = job_id
+        response.pop('timings', None)
+        if response.get('result') is not None:
+            original_filename = os.path.splitext(job['file_info']['original_filename'])[0]
+            response['result'] = dict(response['result'], original_filename=original_filename)
+        return response
 
     response = {
         'job_id': job_id,
-        'status': job['status']
+        'status': job['status'],
+        'profile': job.get('profile')
     }
+    position = 0
+
+    if job.get('timings'):
+        response['timings'] = job['timings']
 
     if job['status'] == 'waiting':
         position = get_position(job_id)
         response['position'] = position
         response['message'] = f'현재 대기 인원 중 {position}번째입니다.'
 
+        # 분리 시작까지 예상 대기 시간 + 예상 처리 시간
+        wait = estimate_queue()['waits'].get(job_id, 0.0)
+        response['expected_wait_seconds'] = round(wait)
+        response['eta_seconds'] = round(wait + sum(predict_job(job).values()))
+
     elif job['status'] == 'processing':
-        response['message'] = '악보 분석 중입니다...'
+        response['stage'] = job.get('stage')
+        response['message'] = STAGE_MESSAGES.get(job.get('stage'), '악보 분석 중입니다...')
+        if job.get('cancel_requested'):
+            response['message'] = '작업을 취소하는 중입니다.'
+
+        now = time.time()
+        remaining = estimate_remaining(job, now)['total']
+        elapsed = now - job.get('started_at', now)
+        response['stage_progress'] = job.get('progress')
+        response['progress'] = round(elapsed / (elapsed + remaining), 2) if elapsed + remaining > 0 else 0.0
+        response['eta_seconds'] = round(remaining)
 
     elif job['status'] == 'completed':
         response['message'] = '완료되었습니다.'
@@ -132,63 +510,383 @@ def get_job_status(job_id: str) -> dict:
         response['message'] = '처리 중 오류가 발생했습니다.'
         response['error'] = job['error']
 
+    elif job['status'] == 'cancelled':
+        response['message'] = '작업이 취소되었습니다.'
+
+    # 상태 비교용 토큰 (상태 알림에서 변경 여부 판단, long-poll 요청에 그대로 전달)
+    # 시간에 따라 계속 바뀌는 ETA는 제외하고, 실행기에서 보고한 진행률(1% 단위)만 포함
+    stage_percent = round((job.get('progress') or 0) * 100) if job['status'] == 'processing' else 0
+    response['state'] = f"{job['status']}:{position}:{response.get('stage') or ''}:{stage_percent}"
     return response
 
 
-def process_job(job_id: str):
+def touch_job(job_id: str):
+    """상태 조회 시각 기록 (JOB_ABANDON_SECONDS 동안 조회가 없는 대기 작업은 취소)"""
+    if JOB_ABANDON_SECONDS <= 0:
+        return
+    job = job_store.get_job(job_id)
+    now = time.time()
+    if job is not None and job['status'] == 'waiting' and now - job.get('last_seen_at', 0) >= TOUCH_INTERVAL:
+        job_store.update_job(job_id, last_seen_at=now)
+
+
+def cancel_job(job_id: str, reason: str = 'requested') -> dict:
+    """
+    작업 취소
+
+    대기 중인 작업은 대기열에서 빼고 원본 파일을 삭제하며, 처리 중인 작업은
+    취소를 표시하여 다음 단계/구간 경계에서 중단 (process_job에서 파일 정리)
+    같은 결과를 기다리는 연결된 작업이 있으면 취소하지 않음
+
+    Args:
+        job_id: 작업 ID
+        reason: 취소 사유 (requested: 사용자 요청, abandoned: 상태 조회 없음)
+
+    Returns:
+        dict: {job_id, status, message} (처리 중이면 status는 processing),
+              취소할 수 없으면 {error, status, message}, 작업이 없으면 None
+    """
+    job = job_store.get_job(job_id)
+    if job is None:
+        return None
+
+    if job['status'] == 'attached':
+        # 연결된 작업은 기록만 삭제 (원래 작업은 계속 진행)
+        job_store.remove_jobs([job_id])
+        notify_job_update()
+        return {'job_id': job_id, 'status': 'cancelled', 'message': '작업이 취소되었습니다.'}
+
+    if any(attached.get('primary_job_id') == job_id for _, attached in job_store.list_jobs('attached')):
+        return {
+            'error': True,
+            'status': job['status'],
+            'message': '같은 파일을 기다리는 다른 요청이 있어 작업을 계속 진행합니다.'
+        }
+
+    if job['status'] == 'waiting':
+        if job_store.cancel_waiting_job(job_id):
+            update_job(job_id, cancel_reason=reason, finished_at=time.time())
+            cancelled_jobs.inc(reason=reason, stage='waiting')
+            print(f"[{job_id}] Job cancelled while waiting ({reason})")
+            # 확인 후 취소 전에 연결된 요청이 있으면 파일을 넘겨 새 작업으로 처리
+            if promote_attached_jobs(job_id, job) is None:
+                try:
+                    remove_job_files(job['file_info'], minio_client)
+                except Exception as e:
+                    print(f"[{job_id}] Failed to remove job files: {str(e)}")
+            return {'job_id': job_id, 'status': 'cancelled', 'message': '작업이 취소되었습니다.'}
+        # 그 사이 처리가 시작되었거나 끝남
+        job = job_store.get_job(job_id) or job
+
+    if job['status'] != 'processing':
+        return {'error': True, 'status': job['status'], 'message': '이미 끝난 작업입니다.'}
+
+    update_job(job_id, cancel_requested=True, cancel_reason=reason)
+    cancel_running_job(job_id)
+    return {'job_id': job_id, 'status': 'processing', 'message': '작업을 취소하는 중입니다.'}
+
+
+def cancel_abandoned_jobs(now: float = None) -> int:
+    """
+    JOB_ABANDON_SECONDS 동안 상태 조회가 없는 대기 작업 취소
+
+    Returns:
+        int: 취소한 작업 수
+    """
+    if JOB_ABANDON_SECONDS <= 0:
+        return 0
+    if now is None:
+        now = time.time()
+
+    cancelled = 0
+    for job_id, job in job_store.list_jobs('waiting'):
+        last_seen = job.get('last_seen_at') or job.get('enqueued_at') or now
+        if now - last_seen <= JOB_ABANDON_SECONDS:
+            continue
+        result = cancel_job(job_id, reason='abandoned')
+        if result and result['status'] == 'cancelled':
+            cancelled += 1
+    return cancelled
+
+
+def _raise_if_cancelled(job_id: str):
+    """단계 경계에서 취소 여부 확인 (다른 worker가 받은 취소 요청은 저장소로 확인)"""
+    if is_cancelled(job_id) or (job_store.get_job(job_id) or {}).get('cancel_requested'):
+        raise JobCancelled(job_id)
+
+
+def estimator_profile(job: dict) -> str:
+    """소요 시간 예측에 사용할 프로필 이름 (외부 서버 분리는 프로필과 무관)"""
+    if USE_EXTERNAL_SEPARATOR:
+        return 'external'
+    return job.get('profile', DEFAULT_SEPARATION_PROFILE)
+
+
+def predict_job(job: dict) -> dict:
+    """작업의 단계별 예상 소요 시간 {'separation': 초, 'pitch': 초}"""
+    duration = (job.get('file_info') or {}).get('duration')
+    return job_estimator.predict(estimator_profile(job), duration)
+
+
+def _remaining_seconds(predicted: float, elapsed: float, progress: float = None) -> float:
+    """현재 단계의 남은 시간 (보고된 진행률이 있으면 진행 속도로, 없으면 예측 시간으로 계산)"""
+    if progress is not None and progress >= MIN_PROGRESS_FOR_ETA:
+        return elapsed * (1 - progress) / progress
+    return max(predicted - elapsed, 0.0)
+
+
+def estimate_remaining(job: dict, now: float = None) -> dict:
+    """
+    처리 중인 작업의 남은 시간 예측
+
+    Args:
+        job: 작업 정보 (status가 processing)
+        now: 기준 시각 (time.time())
+
+    Returns:
+        dict: {'separation': 분리가 끝날 때까지(초), 'total': 완료까지(초)}
+    """
+    if now is None:
+        now = time.time()
+    prediction = predict_job(job)
+    elapsed = now - job.get('stage_started_at', now)
+
+    if job.get('stage') == 'separation':
+        separation = _remaining_seconds(prediction['separation'], elapsed, job.get('progress'))
+        return {'separation': separation, 'total': separation + prediction['pitch']}
+
+    # 분리 이후 단계 (진행률은 음정 분석 중에만 보고됨)
+    progress = job.get('progress') if job.get('stage') == 'pitch' else None
+    return {'separation': 0.0, 'total': _remaining_seconds(prediction['pitch'], elapsed, progress)}
+
+
+def estimate_queue(now: float = None, extra_job: tuple = None) -> dict:
+    """
+    대기 작업별 예상 대기 시간
+
+    처리 중인 작업의 남은 분리 시간으로 분리 슬롯이 비는 시각을 구하고,
+    스케줄러의 실행 순서대로 가장 먼저 비는 슬롯에 예상 분리 시간만큼 배정
+
+    Args:
+        now: 기준 시각 (time.time())
+        extra_job: 대기열에 있다고 가정할 작업 (job_id, job) - 접수 판단용
+
+    Returns:
+        dict: {'waits': {job_id: 분리 시작까지 예상 시간(초)},
+               'drain_seconds': 대기 작업까지 모두 분리를 마칠 때까지 예상 시간(초)}
+    """
+    if now is None:
+        now = time.time()
+
+    slots = [
+        estimate_remaining(job, now)['separation']
+        for _, job in job_store.list_jobs('processing')
+        if job.get('stage') == 'separation'
+    ]
+    # 공유 저장소에서는 다른 worker의 슬롯에서 처리 중인 작업도 포함됨
+    slots += [0.0] * max(0, SEPARATION_WORKERS - len(slots))
+    heapq.heapify(slots)
+
+    waiting = job_store.list_jobs('waiting')
+    if extra_job is not None:
+        waiting.append(extra_job)
+
+    waits = {}
+    for job_id, job in order_jobs(waiting, now):
+        start = heapq.heappop(slots)
+        waits[job_id] = start
+        heapq.heappush(slots, start + predict_job(job)['separation'])
+
+    return {'waits': waits, 'drain_seconds': max(slots) if slots else 0.0}
+
+
+def acquire_waiter_slot() -> bool:
+    """
+    SSE 스트림/long-poll 대기 슬롯 확보 (JOB_WAITERS_MAX개까지)
+
+    대기 연결이 요청 스레드를 모두 차지하면 업로드/취소/지표 요청을 받을 수 없으므로
+    슬롯이 없으면 기다리지 않고 False 반환 (호출한 쪽에서 503 응답)
+    """
+    if waiter_slots is None:
+        return True
+    if not waiter_slots.acquire(blocking=False):
+        rejected_waiters.inc()
+        return False
+    status_waiters.inc()
+    return True
+
+
+def release_waiter_slot():
+    """acquire_waiter_slot()으로 확보한 슬롯 반환"""
+    if waiter_slots is None:
+        return
+    status_waiters.dec()
+    waiter_slots.release()
+
+
+def wait_for_job_status(job_id: str, state: str = None, timeout: float = 0) -> dict:
+    """
+    작업 상태가 state와 달라질 때까지 대기 후 상태 반환 (long-poll/SSE용)
+
+    같은 프로세스의 상태 변경은 바로 깨어나고, 공유 저장소에서 다른 worker가
+    바꾼 상태는 JOB_POLL_INTERVAL마다 다시 확인
+
+    Args:
+        job_id: 작업 ID
+        state: 클라이언트가 마지막으로 받은 상태 토큰 (None이면 바로 반환)
+        timeout: 최대 대기 시간 (초)
+
+    Returns:
+        dict: 상태 정보 (시간 초과 시 현재 상태) 또는 작업이 없으면 None
+    """
+    deadline = time.monotonic() + timeout
+    recheck_interval = None if JOB_STORE == 'memory' else JOB_POLL_INTERVAL
+
+    # 상태를 읽기 전에 버전을 기록해야 그 사이의 변경을 놓치지 않음
+    with job_updates:
+        version = job_update_version
+
+    while True:
+        status = get_job_status(job_id)
+        if status is None or status['state'] != state or status['status'] in FINAL_STATUSES:
+            return status
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return status
+
+        wait_seconds = remaining if recheck_interval is None else min(remaining, recheck_interval)
+        with job_updates:
+            job_updates.wait_for(lambda: job_update_version != version, wait_seconds)
+            version = job_update_version
+
+
+def process_job(job_id: str, job: dict):
     """
     단일 작업 처리 (음원 분리 + 분석)
 
+    음원 분리가 끝나면 분리 슬롯을 반납하여, 이 작업의 음정 분석과
+    다음 작업의 음원 분리가 동시에 진행되도록 함
+
     Args:
         job_id: 작업 ID
+        job: 작업 정보 (저장소에서 선점한 시점의 값)
     """
-    job = job_queue[job_id]
     file_info = job['file_info']
     vocal_type = job['vocal_type']
+    profile = job.get('profile', DEFAULT_SEPARATION_PROFILE)
+
+    # 단계 시간 (업로드 단계는 요청 처리 중 측정, 나머지는 여기서 측정하거나 실행기에서 받아 합침)
+    timings = dict(job.get('timings') or {})
+    created_at = datetime.fromisoformat(job['created_at'])
+    timings['queue_wait'] = max(0.0, (datetime.now() - created_at).total_seconds())
+    status = 'failed'
+    transfers = {}
+    jobs_in_progress.inc()
+
+    def collect(stage_result: dict):
+        """실행기에서 받은 단계 시간/워커 카운터 반영"""
+        stage_metrics = stage_result.pop('metrics', None) or {}
+        for name, seconds in stage_metrics.get('timings', {}).items():
+            timings[name] = timings.get(name, 0.0) + seconds
+        merge_counters(stage_metrics.get('counters'))
 
     try:
-        # 1. 음원 분리
+        # 로컬 분리(구간별 분리 제외)는 vocal/MR 업로드를 워커에서 시작만 하고 반환하므로,
+        # 완료 알림을 받을 Future를 분리 단계 실행 전에 등록
+        stem_uploads = {}
+        if not USE_EXTERNAL_SEPARATOR and SEPARATION_WINDOW_SECONDS <= 0:
+            stem_uploads = expect_transfers(job_id, ('vocal', 'mr'))
+
+        # 1. 음원 분리 (분리 슬롯은 dispatcher에서 확보됨)
+        started_at = time.time()
+        update_job(job_id, stage='separation', started_at=started_at, stage_started_at=started_at, progress=None)
+        try:
+            separated = separation_executor.submit(
+                run_separation, file_info, job_id, profile, vocal_type
+            ).result()
+        finally:
+            separation_slots.release()
+        separated_at = time.time()
+        collect(separated)
+        if not USE_EXTERNAL_SEPARATOR:
+            # 취소되더라도 워커에서 시작된 업로드가 끝난 뒤 파일을 지워야 하므로 먼저 기록
+            transfers = {name: stem_uploads[name] for name in separated.pop('pending_transfers', [])}
+        _raise_if_cancelled(job_id)
+        transfer_start = time.perf_counter()
+
+        # 2. 분리 파일 전송 (외부 서버: vocal/MR 동시 전송,
+        #    로컬: 분리 단계에서 시작한 업로드가 워커에서 진행 중, 구간별 분리: 업로드 완료)
         if USE_EXTERNAL_SEPARATOR:
-            print(f"[{job_id}] Using external separator (Colab server)")
-            analysis_result = send_file_to_analysis_server(
-                file_info['file_data'],
-                file_info['unique_filename'],
-                file_info['content_type']
-            )
-            saved_files = download_and_save_separated_files(
-                analysis_result,
+            transfers = start_separated_file_transfers(
+                separated,
                 file_info['separated_folder'],
                 minio_client
             )
+            saved_files = {}
         else:
-            print(f"[{job_id}] Using local demucs separator")
-            saved_files = separate_audio_locally(
-                file_info['file_data'],
-                file_info['unique_filename'],
-                file_info['separated_folder'],
-                minio_client
-            )
+            saved_files = separated
+
+        def finish_transfer(name: str):
+            """전송 완료 대기 후 파일 정보 반영"""
+            saved_files[f'{name}_object_name'], saved_files[f'{name}_minio_url'] = \
+                transfers.pop(name).result(timeout=STEM_TRANSFER_TIMEOUT)
+            timings['stem_transfer'] = time.perf_counter() - transfer_start
+
+        vocal_audio = saved_files.pop('vocal_audio', None)
+        if transfers.get('vocal') and vocal_audio is None:
+            # 외부 서버: 음정 분석이 MinIO로 옮긴 vocal을 읽으므로 vocal 전송만 먼저 대기
+            finish_transfer('vocal')
+
+        # 3. 음정 분석 (vocal이 준비되면 MR 전송을 기다리지 않고 시작,
+        #    분리 단계에서 받은 vocal 신호가 있으면 업로드도 기다리지 않고 그대로 전달,
+        #    구간별 분리는 분리와 함께 음정 분석까지 끝난 상태)
+        vocal_samplerate = saved_files.pop('vocal_samplerate', None)
+        pitch_data = saved_files.pop('notes', None)
 
-        # 2. 음정 분석
-        pitch_data = None
-        if saved_files.get('vocal_object_name'):
-            pitch_data = analyze_vocal_pitch_from_minio(
+        pitch_future = None
+        if pitch_data is None and saved_files.get('vocal_object_name'):
+            update_job(job_id, stage='pitch', stage_started_at=separated_at, progress=None)
+            pitch_future = pitch_executor.submit(
+                run_pitch_analysis,
                 saved_files['vocal_object_name'],
-                minio_client
+                vocal_audio,
+                vocal_samplerate,
+                job_id,
+                vocal_type
             )
+        del vocal_audio
+
+        # 음정 분석과 함께 남은 전송 완료 대기
+        for name in ('vocal', 'mr'):
+            if name in transfers:
+                finish_transfer(name)
+
+        if USE_EXTERNAL_SEPARATOR:
+            print(f"[{job_id}] Analysis server connections: {get_connection_stats()}")
+
+        if pitch_future:
+            pitch_result = pitch_future.result()
+            collect(pitch_result)
+            pitch_data = pitch_result['notes']
+        _raise_if_cancelled(job_id)
 
-        # 3. 클레프 결정
+        update_job(job_id, stage='finalizing', stage_started_at=separated_at, progress=None)
+
+        # 4. 클레프 결정
         clef = 'treble' if vocal_type == 'female' else 'bass'
 
-        # 4. Presigned URL 생성
-        file_presigned_url = generate_presigned_url(
-            minio_client,
-            ORIGINAL_BUCKET,
-            file_info['unique_filename'],
-            expires_hours=24
-        )
+        # 5. Presigned URL 생성 (presign 단계 시간은 작업 단계 시간에 합침)
+        with track_stages() as presign_timings:
+            file_presigned_url = generate_presigned_url(
+                minio_client,
+                ORIGINAL_BUCKET,
+                file_info['unique_filename'],
+                expires_hours=24
+            )
+        collect({'metrics': {'timings': presign_timings}})
 
-        # 5. 결과 저장
+        # 6. 결과 저장
         filename_without_ext = os.path.splitext(file_info['original_filename'])[0]
 
         result = {
@@ -198,54 +896,194 @@ def process_job(job_id: str):
             'notes': pitch_data
         }
 
-        with queue_lock:
-            job_queue[job_id]['status'] = 'completed'
-            job_queue[job_id]['result'] = result
+        update_job(job_id, status='completed', result=result, timings=timings, finished_at=time.time())
+        status = 'completed'
+
+        # 소요 시간 기록 (이후 작업의 ETA 예측에 사용)
+        job_estimator.record(estimator_profile(job), file_info.get('duration'), {
+            'separation': separated_at - started_at,
+            'pitch': time.time() - separated_at
+        })
 
         print(f"[{job_id}] Job completed successfully")
 
+        # 7. 결과 캐시 저장 (실패해도 작업 결과에는 영향 없음)
+        if file_info.get('content_hash'):
+            try:
+                store_result(
+                    minio_client,
+                    file_info['content_hash'],
+                    vocal_type,
+                    profile,
+                    file_info['unique_filename'],
+                    saved_files,
+                    result
+                )
+            except Exception as e:
+                print(f"[{job_id}] Failed to store result cache: {str(e)}")
+
+    except JobCancelled:
+        status = 'cancelled'
+        current = job_store.get_job(job_id) or {}
+        print(f"[{job_id}] Job cancelled during {current.get('stage')}")
+        update_job(job_id, status='cancelled', timings=timings, finished_at=time.time())
+        cancelled_jobs.inc(reason=current.get('cancel_reason', 'requested'), stage=current.get('stage'))
+        # 진행 중인 분리 파일 전송이 끝난 뒤 업로드된 파일까지 삭제
+        wait_futures(list(transfers.values()), timeout=STEM_TRANSFER_TIMEOUT)
+        # 취소 요청 후 연결된 요청이 있으면 파일을 넘겨 새 작업으로 처리 (분리 파일은 새 작업이 덮어씀)
+        if promote_attached_jobs(job_id, job) is None:
+            try:
+                remove_job_files(file_info, minio_client)
+            except Exception as e:
+                print(f"[{job_id}] Failed to remove job files: {str(e)}")
+
     except Exception as e:
         print(f"[{job_id}] Job failed: {str(e)}")
-        with queue_lock:
-            job_queue[job_id]['status'] = 'failed'
-            job_queue[job_id]['error'] = str(e)
+        update_job(job_id, status='failed', error=str(e), timings=timings, finished_at=time.time())
+
+    finally:
+        jobs_in_progress.dec()
+        clear_cancelled(job_id)
+        forget_transfers(job_id)
+        try:
+            settle_attached_jobs(job_id)
+        except Exception as e:
+            print(f"[{job_id}] Failed to update attached jobs: {str(e)}")
+        # 작업 생성 전 요청 처리 시간(캐시 조회, 업로드)까지 포함
+        total = (datetime.now() - created_at).total_seconds() + \
+            timings.get('cache_lookup', 0.0) + timings.get('upload', 0.0)
+        record_job_timings(timings, status, total)
 
 
 def process_worker():
-    """백그라운드에서 대기열 순차 처리 (Event 기반)"""
+    """백그라운드에서 대기열 처리 (Event 기반, 분리 슬롯이 빌 때마다 다음 작업 시작)"""
+    # 공유 저장소는 다른 worker가 추가한 작업을 알 수 없으므로 주기적으로 확인
+    poll_interval = None if JOB_STORE == 'memory' else JOB_POLL_INTERVAL
+
+    while True:
+        # 빈 분리 슬롯 대기
+        separation_slots.acquire()
+
+        # 선점 전에 신호를 초기화해야 그 사이 도착한 작업 신호를 놓치지 않음
+        job_event.clear()
+        claimed = job_store.claim_next_job(choose_next)
+
+        if claimed is None:
+            separation_slots.release()
+            # 작업 도착 신호 대기 (CPU 사용 0)
+            job_event.wait(timeout=poll_interval)
+            continue
+
+        # 대기 순번이 바뀌었으므로 알림
+        notify_job_update()
+
+        # 작업별 스레드에서 단계 실행 (실제 연산은 실행기 풀에서 수행)
+        job_id, job = claimed
+        threading.Thread(target=process_job, args=(job_id, job), daemon=True).start()
+
+
+def select_jobs_to_evict(finished: list, now: float) -> list:
+    """
+    정리할 끝난 작업 선택 (보관 시간이 지난 작업 + 최대 수를 넘는 오래된 작업)
+
+    Args:
+        finished: 끝난 작업 목록 [(job_id, job), ...]
+        now: 기준 시각 (time.time())
+
+    Returns:
+        list: 정리할 [(job_id, job), ...]
+    """
+    # finished_at이 없는 작업(이전 버전에서 끝난 작업)은 가장 오래된 것으로 취급
+    finished = sorted(finished, key=lambda item: item[1].get('finished_at') or 0)
+    overflow = len(finished) - JOB_RETENTION_MAX_JOBS if JOB_RETENTION_MAX_JOBS > 0 else 0
+
+    evict = []
+    for index, (job_id, job) in enumerate(finished):
+        expired = JOB_RETENTION_SECONDS > 0 and now - (job.get('finished_at') or 0) > JOB_RETENTION_SECONDS
+        if index < overflow or expired:
+            evict.append((job_id, job))
+    return evict
+
+
+def cleanup_finished_jobs(now: float = None) -> int:
+    """
+    끝난 작업을 저장소에서 정리 (JOB_ARCHIVE_ENABLED면 MinIO에 옮긴 뒤 삭제)
+
+    Returns:
+        int: 정리한 작업 수
+    """
+    if now is None:
+        now = time.time()
+
+    finished = []
+    for status in FINAL_STATUSES:
+        finished += job_store.list_jobs(status)
+
+    evict = []
+    for job_id, job in select_jobs_to_evict(finished, now):
+        if JOB_ARCHIVE_ENABLED:
+            try:
+                archive_job(minio_client, job_id, job)
+            except Exception as e:
+                # 옮기지 못한 작업은 다음 정리 때 다시 시도
+                print(f"[{job_id}] Failed to archive job: {str(e)}")
+                continue
+        evict.append((job_id, job))
+
+    removed = job_store.remove_jobs([job_id for job_id, _ in evict])
+    for _, job in evict:
+        evicted_jobs.inc(status=job['status'])
+    return removed
+
+
+def cleanup_worker():
+    """백그라운드에서 주기적으로 버려진 작업 취소, 끝난 작업 및 만료된 캐시 항목 정리"""
+    last_sweep = 0.0
+    last_cache_sweep = 0.0
     while True:
-        # 작업 도착 신호 대기 (CPU 사용 0)
-        job_event.wait()
+        time.sleep(JOB_CLEANUP_INTERVAL)
+        try:
+            cancelled = cancel_abandoned_jobs()
+            if cancelled:
+                print(f"Cancelled {cancelled} abandoned job(s)")
 
-        while True:
-            job_id = None
+            removed = cleanup_finished_jobs()
+            if removed:
+                print(f"Removed {removed} finished job(s) from job store")
 
-            with queue_lock:
-                if waiting_list:
-                    job_id = waiting_list[0]
-                    if job_id in job_queue:
-                        job_queue[job_id]['status'] = 'processing'
-                else:
-                    # 대기열 비어있으면 신호 초기화 후 대기 상태로
-                    job_event.clear()
-                    break
+            if JOB_ARCHIVE_ENABLED and time.time() - last_sweep >= ARCHIVE_SWEEP_INTERVAL:
+                last_sweep = time.time()
+                removed = remove_expired_archives(minio_client)
+                if removed:
+                    print(f"Removed {removed} expired archived job(s)")
 
-            if job_id is None:
-                break
+            if RESULT_CACHE_ENABLED and time.time() - last_cache_sweep >= CACHE_SWEEP_INTERVAL:
+                last_cache_sweep = time.time()
+                removed = remove_expired_entries(minio_client)
+                if removed:
+                    print(f"Removed {removed} expired result cache entries")
+        except Exception as e:
+            print(f"Failed to clean up finished jobs: {str(e)}")
 
-            # 작업 처리
-            process_job(job_id)
 
-            # 완료 후 대기열에서 제거
-            with queue_lock:
-                if waiting_list and waiting_list[0] == job_id:
-                    waiting_list.popleft()
+def start_cleanup_worker():
+    """끝난/버려진 작업 정리 스레드 시작 (보관 제한, 버려진 작업 취소, 결과 캐시가 모두 꺼져 있으면 시작하지 않음)"""
+    global cleanup_thread
+    if (JOB_RETENTION_SECONDS <= 0 and JOB_RETENTION_MAX_JOBS <= 0 and JOB_ABANDON_SECONDS <= 0
+            and not RESULT_CACHE_ENABLED):
+        return
+    if cleanup_thread is None or not cleanup_thread.is_alive():
+        cleanup_thread = threading.Thread(target=cleanup_worker, daemon=True)
+        cleanup_thread.start()
 
 
 def start_worker():
-    """워커 스레드 시작"""
-    global worker_thread
+    """실행기 풀 생성 및 워커 스레드 시작"""
+    global worker_thread, separation_executor, pitch_executor
+    if separation_executor is None:
+        separation_executor = create_executor(SEPARATION_WORKERS, 'separation', initializer=init_separation_worker)
+        pitch_executor = create_executor(PITCH_WORKERS, 'pitch')
     if worker_thread is None or not worker_thread.is_alive():
         worker_thread = threading.Thread(target=process_worker, daemon=True)
         worker_thread.start()
-        print("Job queue worker started")
+        print(f"Job queue worker started (separation: {SEPARATION_WORKERS}, pitch: {PITCH_WORKERS})")
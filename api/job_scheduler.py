@@ -0,0 +1,74 @@
+"""
+작업 스케줄러 모듈
+
+대기 작업 중 다음에 실행할 작업을 고르는 정책 (JOB_SCHEDULER)
+- FifoScheduler: 먼저 들어온 작업부터
+- ShortestJobFirstScheduler: 예상 처리 시간이 짧은 작업부터 (기다린 시간만큼 예상 시간을
+  깎아 주어 긴 작업도 결국 실행됨)
+두 정책 모두 우선순위 등급(high > normal > low)을 먼저 비교하고, 같은 등급 안에서 정책을 적용
+"""
+import time
+
+from config import JOB_SCHEDULER, SJF_AGING_FACTOR
+
+
+PRIORITY_CLASSES = ('high', 'normal', 'low')  # 앞쪽이 먼저 실행
+DEFAULT_PRIORITY = 'normal'
+
+
+class FifoScheduler:
+    """대기열에 들어온 순서대로 실행"""
+
+    def key(self, job: dict, now: float) -> float:
+        return job.get('enqueued_at', 0.0)
+
+
+class ShortestJobFirstScheduler:
+    """예상 처리 시간이 짧은 작업부터 실행 (aging 적용)"""
+
+    def __init__(self, aging_factor: float):
+        """
+        Args:
+            aging_factor: 대기 1초당 예상 처리 시간에서 빼 줄 시간 (초)
+        """
+        self.aging_factor = aging_factor
+
+    def key(self, job: dict, now: float) -> float:
+        waited = now - job.get('enqueued_at', now)
+        return job.get('cost', 0.0) - self.aging_factor * waited
+
+
+def _priority_rank(job: dict) -> int:
+    priority = job.get('priority', DEFAULT_PRIORITY)
+    return PRIORITY_CLASSES.index(priority) if priority in PRIORITY_CLASSES else PRIORITY_CLASSES.index(DEFAULT_PRIORITY)
+
+
+def order_jobs(jobs: list, now: float = None) -> list:
+    """
+    대기 작업을 실행 순서대로 정렬
+
+    Args:
+        jobs: [(job_id, job), ...] (저장소의 대기 순서, 같은 순위면 이 순서 유지)
+        now: 기준 시각 (time.time())
+
+    Returns:
+        list: 실행 순서대로 정렬된 [(job_id, job), ...]
+    """
+    if now is None:
+        now = time.time()
+    return sorted(jobs, key=lambda item: (_priority_rank(item[1]), scheduler.key(item[1], now)))
+
+
+def choose_next(jobs: list) -> str:
+    """다음에 실행할 job_id 반환 (job_store.claim_next_job의 choose 인자로 사용)"""
+    return order_jobs(jobs)[0][0]
+
+
+def create_scheduler():
+    """설정(JOB_SCHEDULER)에 맞는 스케줄러 생성"""
+    if JOB_SCHEDULER == 'sjf':
+        return ShortestJobFirstScheduler(SJF_AGING_FACTOR)
+    return FifoScheduler()
+
+
+scheduler = create_scheduler()
@@ -0,0 +1,359 @@
+"""
+작업 저장소 모듈
+
+작업 상태와 대기 순서를 저장하는 백엔드
+- MemoryJobStore: 프로세스 메모리에 저장 (단일 gunicorn worker 전용)
+- SQLiteJobStore: SQLite(WAL) 파일에 저장 (여러 worker 공유, 재시작 후에도 유지)
+"""
+import json
+import os
+import sqlite3
+import threading
+from collections import deque
+
+from config import JOB_STORE, JOB_STORE_PATH
+
+
+class MemoryJobStore:
+    """인메모리 작업 저장소"""
+
+    def __init__(self):
+        self.jobs = {}               # {job_id: {status, file_info, result, ...}}
+        self.waiting_list = deque()  # 대기 중인 job_id 순서
+        self.lock = threading.Lock()
+
+    def add_job(self, job_id: str, job: dict, max_waiting: int = None):
+        """
+        작업 추가 (status가 waiting이면 대기열 끝에 추가)
+
+        Args:
+            job_id: 작업 ID
+            job: 작업 정보
+            max_waiting: 최대 대기 작업 수 (None이면 제한 없음)
+
+        Returns:
+            int: 대기 순번 (waiting이 아니면 0), 대기열이 가득 차면 None
+        """
+        with self.lock:
+            if job['status'] != 'waiting':
+                self.jobs[job_id] = job
+                return 0
+
+            if max_waiting is not None and len(self.waiting_list) >= max_waiting:
+                return None
+
+            self.jobs[job_id] = job
+            self.waiting_list.append(job_id)
+            return len(self.waiting_list)
+
+    def get_job(self, job_id: str):
+        """작업 정보 반환 (없으면 None)"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job is not None else None
+
+    def update_job(self, job_id: str, **fields):
+        """작업 정보 일부 갱신"""
+        with self.lock:
+            if job_id in self.jobs:
+                self.jobs[job_id].update(fields)
+
+    def claim_next_job(self, choose=None):
+        """
+        다음 작업을 processing으로 바꾸고 반환
+
+        Args:
+            choose: 대기 작업 목록 [(job_id, job), ...]을 받아 실행할 job_id를 반환하는 함수
+                    (None이면 가장 오래 대기한 작업)
+
+        Returns:
+            tuple: (job_id, job) 또는 대기 작업이 없으면 None
+        """
+        with self.lock:
+            if not self.waiting_list:
+                return None
+            if choose is None:
+                job_id = self.waiting_list.popleft()
+            else:
+                job_id = choose([(job_id, self.jobs[job_id]) for job_id in self.waiting_list])
+                self.waiting_list.remove(job_id)
+            self.jobs[job_id]['status'] = 'processing'
+            return job_id, dict(self.jobs[job_id])
+
+    def count_waiting(self) -> int:
+        """대기 중인 작업 수 반환"""
+        with self.lock:
+            return len(self.waiting_list)
+
+    def list_jobs(self, status: str) -> list:
+        """
+        해당 상태의 작업 목록 반환 (대기 작업은 대기 순서, 나머지는 추가된 순서)
+
+        Returns:
+            list: [(job_id, job), ...]
+        """
+        with self.lock:
+            if status == 'waiting':
+                return [(job_id, dict(self.jobs[job_id])) for job_id in self.waiting_list]
+            return [(job_id, dict(job)) for job_id, job in self.jobs.items() if job['status'] == status]
+
+    def cancel_waiting_job(self, job_id: str) -> bool:
+        """
+        대기 중인 작업을 대기열에서 빼고 cancelled로 변경
+
+        Returns:
+            bool: 취소 여부 (이미 처리가 시작되었거나 없으면 False)
+        """
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None or job['status'] != 'waiting':
+                return False
+            self.waiting_list.remove(job_id)
+            job['status'] = 'cancelled'
+            return True
+
+    def remove_jobs(self, job_ids: list) -> int:
+        """
+        작업 삭제 (대기 중인 작업은 대기열에서도 제거)
+
+        Returns:
+            int: 삭제된 작업 수
+        """
+        removed = 0
+        with self.lock:
+            for job_id in job_ids:
+                job = self.jobs.pop(job_id, None)
+                if job is None:
+                    continue
+                if job['status'] == 'waiting':
+                    self.waiting_list.remove(job_id)
+                removed += 1
+        return removed
+
+    def count_jobs(self) -> int:
+        """저장된 전체 작업 수 반환"""
+        with self.lock:
+            return len(self.jobs)
+
+    def recover_jobs(self):
+        """재시작 복구 (인메모리 저장소는 복구할 작업 없음)"""
+        return 0
+
+
+class SQLiteJobStore:
+    """
+    SQLite 작업 저장소 (WAL 모드)
+
+    여러 프로세스가 같은 파일을 공유하며, 대기 작업 선점은 트랜잭션으로 원자적으로 처리
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.local = threading.local()  # 스레드별 연결
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                job_id TEXT UNIQUE NOT NULL,
+                status TEXT NOT NULL,
+                owner_pid INTEGER,
+                data TEXT NOT NULL
+            )
+        """)
+        conn.execute('CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, seq)')
+
+    def _connect(self):
+        """현재 스레드의 연결 반환 (autocommit, 트랜잭션은 명시적으로 시작)"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA busy_timeout=30000')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+        return conn
+
+    @staticmethod
+    def _serialize(job: dict) -> str:
+        """작업 정보를 JSON으로 변환"""
+        return json.dumps(job, ensure_ascii=False)
+
+    def add_job(self, job_id: str, job: dict, max_waiting: int = None):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            position = 0
+            if job['status'] == 'waiting':
+                waiting = conn.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = 'waiting'"
+                ).fetchone()[0]
+                if max_waiting is not None and waiting >= max_waiting:
+                    conn.execute('ROLLBACK')
+                    return None
+                position = waiting + 1
+
+            conn.execute(
+                'INSERT INTO jobs (job_id, status, data) VALUES (?, ?, ?)',
+                (job_id, job['status'], self._serialize(job))
+            )
+            conn.execute('COMMIT')
+            return position
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def get_job(self, job_id: str):
+        row = self._connect().execute(
+            'SELECT status, data FROM jobs WHERE job_id = ?', (job_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        job = json.loads(row[1])
+        job['status'] = row[0]
+        return job
+
+    def update_job(self, job_id: str, **fields):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(
+                'SELECT status, data FROM jobs WHERE job_id = ?', (job_id,)
+            ).fetchone()
+            if row is not None:
+                job = json.loads(row[1])
+                job['status'] = row[0]
+                job.update(fields)
+                conn.execute(
+                    'UPDATE jobs SET status = ?, data = ? WHERE job_id = ?',
+                    (job['status'], self._serialize(job), job_id)
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def claim_next_job(self, choose=None):
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            if choose is None:
+                rows = conn.execute(
+                    "SELECT job_id, data FROM jobs WHERE status = 'waiting' ORDER BY seq LIMIT 1"
+                ).fetchall()
+            else:
+                rows = conn.execute(
+                    "SELECT job_id, data FROM jobs WHERE status = 'waiting' ORDER BY seq"
+                ).fetchall()
+            if not rows:
+                conn.execute('COMMIT')
+                return None
+
+            waiting = [(row_job_id, json.loads(data)) for row_job_id, data in rows]
+            job_id = waiting[0][0] if choose is None else choose(waiting)
+            job = dict(waiting)[job_id]
+            job['status'] = 'processing'
+            conn.execute(
+                'UPDATE jobs SET status = ?, owner_pid = ?, data = ? WHERE job_id = ?',
+                ('processing', os.getpid(), self._serialize(job), job_id)
+            )
+            conn.execute('COMMIT')
+            return job_id, job
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def count_waiting(self) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM jobs WHERE status = 'waiting'"
+        ).fetchone()[0]
+
+    def list_jobs(self, status: str) -> list:
+        rows = self._connect().execute(
+            'SELECT job_id, status, data FROM jobs WHERE status = ? ORDER BY seq', (status,)
+        ).fetchall()
+        jobs = []
+        for job_id, job_status, data in rows:
+            job = json.loads(data)
+            job['status'] = job_status
+            jobs.append((job_id, job))
+        return jobs
+
+    def cancel_waiting_job(self, job_id: str) -> bool:
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = 'cancelled' WHERE job_id = ? AND status = 'waiting'", (job_id,)
+        )
+        return cursor.rowcount > 0
+
+    def remove_jobs(self, job_ids: list) -> int:
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            removed = 0
+            for job_id in job_ids:
+                removed += conn.execute('DELETE FROM jobs WHERE job_id = ?', (job_id,)).rowcount
+            conn.execute('COMMIT')
+            return removed
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def count_jobs(self) -> int:
+        return self._connect().execute('SELECT COUNT(*) FROM jobs').fetchone()[0]
+
+    def recover_jobs(self):
+        """
+        처리 중에 종료된 작업을 다시 대기 상태로 복구
+        (처리하던 프로세스가 더 이상 존재하지 않는 작업만 대상)
+
+        Returns:
+            int: 복구된 작업 수
+        """
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                "SELECT job_id, owner_pid FROM jobs WHERE status = 'processing'"
+            ).fetchall()
+            # 컨테이너 재시작 시 PID가 재사용될 수 있으므로, 자기 PID 소유 작업도 복구 대상
+            orphaned = [
+                job_id for job_id, pid in rows
+                if pid == os.getpid() or not _pid_alive(pid)
+            ]
+            for job_id in orphaned:
+                row = conn.execute('SELECT data FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+                job = json.loads(row[0])
+                job['status'] = 'waiting'
+                conn.execute(
+                    "UPDATE jobs SET status = 'waiting', owner_pid = NULL, data = ? WHERE job_id = ?",
+                    (self._serialize(job), job_id)
+                )
+            conn.execute('COMMIT')
+            return len(orphaned)
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+
+def _pid_alive(pid) -> bool:
+    """프로세스 존재 여부 확인"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def create_job_store():
+    """설정(JOB_STORE)에 맞는 작업 저장소 생성"""
+    if JOB_STORE == 'sqlite':
+        print(f"Using SQLite job store: {JOB_STORE_PATH}")
+        return SQLiteJobStore(JOB_STORE_PATH)
+    return MemoryJobStore()
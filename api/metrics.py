@@ -0,0 +1,250 @@
+"""
+작업 단계별 시간 측정 및 Prometheus 형식 지표 모듈
+
+- 단계 시간: 작업을 실행하는 스레드에서 track_stages()로 모아 작업 결과와 함께 반환하고,
+  API 프로세스에서 record_job_timings()로 히스토그램에 반영
+- 카운터(MinIO 전송량, 캐시 적중 등): 프로세스별로 누적하고, 프로세스 풀 워커는
+  작업이 끝날 때 drain_counters()로 넘겨 API 프로세스에서 merge_counters()로 합침
+- 작업 밖에서 측정된 단계 시간(워커 시작 시 모델 미리 로드, 전송 스레드의 presign 등)은
+  단계 히스토그램에 한 번씩 기록 (프로세스 풀 워커는 카운터와 함께 넘김)
+지표는 gunicorn worker(프로세스)마다 따로 집계됨 (/metrics는 요청을 받은 worker 기준)
+"""
+import multiprocessing
+import threading
+import time
+from contextlib import contextmanager
+
+
+# 단계 시간 히스토그램 구간 (초)
+STAGE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+_registry = []  # 등록된 지표 (출력 순서)
+_lock = threading.Lock()
+_local = threading.local()  # 스레드별 단계 시간 기록
+_untracked_stages = []      # 프로세스 풀 워커: 작업 밖에서 측정된 [단계 이름, 소요 시간] (drain_counters로 전달)
+
+
+def _format_labels(labelnames, labelvalues, extra: dict = None) -> str:
+    pairs = list(zip(labelnames, labelvalues)) + list((extra or {}).items())
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """누적 카운터"""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.values = {}  # {라벨 값 tuple: 누적값}
+        _registry.append(self)
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+
+class Gauge:
+    """현재 값 (callback이 있으면 출력할 때마다 호출)"""
+
+    def __init__(self, name: str, documentation: str, callback=None):
+        self.name = name
+        self.documentation = documentation
+        self.callback = callback
+        self.value = 0
+        _registry.append(self)
+
+    def inc(self, amount: float = 1):
+        with _lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        self.inc(-amount)
+
+    def render(self) -> list:
+        value = self.value
+        if self.callback is not None:
+            try:
+                value = self.callback()
+            except Exception as e:
+                print(f"Failed to read gauge {self.name}: {str(e)}")
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_value(value)}"
+        ]
+
+
+class Histogram:
+    """구간별 관측 횟수 히스토그램"""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = STAGE_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = tuple(buckets) + (float('inf'),)
+        self.values = {}  # {라벨 값 tuple: [구간별 횟수 list, 합계, 횟수]}
+        _registry.append(self)
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.labelnames)
+        with _lock:
+            counts, total, count = self.values.get(key, ([0] * len(self.buckets), 0.0, 0))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            self.values[key] = (counts, total + value, count + 1)
+
+    def render(self) -> list:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in sorted(self.values.items()):
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, {'le': _format_value(float(bound))})
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+# ===== 지표 정의 =====
+stage_seconds = Histogram('mypitch_job_stage_seconds', 'Time spent in each job stage', ('stage',))
+job_seconds = Histogram('mypitch_job_duration_seconds', 'Job time from upload to finish', ('status',))
+jobs_in_progress = Gauge('mypitch_jobs_in_progress', 'Jobs currently being processed')
+cache_lookups = Counter('mypitch_result_cache_lookups_total', 'Result cache lookups', ('result',))
+storage_bytes = Counter('mypitch_storage_bytes_total', 'Bytes transferred to/from MinIO', ('direction',))
+
+
+def render() -> str:
+    """등록된 모든 지표를 Prometheus 텍스트 형식으로 출력"""
+    lines = []
+    with _lock:
+        metrics = list(_registry)
+    for metric in metrics:
+        lines.extend(metric.render())
+    return '\n'.join(lines) + '\n'
+
+
+def add_storage_bytes(direction: str, n_bytes: int):
+    """MinIO 전송량 기록 (direction: upload/download)"""
+    if n_bytes and n_bytes > 0:
+        storage_bytes.inc(n_bytes, direction=direction)
+
+
+# ===== 단계 시간 측정 =====
+@contextmanager
+def track_stages():
+    """
+    현재 스레드에서 실행되는 stage() 시간을 모음
+
+    Yields:
+        dict: {단계 이름: 소요 시간(초)}
+    """
+    previous = getattr(_local, 'timings', None)
+    timings = {}
+    _local.timings = timings
+    try:
+        yield timings
+    finally:
+        _local.timings = previous
+
+
+def record_stage(name: str, seconds: float):
+    """
+    단계 시간 추가 (track_stages() 안이면 작업 단계 시간에 합산,
+    밖이면 단계 히스토그램에 한 번 기록)
+    """
+    timings = getattr(_local, 'timings', None)
+    if timings is not None:
+        timings[name] = timings.get(name, 0.0) + seconds
+    elif multiprocessing.parent_process() is None:
+        stage_seconds.observe(seconds, stage=name)
+    else:
+        with _lock:
+            _untracked_stages.append([name, seconds])
+
+
+@contextmanager
+def stage(name: str):
+    """with 블록 실행 시간을 단계 시간으로 기록"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def record_job_timings(timings: dict, status: str = None, total: float = None):
+    """
+    작업의 단계 시간을 히스토그램에 반영 (API 프로세스에서 호출)
+
+    Args:
+        timings: {단계 이름: 소요 시간(초)}
+        status: 작업 최종 상태 (completed/failed, 전체 시간 기록용)
+        total: 업로드부터 종료까지 걸린 시간 (초)
+    """
+    for name, seconds in timings.items():
+        stage_seconds.observe(seconds, stage=name)
+    if status is not None and total is not None:
+        job_seconds.observe(total, status=status)
+
+
+# ===== 프로세스 풀 워커 카운터 전달 =====
+def drain_counters() -> dict:
+    """
+    프로세스 풀 워커의 카운터 값과 작업 밖에서 측정된 단계 시간을 꺼내고 초기화
+    (API 프로세스에서 직접 실행 중이면 이미 반영되어 있으므로 빈 값 반환)
+
+    Returns:
+        dict: {지표 이름: [[라벨 값 list, 값], ...]} (단계 히스토그램은 관측값 목록)
+    """
+    global _untracked_stages
+
+    if multiprocessing.parent_process() is None:
+        return {}
+
+    snapshot = {}
+    with _lock:
+        for metric in _registry:
+            if isinstance(metric, Counter) and metric.values:
+                snapshot[metric.name] = [[list(key), value] for key, value in metric.values.items()]
+                metric.values = {}
+        if _untracked_stages:
+            snapshot[stage_seconds.name] = [[[name], seconds] for name, seconds in _untracked_stages]
+            _untracked_stages = []
+    return snapshot
+
+
+def merge_counters(snapshot: dict):
+    """drain_counters()로 받은 워커 카운터 값/단계 시간을 현재 프로세스에 합침"""
+    if not snapshot:
+        return
+    metrics = {metric.name: metric for metric in _registry if isinstance(metric, (Counter, Histogram))}
+    for name, entries in snapshot.items():
+        metric = metrics.get(name)
+        if metric is None:
+            continue
+        for labelvalues, value in entries:
+            labels = dict(zip(metric.labelnames, labelvalues))
+            if isinstance(metric, Histogram):
+                metric.observe(value, **labels)
+            else:
+                metric.inc(value, **labels)
@@ -0,0 +1,233 @@
+"""
+demucs 모델 레지스트리
+
+모델을 프로세스당 한 번만 로드하여 메모리에 유지하고 작업 간 공유
+추론 백엔드(SEPARATION_BACKEND)가 int8이면 Linear/LSTM 레이어를 동적 int8로 양자화한
+모델을 사용하고, 양자화 결과는 SEPARATION_BACKEND_CACHE_DIR에 저장하여 재사용
+양자화 모델은 로드 직후 짧은 추론으로 확인하고, 확인이나 실제 추론에 실패하면
+같은 키에 eager 모델을 넣어 이후 작업도 eager로 실행
+"""
+import os
+import threading
+import time
+
+from config import (
+    DEMUCS_MODEL_NAME,
+    SEPARATION_PROFILES,
+    DEFAULT_SEPARATION_PROFILE,
+    SEPARATION_BACKEND,
+    SEPARATION_BACKEND_CACHE_DIR
+)
+from metrics import record_stage
+
+
+# ===== 로드된 모델 (프로세스 단위) =====
+_models = {}            # {(model_name, backend): model}
+_device = None
+_model_lock = threading.Lock()  # 동시 로드 방지
+model_load_times = {}   # {(model_name, backend): 로드 소요 시간(초)}
+_quantized_ids = set()  # 양자화된 모델의 id (is_quantized 확인용)
+SMOKE_TEST_SECONDS = 1  # 양자화 모델 확인용 무음 추론 길이 (초)
+
+
+def get_device():
+    """연산 장치 반환 (CUDA 사용 가능하면 GPU, 아니면 CPU)"""
+    global _device
+    if _device is None:
+        import torch as th  # pyright: ignore[reportMissingImports]
+        _device = th.device('cuda') if th.cuda.is_available() else th.device('cpu')
+        print(f"Using device: {_device}")
+    return _device
+
+
+def _load_pretrained(name: str):
+    """사전학습 모델 로드 (eager, fp32)"""
+    # 배포 환경에서만 설치되는 패키지
+    from demucs import pretrained  # pyright: ignore[reportMissingImports]
+
+    model = pretrained.get_model(name=name)
+    model.to(get_device())
+    model.eval()
+    return model
+
+
+def _quantized_cache_path(name: str):
+    """양자화된 모델 저장 경로 (torch 버전이 바뀌면 다시 양자화)"""
+    if not SEPARATION_BACKEND_CACHE_DIR:
+        return None
+    import torch as th  # pyright: ignore[reportMissingImports]
+    return os.path.join(SEPARATION_BACKEND_CACHE_DIR, f"{name}-int8-torch{th.__version__}.pt")
+
+
+def _load_quantized(name: str):
+    """
+    동적 int8 양자화 모델 로드 (저장된 결과가 있으면 사용, 없으면 양자화 후 저장)
+
+    Linear/LSTM 레이어(transformer, BLSTM)의 가중치를 int8로 바꾸고 활성값은 실행 시 양자화
+    (convolution 레이어는 fp32 유지)
+
+    Returns:
+        demucs 모델 또는 양자화할 수 없으면 None
+    """
+    import torch as th  # pyright: ignore[reportMissingImports]
+
+    cache_path = _quantized_cache_path(name)
+    if cache_path and os.path.exists(cache_path):
+        try:
+            model = th.load(cache_path, map_location='cpu', weights_only=False)
+            model.eval()
+            print(f"Loaded quantized demucs model from {cache_path}")
+            if _smoke_test(model, name):
+                return model
+        except Exception as e:
+            print(f"Failed to load quantized model cache: {str(e)}")
+
+    try:
+        model = th.ao.quantization.quantize_dynamic(
+            _load_pretrained(name), {th.nn.Linear, th.nn.LSTM}, dtype=th.qint8
+        )
+        model.eval()
+    except Exception as e:
+        print(f"Failed to quantize demucs model '{name}': {str(e)}")
+        return None
+
+    if not _smoke_test(model, name):
+        return None
+
+    if cache_path:
+        try:
+            os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+            # 쓰는 도중 다른 worker가 읽어도 깨지지 않도록 임시 파일에 쓴 뒤 교체
+            temp_path = f"{cache_path}.{os.getpid()}.tmp"
+            th.save(model, temp_path)
+            os.replace(temp_path, cache_path)
+        except Exception as e:
+            print(f"Failed to save quantized model cache: {str(e)}")
+    return model
+
+
+def _smoke_test(model, name: str) -> bool:
+    """양자화 모델로 짧은 무음 추론을 실행하여 오류 없이 유한한 값이 나오는지 확인"""
+    import torch as th  # pyright: ignore[reportMissingImports]
+    from demucs.apply import apply_model  # pyright: ignore[reportMissingImports]
+
+    try:
+        mix = th.zeros(1, model.audio_channels, SMOKE_TEST_SECONDS * model.samplerate)
+        with th.no_grad():
+            output = apply_model(model, mix, shifts=0, progress=False, device='cpu')
+        if not th.isfinite(output).all():
+            print(f"Quantized demucs model '{name}' produced non-finite output")
+            return False
+        return True
+    except Exception as e:
+        print(f"Quantized demucs model '{name}' failed smoke inference: {str(e)}")
+        return False
+
+
+def is_quantized(model) -> bool:
+    """get_model()이 반환한 모델이 int8 양자화 모델인지 여부"""
+    return id(model) in _quantized_ids
+
+
+def fall_back_to_eager(name: str, error: Exception):
+    """
+    int8 모델 추론 실패 시 eager 모델로 교체 (이후 int8 요청도 eager 모델 사용)
+
+    Args:
+        name: demucs 사전학습 모델 이름
+        error: 추론 중 발생한 오류 (로그용)
+
+    Returns:
+        eager demucs 모델
+    """
+    with _model_lock:
+        eager = _models.get((name, 'eager'))
+        if eager is None:
+            eager = _load_pretrained(name)
+            _models[(name, 'eager')] = eager
+        if _models.get((name, 'int8')) is not eager:
+            print(f"int8 inference failed for demucs model '{name}' ({str(error)}), falling back to eager")
+            _models[(name, 'int8')] = eager
+        return eager
+
+
+def get_model(name: str = DEMUCS_MODEL_NAME, backend: str = SEPARATION_BACKEND):
+    """
+    demucs 모델 반환 (최초 호출 시에만 로드)
+
+    Args:
+        name: demucs 사전학습 모델 이름
+        backend: 추론 백엔드 (eager/int8, int8은 CPU에서만 사용하고 실패하면 eager)
+
+    Returns:
+        tuple: (model, device)
+    """
+    with _model_lock:
+        key = (name, backend)
+        if key not in _models:
+            device = get_device()
+
+            print(f"Loading demucs model '{name}' (backend: {backend})...")
+            start = time.perf_counter()
+
+            model = None
+            if backend == 'int8':
+                if device.type == 'cpu':
+                    model = _load_quantized(name)
+                else:
+                    print("int8 backend is CPU only, using eager model")
+                if model is None:
+                    print(f"Falling back to eager demucs model '{name}'")
+                else:
+                    _quantized_ids.add(id(model))
+            if model is None:
+                model = _models.get((name, 'eager')) or _load_pretrained(name)
+                _models.setdefault((name, 'eager'), model)
+
+            elapsed = time.perf_counter() - start
+            _models[key] = model
+            model_load_times[key] = elapsed
+            record_stage('model_load', elapsed)
+            print(f"Demucs model '{name}' loaded in {elapsed:.2f}s")
+
+        return _models[key], get_device()
+
+
+def preload_model(name: str = None):
+    """워커 시작 시 모델 미리 로드 (기본값: 기본 프로필의 모델, 실패해도 첫 작업에서 재시도)"""
+    settings = SEPARATION_PROFILES[DEFAULT_SEPARATION_PROFILE]
+    if name is None:
+        name = settings['model']
+    try:
+        get_model(name, settings['backend'])
+    except Exception as e:
+        print(f"Failed to preload demucs model '{name}': {str(e)}")
+
+
+def get_source_model(model, source: str = 'vocals'):
+    """
+    소스 전용 모델 반환
+
+    htdemucs_ft 같은 BagOfModels는 소스별 전문 모델의 묶음이므로,
+    해당 소스의 가중치만 가진 모델이 있으면 그 모델 하나만 반환
+    (단일 모델이거나 여러 모델이 섞여 쓰이는 경우 원래 모델 반환)
+
+    Args:
+        model: get_model()로 얻은 demucs 모델
+        source: 소스 이름 (vocals, drums, bass, other)
+
+    Returns:
+        demucs 모델 (출력 소스 순서는 model.sources와 같음)
+    """
+    sub_models = getattr(model, 'models', None)
+    if not sub_models:
+        return model
+
+    source_idx = model.sources.index(source)
+    contributors = [
+        i for i, weights in enumerate(model.weights)
+        if weights[source_idx] > 0
+    ]
+    if len(contributors) != 1:
+        return model
+    return sub_models[contributors[0]]
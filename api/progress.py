@@ -0,0 +1,196 @@
+"""
+작업 진행률 보고/취소 모듈
+
+실행기에서 실행 중인 단계가 report_progress()로 진행률(0~1)을 보내면
+API 프로세스의 listener(job_queue)가 받아 작업 상태에 반영
+- 스레드 실행기: listener를 바로 호출
+- 프로세스 풀 워커: 워커 초기화 때 받은 multiprocessing 큐로 보내고,
+  API 프로세스의 수신 스레드가 listener 호출
+API 프로세스에서 cancel()한 작업은 실행 중인 단계가 다음 구간 경계
+(report_progress/check_cancelled 호출 시점)에서 JobCancelled로 중단
+단계가 끝난 뒤에도 워커에서 계속되는 분리 파일 업로드는 report_transfer()로 같은 경로를 통해
+완료를 알리고, API 프로세스는 expect_transfers()로 받은 Future로 기다림
+"""
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+
+MIN_PROGRESS_STEP = 0.01  # 이보다 작은 변화는 보고하지 않음 (상태 알림 횟수 제한)
+
+_local = threading.local()  # 스레드별 보고 대상 (작업 ID, 단계, 마지막 보고 값)
+_listener = None            # API 프로세스: (job_id, stage, fraction) 콜백
+_queue = None               # 프로세스 풀 워커: API 프로세스로 보내는 큐
+_cancelled = {}             # 취소된 job_id (프로세스 풀 사용 시 워커와 공유하는 Manager dict)
+_manager = None             # _cancelled를 공유하는 Manager (API 프로세스에서 유지)
+_transfers = {}             # API 프로세스: 워커에서 진행 중인 전송 {(job_id, 이름): Future}
+_transfers_lock = threading.Lock()
+
+
+class JobCancelled(Exception):
+    """취소된 작업의 단계 중단"""
+
+
+def set_listener(callback):
+    """진행률을 받을 콜백 등록 (API 프로세스)"""
+    global _listener
+    _listener = callback
+
+
+def create_progress_queue(mp_context):
+    """
+    프로세스 풀 워커용 진행률 큐 생성 및 수신 스레드 시작
+
+    Args:
+        mp_context: 프로세스 풀의 multiprocessing context
+
+    Returns:
+        multiprocessing.Queue: 워커 초기화 시 init_worker()에 넘길 큐
+    """
+    progress_queue = mp_context.Queue()
+
+    def receive():
+        while True:
+            kind, *message = progress_queue.get()
+            if kind == 'transfer':
+                _deliver_transfer(*message)
+            else:
+                _deliver(*message)
+
+    threading.Thread(target=receive, daemon=True).start()
+    return progress_queue
+
+
+def share_cancellations(mp_context):
+    """
+    프로세스 풀 워커와 공유할 취소 목록 생성 (이후 cancel()이 워커에도 보임)
+
+    Args:
+        mp_context: 프로세스 풀의 multiprocessing context
+
+    Returns:
+        DictProxy: 워커 초기화 시 init_worker()에 넘길 취소 목록
+    """
+    global _cancelled, _manager
+    if _manager is None:
+        _manager = mp_context.Manager()
+        _cancelled = _manager.dict()
+    return _cancelled
+
+
+def init_worker(progress_queue, cancelled=None):
+    """프로세스 풀 워커 초기화 (진행률을 큐로 보내고, 취소 목록을 API 프로세스와 공유)"""
+    global _queue, _cancelled
+    _queue = progress_queue
+    if cancelled is not None:
+        _cancelled = cancelled
+
+
+def cancel(job_id: str):
+    """작업 취소 표시 (실행 중인 단계는 다음 구간 경계에서 중단)"""
+    _cancelled[job_id] = True
+
+
+def clear_cancelled(job_id: str):
+    """작업이 끝난 뒤 취소 표시 제거"""
+    _cancelled.pop(job_id, None)
+
+
+def is_cancelled(job_id: str) -> bool:
+    return job_id in _cancelled
+
+
+def _deliver(job_id: str, stage: str, fraction: float):
+    if _listener is None:
+        return
+    try:
+        _listener(job_id, stage, fraction)
+    except Exception as e:
+        print(f"[{job_id}] Failed to update progress: {str(e)}")
+
+
+@contextmanager
+def track_progress(job_id: str, stage: str):
+    """with 블록 안에서 현재 스레드가 보고하는 진행률을 작업/단계에 연결"""
+    previous = getattr(_local, 'context', None)
+    _local.context = [job_id, stage, 0.0]
+    try:
+        yield
+    finally:
+        _local.context = previous
+
+
+def check_cancelled():
+    """현재 스레드의 작업이 취소되었으면 JobCancelled 발생 (track_progress() 밖에서는 무시)"""
+    context = getattr(_local, 'context', None)
+    if context is not None and is_cancelled(context[0]):
+        raise JobCancelled(context[0])
+
+
+def report_progress(fraction: float):
+    """현재 단계 진행률 보고 (취소된 작업이면 JobCancelled 발생, track_progress() 밖에서는 무시)"""
+    context = getattr(_local, 'context', None)
+    if context is None:
+        return
+    check_cancelled()
+
+    job_id, stage, last = context
+    fraction = min(max(fraction, 0.0), 1.0)
+    if fraction <= last or (fraction - last < MIN_PROGRESS_STEP and fraction < 1.0):
+        return
+    context[2] = fraction
+
+    if _queue is not None:
+        _queue.put(('progress', job_id, stage, fraction))
+    else:
+        _deliver(job_id, stage, fraction)
+
+
+def current_job_id():
+    """현재 스레드가 진행률을 보고하는 작업 ID (track_progress() 밖이면 None)"""
+    context = getattr(_local, 'context', None)
+    return context[0] if context is not None else None
+
+
+def expect_transfers(job_id: str, names) -> dict:
+    """
+    워커에서 끝날 전송의 완료를 기다릴 Future 등록 (API 프로세스, 단계 실행 전에 호출)
+
+    Args:
+        job_id: 작업 ID
+        names: 전송 이름 목록 (예: ('vocal', 'mr'))
+
+    Returns:
+        dict: {이름: Future} - report_transfer()로 결과/오류가 전달됨
+    """
+    futures = {name: Future() for name in names}
+    with _transfers_lock:
+        for name, future in futures.items():
+            _transfers[(job_id, name)] = future
+    return futures
+
+
+def forget_transfers(job_id: str):
+    """작업이 끝난 뒤 전송 대기 등록 해제 (이후 도착하는 완료 알림은 무시)"""
+    with _transfers_lock:
+        for key in [key for key in _transfers if key[0] == job_id]:
+            del _transfers[key]
+
+
+def report_transfer(job_id: str, name: str, result=None, error: str = None):
+    """워커에서 끝난 전송의 결과/오류를 API 프로세스에 알림 (등록되지 않은 전송은 무시)"""
+    if _queue is not None:
+        _queue.put(('transfer', job_id, name, result, error))
+    else:
+        _deliver_transfer(job_id, name, result, error)
+
+
+def _deliver_transfer(job_id: str, name: str, result, error: str):
+    with _transfers_lock:
+        future = _transfers.pop((job_id, name), None)
+    if future is None or future.done():
+        return
+    if error is not None:
+        future.set_exception(RuntimeError(error))
+    else:
+        future.set_result(result)
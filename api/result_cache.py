@@ -0,0 +1,238 @@
+"""
+분석 결과 캐시 모듈
+
+업로드 파일 해시 + 분석 조건(vocal_type, 분리 프로필, 음정 파라미터)을 키로
+분리된 파일 경로와 음정 분석 결과를 MinIO에 저장하고 재사용
+
+LRU 인덱스(최대 항목 수 제한)는 프로세스(gunicorn worker)별로 유지하므로, 전체 항목 수는
+최대 worker 수 x RESULT_CACHE_MAX_ENTRIES까지 늘어날 수 있음. 조회되지 않는 만료 항목은
+remove_expired_entries()가 MinIO 목록을 기준으로 정리 (프로세스와 무관)
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from io import BytesIO
+from minio import Minio
+
+from config import (
+    ORIGINAL_BUCKET,
+    SEPARATED_BUCKET,
+    USE_EXTERNAL_SEPARATOR,
+    SEPARATION_PROFILES,
+    RESULT_CACHE_ENABLED,
+    RESULT_CACHE_TTL_HOURS,
+    RESULT_CACHE_MAX_ENTRIES
+)
+from storage import generate_presigned_url
+from metrics import cache_lookups, add_storage_bytes
+from utils import get_pitch_params
+
+
+CACHE_PREFIX = 'cache'  # SEPARATED_BUCKET 내 캐시 항목 저장 경로
+
+# ===== 로컬 인덱스 (LRU 순서 유지, 프로세스별) =====
+cache_index = OrderedDict()  # {cache_key: created_at(timestamp)}
+cache_lock = threading.Lock()  # 인덱스 보호용 (MinIO 요청은 잠금 밖에서 실행)
+
+
+def compute_content_hash(file) -> str:
+    """
+    업로드 파일 내용의 SHA-256 해시 계산 (읽은 후 스트림 위치 복원)
+
+    Args:
+        file: Flask request.files에서 받은 파일 객체
+
+    Returns:
+        str: 16진수 해시 문자열
+    """
+    hasher = hashlib.sha256()
+    for chunk in iter(lambda: file.stream.read(1024 * 1024), b''):
+        hasher.update(chunk)
+    file.stream.seek(0)
+    return hasher.hexdigest()
+
+
+def build_cache_key(content_hash: str, vocal_type: str, profile: str) -> str:
+    """파일 해시와 분석 조건으로 캐시 키 생성 (프로필은 이름이 아닌 실제 분리 설정으로 구분)"""
+    params = {
+        'content_hash': content_hash,
+        'vocal_type': vocal_type,
+        'separation': 'external' if USE_EXTERNAL_SEPARATOR else SEPARATION_PROFILES[profile],
+        'pitch': get_pitch_params(vocal_type)
+    }
+    serialized = json.dumps(params, sort_keys=True)
+    return hashlib.sha256(serialized.encode('utf-8')).hexdigest()
+
+
+def _object_name(cache_key: str) -> str:
+    return f"{CACHE_PREFIX}/{cache_key}.json"
+
+
+def _is_expired(created_at: float) -> bool:
+    return time.time() - created_at > RESULT_CACHE_TTL_HOURS * 3600
+
+
+def _remove_entry(minio_client: Minio, cache_key: str):
+    """MinIO에서 캐시 항목 삭제 (인덱스에서는 cache_lock 안에서 미리 제거)"""
+    try:
+        minio_client.remove_object(SEPARATED_BUCKET, _object_name(cache_key))
+    except Exception as e:
+        print(f"Failed to remove cache entry {cache_key}: {str(e)}")
+
+
+def _load_entry(minio_client: Minio, cache_key: str):
+    """MinIO에서 캐시 항목 읽기 (없으면 None)"""
+    try:
+        response = minio_client.get_object(SEPARATED_BUCKET, _object_name(cache_key))
+        try:
+            data = response.read()
+            add_storage_bytes('download', len(data))
+            return json.loads(data)
+        finally:
+            response.close()
+            response.release_conn()
+    except Exception:
+        return None
+
+
+def lookup_cached_result(minio_client: Minio, content_hash: str, vocal_type: str, profile: str,
+                         original_filename: str):
+    """
+    캐시된 분석 결과 조회
+
+    Args:
+        minio_client: MinIO 클라이언트 인스턴스
+        content_hash: 업로드 파일 해시
+        vocal_type: 보컬 타입 (female/male)
+        profile: 분리 품질 프로필 이름
+        original_filename: 이번 요청의 원본 파일명
+
+    Returns:
+        dict: 작업 결과 (presigned URL 새로 발급) 또는 None
+    """
+    if not RESULT_CACHE_ENABLED:
+        return None
+
+    cache_key = build_cache_key(content_hash, vocal_type, profile)
+
+    with cache_lock:
+        created_at = cache_index.get(cache_key)
+        expired = created_at is not None and _is_expired(created_at)
+        if expired:
+            cache_index.pop(cache_key, None)
+    if expired:
+        _remove_entry(minio_client, cache_key)
+        cache_lookups.inc(result='miss')
+        return None
+
+    # 인덱스에 없어도 MinIO에 남아있을 수 있음 (서버 재시작 등)
+    entry = _load_entry(minio_client, cache_key)
+    if entry is None:
+        with cache_lock:
+            cache_index.pop(cache_key, None)
+        cache_lookups.inc(result='miss')
+        return None
+
+    if _is_expired(entry['created_at']):
+        with cache_lock:
+            cache_index.pop(cache_key, None)
+        _remove_entry(minio_client, cache_key)
+        cache_lookups.inc(result='miss')
+        return None
+
+    with cache_lock:
+        cache_index[cache_key] = entry['created_at']
+        cache_index.move_to_end(cache_key)
+
+    file_url = generate_presigned_url(
+        minio_client,
+        ORIGINAL_BUCKET,
+        entry['original_object_name'],
+        expires_hours=24
+    )
+
+    filename_without_ext = os.path.splitext(original_filename)[0]
+
+    cache_lookups.inc(result='hit')
+    print(f"Result cache hit: {cache_key[:12]}")
+    return {
+        'clef': entry['clef'],
+        'original_filename': filename_without_ext,
+        'file_url': file_url,
+        'notes': entry['notes']
+    }
+
+
+def store_result(minio_client: Minio, content_hash: str, vocal_type: str, profile: str,
+                 original_object_name: str, saved_files: dict, result: dict):
+    """
+    분석 결과를 캐시에 저장
+
+    Args:
+        minio_client: MinIO 클라이언트 인스턴스
+        content_hash: 업로드 파일 해시
+        vocal_type: 보컬 타입 (female/male)
+        profile: 분리 품질 프로필 이름
+        original_object_name: MinIO에 저장된 원본 파일명
+        saved_files: 분리된 파일 정보 (vocal_object_name, mr_object_name)
+        result: 작업 결과 (clef, notes)
+    """
+    if not RESULT_CACHE_ENABLED:
+        return
+
+    cache_key = build_cache_key(content_hash, vocal_type, profile)
+    created_at = time.time()
+
+    entry = {
+        'created_at': created_at,
+        'original_object_name': original_object_name,
+        'vocal_object_name': saved_files.get('vocal_object_name'),
+        'mr_object_name': saved_files.get('mr_object_name'),
+        'clef': result['clef'],
+        'notes': result['notes']
+    }
+    data = json.dumps(entry, ensure_ascii=False).encode('utf-8')
+
+    minio_client.put_object(
+        SEPARATED_BUCKET,
+        _object_name(cache_key),
+        BytesIO(data),
+        len(data),
+        content_type='application/json'
+    )
+    add_storage_bytes('upload', len(data))
+
+    with cache_lock:
+        cache_index[cache_key] = created_at
+        cache_index.move_to_end(cache_key)
+
+        # LRU 제거 (최대 항목 수 초과 시 가장 오래 사용되지 않은 항목부터, 삭제는 잠금 해제 후)
+        evicted = []
+        while len(cache_index) > RESULT_CACHE_MAX_ENTRIES:
+            oldest_key, _ = cache_index.popitem(last=False)
+            evicted.append(oldest_key)
+
+    for oldest_key in evicted:
+        _remove_entry(minio_client, oldest_key)
+
+
+def remove_expired_entries(minio_client: Minio) -> int:
+    """
+    만료된 캐시 항목 삭제 (다시 조회되지 않는 항목 정리)
+
+    Returns:
+        int: 삭제한 항목 수
+    """
+    removed = 0
+    for obj in minio_client.list_objects(SEPARATED_BUCKET, prefix=f"{CACHE_PREFIX}/"):
+        if obj.last_modified is None or not _is_expired(obj.last_modified.timestamp()):
+            continue
+        cache_key = obj.object_name[len(CACHE_PREFIX) + 1:-len('.json')]
+        with cache_lock:
+            cache_index.pop(cache_key, None)
+        _remove_entry(minio_client, cache_key)
+        removed += 1
+    return removed
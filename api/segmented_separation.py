@@ -0,0 +1,326 @@
+"""
+구간 단위 음원 분리 모듈
+
+원본을 겹치는 구간(window)으로 나눠 읽고 구간마다 demucs를 실행한 뒤,
+겹친 부분을 cross-fade로 이어붙임. 완성된 구간은 바로
+- vocal/MR WAV 스트리밍 업로드
+- 음정 분석(구간별 pyin)
+으로 넘겨, 뒤 구간을 분리하는 동안 앞 구간의 업로드/음정 분석이 진행됨.
+구간별 pyin은 음정 분석 코어에 배정된 하위 프로세스 풀(get_chunk_executor)에서 실행하므로
+분리 코어를 두고 demucs와 경쟁하지 않음 (구간별 분리에서는 음정 분석 워커가 쓰이지 않음)
+분리 출력과 모델 중간값의 메모리는 곡 길이가 아니라 구간 길이에 비례
+"""
+import math
+import queue
+from io import BytesIO
+
+import numpy as np
+from minio import Minio
+
+from config import (
+    SEPARATED_BUCKET,
+    SEPARATION_PROFILES,
+    DEFAULT_SEPARATION_PROFILE,
+    SEPARATION_WINDOW_SECONDS,
+    SEPARATION_WINDOW_OVERLAP_SECONDS,
+    PITCH_CHUNK_SECONDS
+)
+from services import (
+    transfer_executor,
+    decode_audio,
+    wav_header,
+    encode_pcm16
+)
+from separation_batcher import separation_batcher
+from storage import generate_presigned_url, put_stream
+from model_registry import get_model
+from utils import StreamingPitchTracker, get_chunk_executor
+from metrics import stage
+from progress import report_progress
+
+
+RESAMPLE_CONTEXT_SECONDS = 0.05  # 구간별 리샘플링 시 앞뒤로 더 읽을 길이 (필터 폭보다 충분히 김)
+UPLOAD_QUEUE_BLOCKS = 2          # 업로드 대기 블록 수 (업로드가 느리면 분리를 잠시 멈춤)
+
+
+class MixReader:
+    """
+    원본 오디오를 모델 샘플링 레이트/채널 기준의 임의 구간으로 읽는 리더
+
+    soundfile로 열 수 있으면 필요한 구간만 seek해서 읽고(리샘플링 포함),
+    열 수 없는 형식은 전체를 디코딩한 뒤 잘라서 반환
+    """
+
+    def __init__(self, file_data: bytes, unique_filename: str, samplerate: int, channels: int):
+        import soundfile as sf  # pyright: ignore[reportMissingImports]
+
+        self.samplerate = samplerate
+        self.channels = channels
+        self.sound_file = None
+        self.mix = None
+
+        try:
+            self.sound_file = sf.SoundFile(BytesIO(file_data))
+            self.file_samplerate = self.sound_file.samplerate
+            # 리샘플링 비율을 기약분수로 (구간 경계를 정수 샘플에 맞추기 위해 사용)
+            divisor = math.gcd(self.file_samplerate, samplerate)
+            self.in_step = self.file_samplerate // divisor
+            self.out_step = samplerate // divisor
+            self.length = self.sound_file.frames * samplerate // self.file_samplerate
+        except sf.LibsndfileError as e:
+            print(f"soundfile open failed, decoding whole file: {str(e)}")
+            self.sound_file = None
+            self.mix = decode_audio(file_data, unique_filename, samplerate, channels)
+            self.length = self.mix.shape[-1]
+            self.in_step = self.out_step = 1
+
+    def read(self, start: int, end: int):
+        """
+        [start, end) 구간 반환 (모델 샘플링 레이트 기준, 부족하면 0으로 채움)
+
+        Returns:
+            torch.Tensor: (channels, end - start) 형태의 텐서
+        """
+        import torch as th  # pyright: ignore[reportMissingImports]
+        from demucs.audio import convert_audio  # pyright: ignore[reportMissingImports]
+
+        if self.sound_file is None:
+            wav = self.mix[:, start:end]
+        else:
+            # 입력 구간 경계를 in_step 배수로 맞추면 출력 샘플 위치가 정확히 대응됨
+            context = self.in_step * math.ceil(RESAMPLE_CONTEXT_SECONDS * self.file_samplerate / self.in_step)
+            in_start = max(0, start // self.out_step * self.in_step - context)
+            in_end = min(
+                self.sound_file.frames,
+                math.ceil(end / self.out_step) * self.in_step + context
+            )
+
+            self.sound_file.seek(in_start)
+            data = self.sound_file.read(in_end - in_start, dtype='float32', always_2d=True)
+            wav = convert_audio(
+                th.from_numpy(data.T.copy()),
+                self.file_samplerate,
+                self.samplerate,
+                self.channels
+            )
+            offset = start - in_start * self.out_step // self.in_step
+            wav = wav[:, offset:offset + end - start]
+
+        if wav.shape[-1] < end - start:
+            wav = th.nn.functional.pad(wav, (0, end - start - wav.shape[-1]))
+        return wav
+
+    def close(self):
+        if self.sound_file is not None:
+            self.sound_file.close()
+
+
+class CrossFader:
+    """
+    겹치는 구간 출력을 선형 cross-fade로 이어붙여 확정된 부분만 반환
+    """
+
+    def __init__(self, overlap: int):
+        self.overlap = overlap
+        self.tail = None  # 다음 구간과 섞을 이전 구간의 끝부분
+
+    def push(self, block, is_last: bool):
+        """
+        구간 출력 추가
+
+        Args:
+            block: (samples, channels) 배열, 이전 구간과 overlap 샘플만큼 겹침
+            is_last: 마지막 구간 여부
+
+        Returns:
+            numpy 배열: 확정된 (samples, channels) 출력
+        """
+        if self.tail is not None:
+            n = len(self.tail)
+            ramp = np.linspace(0, 1, n + 2, dtype=np.float32)[1:-1, None]
+            block = block.copy()
+            block[:n] = self.tail * (1 - ramp) + block[:n] * ramp
+
+        if is_last:
+            self.tail = None
+            return block
+
+        self.tail = block[-self.overlap:]
+        return block[:-self.overlap]
+
+
+class StemUploadStream:
+    """
+    확정되는 블록을 받는 대로 WAV(PCM_16)로 인코딩하여 MinIO에 스트리밍 업로드
+    (전체 길이를 미리 알고 있으므로 헤더를 먼저 보냄)
+    """
+
+    def __init__(self, minio_client: Minio, object_name: str, n_samples: int, channels: int, samplerate: int):
+        self.minio_client = minio_client
+        self.object_name = object_name
+        self.n_samples = n_samples
+        self.channels = channels
+        self.samplerate = samplerate
+        self.blocks = queue.Queue(maxsize=UPLOAD_QUEUE_BLOCKS)
+        self.future = transfer_executor.submit(self._upload)
+
+    def _chunks(self):
+        yield wav_header(self.n_samples, self.channels, self.samplerate)
+        while True:
+            block = self.blocks.get()
+            if block is None:
+                return
+            if isinstance(block, BaseException):
+                raise block
+            yield encode_pcm16(block)
+
+    def _upload(self):
+        put_stream(
+            self.minio_client,
+            SEPARATED_BUCKET,
+            self.object_name,
+            self._chunks(),
+            length=44 + self.n_samples * self.channels * 2,
+            content_type='audio/wav'
+        )
+        return generate_presigned_url(
+            self.minio_client,
+            SEPARATED_BUCKET,
+            self.object_name,
+            expires_hours=24
+        )
+
+    def _put(self, item):
+        # 업로드가 실패해 더 이상 읽지 않으면 대기하지 않고 바로 오류 반환
+        while True:
+            if self.future.done():
+                self.future.result()
+                return
+            try:
+                self.blocks.put(item, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+    def write(self, block):
+        """확정된 (samples, channels) 블록 추가"""
+        self._put(block)
+
+    def close(self) -> str:
+        """업로드 완료 대기 후 presigned URL 반환"""
+        self._put(None)
+        return self.future.result()
+
+    def abort(self, error: BaseException):
+        """업로드 중단 (멀티파트 업로드는 minio가 정리)"""
+        while not self.future.done():
+            try:
+                self.blocks.put(error, timeout=1)
+                return
+            except queue.Full:
+                continue
+
+
+def separate_audio_segmented(file_data: bytes, unique_filename: str, separated_folder: str, minio_client: Minio,
+                             profile: str = DEFAULT_SEPARATION_PROFILE, vocal_type: str = None):
+    """
+    구간 단위로 보컬/MR을 분리하면서 MinIO 업로드와 음정 분석을 함께 진행
+
+    Args:
+        file_data: 원본 파일 바이너리 데이터
+        unique_filename: 원본 파일명 (확장자 포함)
+        separated_folder: MinIO에 저장할 폴더명
+        minio_client: MinIO 클라이언트 인스턴스
+        profile: 분리 품질 프로필 이름 (SEPARATION_PROFILES의 키)
+        vocal_type: 보컬 타입 (female/male, 음정 분석 음역 선택용)
+
+    Returns:
+        dict: 저장된 파일 정보 {'vocal_minio_url': str, 'vocal_object_name': str, 'mr_minio_url': str,
+                               'mr_object_name': str, 'notes': 음정 분석 결과}
+    """
+    settings = SEPARATION_PROFILES[profile]
+    model, device = get_model(settings['model'], settings['backend'])
+    samplerate = model.samplerate
+
+    print(f"Opening audio file: {unique_filename}")
+    reader = MixReader(file_data, unique_filename, samplerate, model.audio_channels)
+    total = reader.length
+    if total == 0:
+        reader.close()
+        raise ValueError(f"입력 오디오 파일이 비어있거나 손상되었습니다.")
+
+    # 구간 경계를 리샘플링 단위(out_step) 배수로 맞춤
+    step = reader.out_step
+    window = max(step, int(SEPARATION_WINDOW_SECONDS * samplerate) // step * step)
+    overlap = min(window, max(step, int(SEPARATION_WINDOW_OVERLAP_SECONDS * samplerate) // step * step))
+
+    vocal_object_name = f"{separated_folder}/vocal.wav"
+    mr_object_name = f"{separated_folder}/mr.wav"
+    vocal_upload = StemUploadStream(minio_client, vocal_object_name, total, model.audio_channels, samplerate)
+    mr_upload = StemUploadStream(minio_client, mr_object_name, total, model.audio_channels, samplerate)
+    pitch_tracker = StreamingPitchTracker(
+        total,
+        samplerate,
+        get_chunk_executor(offload=True),
+        PITCH_CHUNK_SECONDS if PITCH_CHUNK_SECONDS > 0 else SEPARATION_WINDOW_SECONDS,
+        vocal_type=vocal_type
+    )
+    vocal_fader = CrossFader(overlap)
+    mr_fader = CrossFader(overlap)
+
+    n_windows = max(1, math.ceil((total - overlap) / window))
+    print(f"Separating audio in {n_windows} window(s) "
+          f"({settings['model']}, mode={settings['mode']}, shifts={settings['shifts']})...")
+
+    try:
+        with separation_batcher.job():
+            for index, start in enumerate(range(0, total, window)):
+                end = min(start + window + overlap, total)
+                is_last = end == total
+
+                with stage('decode'):
+                    mix = reader.read(start, end).to(device)[None]
+                with stage('separation'):
+                    # 다른 작업의 같은 길이 구간과 묶여 배치로 실행될 수 있음
+                    vocal_tensor, mr_tensor = separation_batcher.separate(model, mix, settings, device)
+                    del mix
+
+                    # (channels, samples) -> (samples, channels)
+                    vocal_block = vocal_fader.push(vocal_tensor.cpu().numpy().T, is_last)
+                    mr_block = mr_fader.push(mr_tensor.cpu().numpy().T, is_last)
+                    del vocal_tensor, mr_tensor
+
+                vocal_upload.write(vocal_block)
+                mr_upload.write(mr_block)
+                # 음정 분석용 vocal 신호 (librosa와 같은 방식으로 채널 평균)
+                pitch_tracker.feed(vocal_block.mean(axis=1))
+                report_progress((index + 1) / n_windows)
+
+                if is_last:
+                    break
+
+        print(f"Audio separation completed")
+
+        # 분리가 끝난 뒤 남은 업로드/음정 분석 대기 시간만 기록 (나머지는 분리와 겹쳐 진행됨)
+        with stage('stem_upload'):
+            saved_files = {
+                'vocal_object_name': vocal_object_name,
+                'vocal_minio_url': vocal_upload.close(),
+                'mr_object_name': mr_object_name,
+                'mr_minio_url': mr_upload.close()
+            }
+        print(f"Uploaded vocal to MinIO: {vocal_object_name}")
+        print(f"Uploaded MR to MinIO: {mr_object_name}")
+
+        with stage('pitch'):
+            saved_files['notes'] = pitch_tracker.finish()
+        print(f"Pitch analysis completed: {len(saved_files['notes'])} notes")
+        return saved_files
+
+    except Exception as e:
+        vocal_upload.abort(e)
+        mr_upload.abort(e)
+        raise
+
+    finally:
+        reader.close()
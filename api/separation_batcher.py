@@ -0,0 +1,131 @@
+"""
+음원 분리 배치 처리 모듈
+
+여러 작업이 동시에 구간별 분리를 진행할 때, 같은 모델/설정/길이의 구간 요청을
+모아(최대 SEPARATION_BATCH_SIZE개, 최대 SEPARATION_BATCH_WAIT_MS 대기)
+하나의 배치 텐서로 demucs를 한 번에 실행하고 결과를 각 작업에 나눠 돌려줌.
+배치는 모델이 올라간 프로세스 안에서만 만들어지므로, 여러 작업이 같은 프로세스에서
+분리되는 구성(JOB_EXECUTOR=thread, SEPARATION_WORKERS > 1)에서 효과가 있음
+(구간별 분리 중인 다른 작업이 없으면 기다리지 않고 바로 실행)
+"""
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from config import SEPARATION_BATCH_SIZE, SEPARATION_BATCH_WAIT_MS
+from services import separate_mix, separate_batch
+
+
+class _BatchRequest:
+    """배치 대기 중인 구간 분리 요청"""
+
+    def __init__(self, model, mix, settings: dict, device):
+        self.model = model
+        self.mix = mix
+        self.settings = settings
+        self.device = device
+        # 같은 키끼리만 묶음 (길이가 같아야 패딩 없이 결과가 단독 실행과 같음)
+        self.key = (id(model), tuple(sorted(settings.items())), tuple(mix.shape[1:]))
+        self.future = Future()
+
+
+class SeparationBatcher:
+    """구간 분리 요청을 모아 배치로 실행하는 스케줄러 (전용 스레드 1개)"""
+
+    def __init__(self, max_batch: int, max_wait: float):
+        """
+        Args:
+            max_batch: 한 번에 실행할 최대 구간 수
+            max_wait: 첫 요청 도착 후 배치를 채우기 위해 기다릴 최대 시간 (초)
+        """
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.pending = []  # 도착 순서대로 보관
+        self.active_jobs = 0  # 구간별 분리 중인 작업 수 (job() 안에서 실행 중)
+        self.condition = threading.Condition()
+        self.thread = None
+
+    @contextmanager
+    def job(self):
+        """
+        구간별 분리 작업 하나의 실행 구간 표시
+
+        작업은 구간을 하나씩 순서대로 요청하므로, 실행 중인 작업이 모두 요청을 대기열에
+        올려 두었다면 더 기다려도 배치에 합류할 요청이 없음 (_next_batch에서 대기 생략)
+        """
+        with self.condition:
+            self.active_jobs += 1
+        try:
+            yield
+        finally:
+            with self.condition:
+                self.active_jobs -= 1
+                self.condition.notify_all()
+
+    def separate(self, model, mix, settings: dict, device):
+        """
+        구간 하나를 분리 (배치에 합류하여 실행될 때까지 대기)
+
+        Args:
+            model: demucs 모델
+            mix: (1, channels, samples) 형태의 텐서
+            settings: 분리 설정 (model, shifts, overlap, segment, mode)
+            device: 연산 장치
+
+        Returns:
+            tuple: (vocal 텐서, MR 텐서) - (channels, samples) 형태
+        """
+        if self.max_batch <= 1:
+            return separate_mix(model, mix, settings, device)
+
+        request = _BatchRequest(model, mix, settings, device)
+        with self.condition:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self._run, daemon=True)
+                self.thread.start()
+            self.pending.append(request)
+            self.condition.notify_all()
+        return request.future.result()
+
+    def _next_batch(self) -> list:
+        """가장 오래 기다린 요청과 같은 키의 요청을 모아 반환"""
+        with self.condition:
+            while not self.pending:
+                self.condition.wait()
+
+            first = self.pending[0]
+            deadline = time.monotonic() + self.max_wait
+            while True:
+                batch = [r for r in self.pending if r.key == first.key][:self.max_batch]
+                remaining = deadline - time.monotonic()
+                # 요청을 올리지 않은 작업(디코딩/업로드 중)이 없으면 합류할 요청도 없음
+                others_running = self.active_jobs > len(self.pending)
+                if len(batch) >= self.max_batch or remaining <= 0 or not others_running:
+                    break
+                self.condition.wait(remaining)
+
+            for request in batch:
+                self.pending.remove(request)
+            return batch
+
+    def _run(self):
+        import torch as th  # pyright: ignore[reportMissingImports]
+
+        while True:
+            batch = self._next_batch()
+            first = batch[0]
+            try:
+                mix = th.cat([request.mix for request in batch]) if len(batch) > 1 else first.mix
+                if len(batch) > 1:
+                    print(f"Separating batch of {len(batch)} windows")
+                vocal_batch, mr_batch = separate_batch(first.model, mix, first.settings, first.device)
+                for i, request in enumerate(batch):
+                    request.future.set_result((vocal_batch[i], mr_batch[i]))
+            except Exception as e:
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+
+
+separation_batcher = SeparationBatcher(SEPARATION_BATCH_SIZE, SEPARATION_BATCH_WAIT_MS / 1000)
@@ -1,6 +1,11 @@
 import os
+import struct
 import uuid
+import wave
+import numpy as np
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from datetime import datetime
 from io import BytesIO
 from minio import Minio
@@ -9,10 +14,25 @@ from config import (
     ANALYSIS_SERVER_URL,
     SEPARATED_BUCKET,
     TEMP_UPLOAD_FOLDER,
-    TEMP_OUTPUT_FOLDER
+    STREAM_CHUNK_SIZE_KB,
+    TRANSFER_WORKERS,
+    ANALYSIS_CONNECT_TIMEOUT,
+    ANALYSIS_READ_TIMEOUT,
+    ANALYSIS_DOWNLOAD_READ_TIMEOUT,
+    SEPARATION_PROFILES,
+    DEFAULT_SEPARATION_PROFILE,
+    ORIGINAL_BUCKET
 )
-from utils import extract_pitch_info
-from storage import generate_presigned_url
+from utils import extract_pitch_info, extract_pitch_info_from_audio, load_wav_mono_stream
+from storage import generate_presigned_url, put_stream
+from model_registry import get_model, get_source_model, is_quantized, fall_back_to_eager
+from http_client import get_analysis_session
+from metrics import stage, add_storage_bytes
+from progress import check_cancelled, current_job_id, report_transfer
+
+
+# 분리 파일 전송용 스레드 풀 (vocal/MR 다운로드, 업로드, presigned URL 생성을 동시에 처리)
+transfer_executor = ThreadPoolExecutor(max_workers=TRANSFER_WORKERS)
 
 
 def save_uploaded_file(file, minio_client: Minio, bucket_name: str):
@@ -25,7 +45,8 @@ def save_uploaded_file(file, minio_client: Minio, bucket_name: str):
         bucket_name: 저장할 버킷 이름
     
     Returns:
-        dict: 파일 정보 (unique_filename, separated_folder, file_data, content_type)
+        dict: 파일 정보 (unique_filename, separated_folder, content_type)
+              원본 바이트는 보관하지 않으며, 처리 시 MinIO에서 다시 읽음
     """
     # timestamp + UUID로 고유한 파일명 생성
     ext = os.path.splitext(file.filename)[1].lower()
@@ -33,19 +54,20 @@ def save_uploaded_file(file, minio_client: Minio, bucket_name: str):
     unique_id = str(uuid.uuid4())[:8]  # UUID의 앞 8자리만 사용
     unique_filename = f"{timestamp}_{unique_id}{ext}"
     
-    # 파일을 메모리에서 읽어 MinIO에 업로드
-    file_data = file.read()
-    file_size = len(file_data)
-    file_stream = BytesIO(file_data)
+    # 업로드 스트림을 복사 없이 그대로 MinIO에 업로드 (크기는 스트림 끝 위치로 계산)
+    file.stream.seek(0, os.SEEK_END)
+    file_size = file.stream.tell()
+    file.stream.seek(0)
     
     # MinIO에 원본 파일 업로드
     minio_client.put_object(
         bucket_name,
         unique_filename,
-        file_stream,
+        file.stream,
         file_size,
         content_type=file.content_type or 'application/octet-stream'
     )
+    add_storage_bytes('upload', file_size)
     
     # 확장자 제거한 파일명 (처리된 파일 저장용 폴더명)
     filename_without_ext = os.path.splitext(unique_filename)[0]
@@ -54,11 +76,51 @@ def save_uploaded_file(file, minio_client: Minio, bucket_name: str):
         'original_filename': file.filename,
         'unique_filename': unique_filename,
         'separated_folder': filename_without_ext,
-        'file_data': file_data,  # 다른 서버로 전송하기 위해 추가
         'content_type': file.content_type or 'application/octet-stream'
     }
 
 
+def remove_job_files(file_info: dict, minio_client: Minio):
+    """
+    작업의 원본 파일과 분리된 파일 삭제 (취소된 작업 정리, 없는 파일은 무시)
+
+    Args:
+        file_info: 파일 정보 (unique_filename, separated_folder)
+        minio_client: MinIO 클라이언트 인스턴스
+    """
+    object_names = [(ORIGINAL_BUCKET, file_info['unique_filename'])]
+    for obj in minio_client.list_objects(SEPARATED_BUCKET, prefix=f"{file_info['separated_folder']}/"):
+        object_names.append((SEPARATED_BUCKET, obj.object_name))
+
+    for bucket_name, object_name in object_names:
+        try:
+            minio_client.remove_object(bucket_name, object_name)
+        except Exception as e:
+            print(f"Failed to remove {bucket_name}/{object_name}: {str(e)}")
+
+
+def load_original_file(unique_filename: str, minio_client: Minio, bucket_name: str):
+    """
+    MinIO에 저장된 원본 파일 읽기 (작업 처리 시작 시 사용)
+
+    Args:
+        unique_filename: 원본 파일명
+        minio_client: MinIO 클라이언트 인스턴스
+        bucket_name: 원본 버킷 이름
+
+    Returns:
+        bytes: 원본 파일 바이너리 데이터
+    """
+    response = minio_client.get_object(bucket_name, unique_filename)
+    try:
+        file_data = response.read()
+        add_storage_bytes('download', len(file_data))
+        return file_data
+    finally:
+        response.close()
+        response.release_conn()
+
+
 def send_file_to_analysis_server(file_data: bytes, filename: str, content_type: str):
     """
     분석 서버로 파일을 전송하고 분석 결과를 받음
@@ -80,11 +142,11 @@ def send_file_to_analysis_server(file_data: bytes, filename: str, content_type:
             'music_file': (filename, BytesIO(file_data), content_type)
         }
         
-        # 분석 서버로 POST 요청
-        response = requests.post(
+        # 분석 서버로 POST 요청 (공유 세션으로 연결 재사용)
+        response = get_analysis_session().post(
             f"{ANALYSIS_SERVER_URL}/v2/tracks/analyze",
             files=files,
-            timeout=540  # 9분 타임아웃 (nginx 10분보다 1분 짧게 설정)
+            timeout=(ANALYSIS_CONNECT_TIMEOUT, ANALYSIS_READ_TIMEOUT)
         )
         
         response.raise_for_status()  # HTTP 에러 발생 시 예외 발생
@@ -98,13 +160,17 @@ def send_file_to_analysis_server(file_data: bytes, filename: str, content_type:
         raise Exception(f'분석 서버 요청 중 오류: {str(e)}')
 
 
-def analyze_vocal_pitch_from_minio(vocal_object_name: str, minio_client: Minio):
+def analyze_vocal_pitch_from_minio(vocal_object_name: str, minio_client: Minio, vocal_type: str = None):
     """
-    MinIO에 저장된 vocal 파일을 다운로드하여 음정 분석 수행
+    MinIO에 저장된 vocal 파일을 스트리밍으로 읽어 음정 분석 수행
+    
+    PCM WAV는 응답 스트림에서 블록 단위로 바로 디코딩하고,
+    그 외 형식만 전체를 메모리로 읽어 librosa로 디코딩
     
     Args:
         vocal_object_name: MinIO의 vocal 파일 경로 (예: "separated/20240118_123456/vocal.wav")
         minio_client: MinIO 클라이언트 인스턴스
+        vocal_type: 보컬 타입 (female/male, 분석 음역 선택용)
     
     Returns:
         list: 음정 분석 결과 리스트
@@ -112,37 +178,106 @@ def analyze_vocal_pitch_from_minio(vocal_object_name: str, minio_client: Minio):
     Raises:
         Exception: MinIO 다운로드 또는 피치 분석 실패 시
     """
-    temp_vocal_path = None
-    try:
-        # MinIO에서 파일 다운로드
+    y, sr = None, None
+    
+    # MinIO에서 스트리밍 디코딩
+    with stage('vocal_load'):
         response = minio_client.get_object(SEPARATED_BUCKET, vocal_object_name)
-        vocal_data = response.read()
-        response.close()
-        response.release_conn()
-        
-        # 임시 파일로 저장
-        temp_vocal_path = f"/tmp/temp_vocal_{uuid.uuid4()}.wav"
-        with open(temp_vocal_path, 'wb') as f:
-            f.write(vocal_data)
-        
-        # 피치 분석
-        pitch_data = extract_pitch_info(temp_vocal_path)
-        print(f"Pitch analysis completed: {len(pitch_data)} notes found")
-        
-        return pitch_data
-        
-    finally:
-        # 임시 파일 삭제
-        if temp_vocal_path and os.path.exists(temp_vocal_path):
+        try:
+            y, sr = load_wav_mono_stream(response)
+            add_storage_bytes('download', int(response.headers.get('Content-Length', 0)))
+        except (wave.Error, EOFError) as e:
+            print(f"Streaming WAV decode failed, reading whole file: {str(e)}")
+        finally:
+            response.close()
+            response.release_conn()
+    
+    # 피치 분석
+    if y is not None:
+        with stage('pitch'):
+            pitch_data = extract_pitch_info_from_audio(y, sr, vocal_type)
+    else:
+        with stage('vocal_load'):
+            response = minio_client.get_object(SEPARATED_BUCKET, vocal_object_name)
             try:
-                os.remove(temp_vocal_path)
-            except Exception as e:
-                print(f"Failed to remove temp file: {str(e)}")
+                vocal_data = response.read()
+                add_storage_bytes('download', len(vocal_data))
+            finally:
+                response.close()
+                response.release_conn()
+        with stage('pitch'):
+            pitch_data = extract_pitch_info(BytesIO(vocal_data), vocal_type)
+    print(f"Pitch analysis completed: {len(pitch_data)} notes found")
+    
+    return pitch_data
+
+
+def analyze_vocal_pitch_from_audio(vocal_audio, samplerate: int, vocal_type: str = None):
+    """
+    분리 단계에서 넘겨받은 vocal 신호로 바로 음정 분석 수행 (다운로드/디코딩 생략)
+    
+    Args:
+        vocal_audio: mono vocal 신호 (numpy 배열)
+        samplerate: 샘플링 레이트
+        vocal_type: 보컬 타입 (female/male, 분석 음역 선택용)
+    
+    Returns:
+        list: 음정 분석 결과 리스트
+    """
+    with stage('pitch'):
+        pitch_data = extract_pitch_info_from_audio(vocal_audio, samplerate, vocal_type)
+    print(f"Pitch analysis completed: {len(pitch_data)} notes found")
+    
+    return pitch_data
 
 
-def download_and_save_separated_files(analysis_result: dict, separated_folder: str, minio_client: Minio):
+def stream_url_to_minio(url: str, object_name: str, minio_client: Minio):
     """
-    분석 서버에서 분리된 vocal/mr 파일을 다운로드하여 MinIO에 저장
+    분석 서버의 파일을 청크 단위로 받아 바로 MinIO에 멀티파트 업로드
+    (파일 전체를 메모리에 올리지 않고 파트 하나 분량만 유지)
+    
+    Args:
+        url: 다운로드할 파일 URL
+        object_name: MinIO에 저장할 객체 이름
+        minio_client: MinIO 클라이언트 인스턴스
+    """
+    with get_analysis_session().get(
+        url,
+        stream=True,
+        timeout=(ANALYSIS_CONNECT_TIMEOUT, ANALYSIS_DOWNLOAD_READ_TIMEOUT)
+    ) as response:
+        response.raise_for_status()
+        put_stream(
+            minio_client,
+            SEPARATED_BUCKET,
+            object_name,
+            response.iter_content(chunk_size=STREAM_CHUNK_SIZE_KB * 1024),
+            content_type='audio/wav'
+        )
+
+
+def transfer_separated_file(url: str, object_name: str, minio_client: Minio):
+    """
+    분석 서버의 분리 파일 1개를 MinIO로 옮기고 presigned URL 생성
+    
+    Returns:
+        tuple: (object_name, presigned_url)
+    """
+    stream_url_to_minio(url, object_name, minio_client)
+    
+    # Presigned URL 생성 (24시간 유효)
+    presigned_url = generate_presigned_url(
+        minio_client,
+        SEPARATED_BUCKET,
+        object_name,
+        expires_hours=24
+    )
+    return object_name, presigned_url
+
+
+def start_separated_file_transfers(analysis_result: dict, separated_folder: str, minio_client: Minio):
+    """
+    분석 서버에서 분리된 vocal/mr 파일을 MinIO로 옮기는 작업을 동시에 시작
     
     Args:
         analysis_result: 분석 서버 응답 결과 (vocal_url, mr_url 포함)
@@ -150,236 +285,345 @@ def download_and_save_separated_files(analysis_result: dict, separated_folder: s
         minio_client: MinIO 클라이언트 인스턴스
     
     Returns:
-        dict: 저장된 파일 정보 {'vocal_minio_url': str, 'vocal_object_name': str, 'mr_minio_url': str}
-    
-    Raises:
-        Exception: 파일 다운로드 또는 저장 실패 시
+        dict: {'vocal': Future 또는 None, 'mr': Future 또는 None}
+              각 Future 결과는 (object_name, presigned_url)
     """
-    saved_files = {
-        'vocal_minio_url': None,
-        'vocal_object_name': None,
-        'mr_minio_url': None
-    }
+    transfers = {'vocal': None, 'mr': None}
     
     # vocal 파일 다운로드 및 저장
     if 'vocal_url' in analysis_result:
         vocal_url = f"{ANALYSIS_SERVER_URL}{analysis_result['vocal_url']}"
         print(f"Downloading vocal from: {vocal_url}")
-        
-        # 파일 다운로드
-        response = requests.get(vocal_url, timeout=60)
-        response.raise_for_status()
-        
-        vocal_data = response.content
-        
-        # MinIO에 저장
-        vocal_object_name = f"{separated_folder}/vocal.wav"
-        
-        minio_client.put_object(
-            SEPARATED_BUCKET,
-            vocal_object_name,
-            BytesIO(vocal_data),
-            len(vocal_data),
-            content_type='audio/wav'
-        )
-        
-        # Presigned URL 생성 (24시간 유효)
-        saved_files['vocal_minio_url'] = generate_presigned_url(
-            minio_client,
-            SEPARATED_BUCKET,
-            vocal_object_name,
-            expires_hours=24
+        transfers['vocal'] = transfer_executor.submit(
+            transfer_separated_file, vocal_url, f"{separated_folder}/vocal.wav", minio_client
         )
-        saved_files['vocal_object_name'] = vocal_object_name  # 피치 분석을 위해 저장
     
     # mr 파일 다운로드 및 저장
     if 'mr_url' in analysis_result:
         mr_url = f"{ANALYSIS_SERVER_URL}{analysis_result['mr_url']}"
-        
-        # 파일 다운로드
-        response = requests.get(mr_url, timeout=60)
-        response.raise_for_status()
-        
-        # MinIO에 저장
-        mr_data = response.content
-        mr_object_name = f"{separated_folder}/mr.wav"
-        
-        minio_client.put_object(
-            SEPARATED_BUCKET,
-            mr_object_name,
-            BytesIO(mr_data),
-            len(mr_data),
-            content_type='audio/wav'
-        )
-        
-        # Presigned URL 생성 (24시간 유효)
-        saved_files['mr_minio_url'] = generate_presigned_url(
-            minio_client,
-            SEPARATED_BUCKET,
-            mr_object_name,
-            expires_hours=24
+        transfers['mr'] = transfer_executor.submit(
+            transfer_separated_file, mr_url, f"{separated_folder}/mr.wav", minio_client
         )
     
-    return saved_files
+    return transfers
 
 
-def separate_audio_locally(file_data: bytes, unique_filename: str, separated_folder: str, minio_client: Minio):
+def decode_audio(file_data: bytes, unique_filename: str, samplerate: int, channels: int):
     """
-    로컬에서 demucs를 사용하여 보컬/MR 분리 후 MinIO에 저장
+    원본 바이트를 메모리에서 디코딩하여 모델 입력 형식으로 변환
+    
+    soundfile(libsndfile)로 디코딩하고, 지원하지 않는 형식일 때만
+    임시 파일을 거쳐 demucs AudioFile(ffmpeg)로 읽음
     
     Args:
         file_data: 원본 파일 바이너리 데이터
-        unique_filename: 원본 파일명 (확장자 포함)
-        separated_folder: MinIO에 저장할 폴더명
-        minio_client: MinIO 클라이언트 인스턴스
+        unique_filename: 원본 파일명 (확장자 포함, ffmpeg 경로용)
+        samplerate: 모델 샘플링 레이트
+        channels: 모델 채널 수
     
     Returns:
-        dict: 저장된 파일 정보 {'vocal_minio_url': str, 'vocal_object_name': str, 'mr_minio_url': str}
-    
-    Raises:
-        Exception: demucs 실행 또는 파일 저장 실패 시
+        torch.Tensor: (channels, samples) 형태의 오디오 텐서
     """
-    # 배포 환경에서만 사용되는 패키지 (로컬 개발 환경에는 설치되지 않음)
-    # Docker 컨테이너에는 설치되어 있으므로 IDE 경고 무시
     import torch as th  # pyright: ignore[reportMissingImports]
     import soundfile as sf  # pyright: ignore[reportMissingImports]
-    from demucs import pretrained  # pyright: ignore[reportMissingImports]
-    from demucs.apply import apply_model  # pyright: ignore[reportMissingImports]
-    from demucs.audio import AudioFile  # pyright: ignore[reportMissingImports]
+    from demucs.audio import AudioFile, convert_audio  # pyright: ignore[reportMissingImports]
     
-    temp_input_path = None
-    temp_output_dir = None
+    try:
+        data, file_samplerate = sf.read(BytesIO(file_data), dtype='float32', always_2d=True)
+        # (samples, channels) -> (channels, samples)
+        wav = th.from_numpy(data.T.copy())
+        return convert_audio(wav, file_samplerate, samplerate, channels)
+    except sf.LibsndfileError as e:
+        print(f"soundfile decode failed, falling back to ffmpeg: {str(e)}")
     
+    temp_input_path = os.path.join(TEMP_UPLOAD_FOLDER, unique_filename)
     try:
-        # 임시 디렉토리 생성
         os.makedirs(TEMP_UPLOAD_FOLDER, exist_ok=True)
-        os.makedirs(TEMP_OUTPUT_FOLDER, exist_ok=True)
-        
-        # 1. 입력 파일을 임시 저장
-        temp_input_path = os.path.join(TEMP_UPLOAD_FOLDER, unique_filename)
         with open(temp_input_path, 'wb') as f:
             f.write(file_data)
+        return AudioFile(temp_input_path).read(samplerate=samplerate, channels=channels)
+    finally:
+        if os.path.exists(temp_input_path):
+            try:
+                os.remove(temp_input_path)
+            except Exception as e:
+                print(f"Failed to remove temp file: {str(e)}")
+
+
+def iter_wav_pcm16(audio, samplerate: int):
+    """
+    오디오 배열을 WAV(PCM_16) 바이트 청크로 인코딩 (헤더 + 블록 단위 샘플)
+    
+    Args:
+        audio: (samples, channels) 형태의 float numpy 배열 (-1.0 ~ 1.0)
+        samplerate: 샘플링 레이트
+    
+    Yields:
+        bytes: WAV 파일 청크
+    """
+    n_samples, channels = audio.shape
+    
+    yield wav_header(n_samples, channels, samplerate)
+    
+    block_frames = max(1, STREAM_CHUNK_SIZE_KB * 1024 // (channels * 2))
+    for start in range(0, n_samples, block_frames):
+        yield encode_pcm16(audio[start:start + block_frames])
+
+
+def wav_header(n_samples: int, channels: int, samplerate: int) -> bytes:
+    """WAV(PCM_16) 헤더 생성 (44바이트)"""
+    data_size = n_samples * channels * 2
+    return struct.pack(
+        '<4sI4s4sIHHIIHH4sI',
+        b'RIFF', 36 + data_size, b'WAVE',
+        b'fmt ', 16, 1, channels, samplerate, samplerate * channels * 2, channels * 2, 16,
+        b'data', data_size
+    )
+
+
+def encode_pcm16(block) -> bytes:
+    """(samples, channels) float 배열을 PCM_16 바이트로 변환"""
+    # soundfile(libsndfile)의 PCM_16 변환과 같은 방식 (x * 32768 내림, 범위 초과는 자름)
+    return np.clip(np.floor(block * np.float32(32768)), -32768, 32767).astype('<i2').tobytes()
+
+
+def upload_wav(minio_client: Minio, object_name: str, audio, samplerate: int):
+    """
+    오디오 배열을 WAV(PCM_16)로 인코딩하면서 MinIO에 멀티파트 업로드
+    (인코딩된 파일 전체를 메모리에 만들지 않음)
+    
+    Args:
+        minio_client: MinIO 클라이언트 인스턴스
+        object_name: 저장할 객체 이름
+        audio: (samples, channels) 형태의 numpy 배열
+        samplerate: 샘플링 레이트
+    """
+    n_samples, channels = audio.shape
+    put_stream(
+        minio_client,
+        SEPARATED_BUCKET,
+        object_name,
+        iter_wav_pcm16(audio, samplerate),
+        length=44 + n_samples * channels * 2,
+        content_type='audio/wav'
+    )
+
+
+def upload_separated_stem(minio_client: Minio, object_name: str, audio, samplerate: int):
+    """
+    분리된 파일 1개를 업로드하고 presigned URL 생성
+    
+    Returns:
+        str: Presigned URL (24시간 유효)
+    """
+    upload_wav(minio_client, object_name, audio, samplerate)
+    return generate_presigned_url(
+        minio_client,
+        SEPARATED_BUCKET,
+        object_name,
+        expires_hours=24
+    )
+
+
+def separate_stems(file_data: bytes, unique_filename: str, settings: dict):
+    """
+    demucs로 원본을 vocal/MR 신호로 분리 (메모리에서 처리)
+    
+    - full: 모든 소스를 분리하고 vocal 외 소스를 합쳐 MR 생성
+    - vocals: vocal 전용 모델만 실행하고 MR = 원본 - vocal
+      (htdemucs_ft는 소스별 전문 모델 4개의 묶음이므로 추론량이 약 1/4)
+    
+    Args:
+        file_data: 원본 파일 바이너리 데이터
+        unique_filename: 원본 파일명 (확장자 포함)
+        settings: 분리 설정 (SEPARATION_PROFILES의 값: model, shifts, overlap, segment, mode, backend)
+    
+    Returns:
+        tuple: (vocal 배열, MR 배열, 샘플링 레이트) - 배열은 (samples, channels) 형태
+    """
+    # 1. demucs 모델 가져오기 (프로세스당 한 번만 로드)
+    model, device = get_model(settings['model'], settings['backend'])
+    
+    # 2. 오디오 디코딩 (메모리에서 처리)
+    print(f"Decoding audio file: {unique_filename}")
+    with stage('decode'):
+        mix = decode_audio(file_data, unique_filename, model.samplerate, model.audio_channels)
+    
+    if mix.numel() == 0:
+        raise ValueError(f"입력 오디오 파일이 비어있거나 손상되었습니다.")
+    
+    mix = mix.to(device)
+    
+    # 배치 차원 추가
+    if mix.ndim == 2:
+        mix = mix[None]
+    elif mix.ndim != 3:
+        raise ValueError(f"입력 오디오 텐서 차원 오류: {mix.ndim}차원 (예상: 2D 또는 3D)")
+    
+    if len(mix.shape) != 3:
+        raise ValueError(f"처리 후 mix 텐서가 3차원 (batch, channels, samples)을 가져야 하지만, {len(mix.shape)}차원과 형태 {mix.shape}를 가집니다. 현재 mix 형태는 {mix.shape}입니다. 이는 입력 오디오 파일 또는 Demucs.AudioFile.read()에서 로드하는 데 문제가 있음을 나타냅니다.")
+    
+    # 3. 소스 분리 실행 및 vocal과 MR 추출
+    print(f"Separating audio sources ({settings['model']}, mode={settings['mode']}, shifts={settings['shifts']}, "
+          f"backend={settings['backend']})...")
+    with stage('separation'):
+        vocal_tensor, mr_tensor = separate_mix(model, mix, settings, device)
         
-        # 2. 출력 디렉토리 생성
-        temp_output_dir = os.path.join(TEMP_OUTPUT_FOLDER, separated_folder)
-        os.makedirs(temp_output_dir, exist_ok=True)
-        
-        # 3. demucs 모델 로드 및 실행
-        print(f"Loading demucs model...")
-        device = th.device('cuda') if th.cuda.is_available() else th.device('cpu')
-        print(f"Using device: {device}")
-        
-        model = pretrained.get_model(name='htdemucs_ft')
-        model.to(device)
-        model.eval()
-        
-        # 4. 오디오 파일 읽기
-        print(f"Reading audio file: {temp_input_path}")
-        audio_file_obj = AudioFile(temp_input_path)
-        mix = audio_file_obj.read(
-            samplerate=model.samplerate,
-            channels=model.audio_channels
-        )
-        
-        if mix.numel() == 0:
-            raise ValueError(f"입력 오디오 파일이 비어있거나 손상되었습니다.")
-        
-        mix = mix.to(device)
-        
-        # 배치 차원 추가
-        if mix.ndim == 2:
-            mix = mix[None]
-        elif mix.ndim != 3:
-            raise ValueError(f"입력 오디오 텐서 차원 오류: {mix.ndim}차원 (예상: 2D 또는 3D)")
-        
-        if len(mix.shape) != 3:
-            raise ValueError(f"처리 후 mix 텐서가 3차원 (batch, channels, samples)을 가져야 하지만, {len(mix.shape)}차원과 형태 {mix.shape}를 가집니다. 현재 mix 형태는 {mix.shape}입니다. 이는 입력 오디오 파일 또는 Demucs.AudioFile.read()에서 로드하는 데 문제가 있음을 나타냅니다.")
-        
-        # 5. 소스 분리 실행
-        print(f"Separating audio sources...")
-        separated_stems = apply_model(model, mix, shifts=3, progress=False, device=device)[0]
-        
-        # 6. vocal과 MR 추출
-        vocal_idx = model.sources.index('vocals')
-        vocal_tensor = separated_stems[vocal_idx]
-        
-        mr_indices = [i for i, s in enumerate(model.sources) if s != 'vocals']
-        mr_tensor = separated_stems[mr_indices].sum(dim=0)
-        
-        # 7. 임시 파일로 저장
-        temp_vocal_path = os.path.join(temp_output_dir, 'vocal.wav')
-        temp_mr_path = os.path.join(temp_output_dir, 'mr.wav')
-        
-        # soundfile을 사용하여 저장 (torchcodec 의존성 제거)
         # tensor를 numpy 배열로 변환 (channels, samples) -> (samples, channels)
         vocal_numpy = vocal_tensor.cpu().numpy().T
         mr_numpy = mr_tensor.cpu().numpy().T
-        
-        sf.write(temp_vocal_path, vocal_numpy, model.samplerate, subtype='PCM_16')
-        sf.write(temp_mr_path, mr_numpy, model.samplerate, subtype='PCM_16')
-        
-        print(f"Audio separation completed")
-        
-        # 8. MinIO에 업로드
-        saved_files = {
-            'vocal_minio_url': None,
-            'vocal_object_name': None,
-            'mr_minio_url': None
-        }
-        
-        # vocal 파일 업로드
-        with open(temp_vocal_path, 'rb') as f:
-            vocal_data = f.read()
-        
-        vocal_object_name = f"{separated_folder}/vocal.wav"
-        minio_client.put_object(
-            SEPARATED_BUCKET,
-            vocal_object_name,
-            BytesIO(vocal_data),
-            len(vocal_data),
-            content_type='audio/wav'
-        )
-        # Presigned URL 생성 (24시간 유효)
-        saved_files['vocal_minio_url'] = generate_presigned_url(
-            minio_client,
-            SEPARATED_BUCKET,
-            vocal_object_name,
-            expires_hours=24
-        )
-        saved_files['vocal_object_name'] = vocal_object_name
-        print(f"Uploaded vocal to MinIO: {vocal_object_name}")
-        
-        # MR 파일 업로드
-        with open(temp_mr_path, 'rb') as f:
-            mr_data = f.read()
-        
-        mr_object_name = f"{separated_folder}/mr.wav"
-        minio_client.put_object(
-            SEPARATED_BUCKET,
-            mr_object_name,
-            BytesIO(mr_data),
-            len(mr_data),
-            content_type='audio/wav'
-        )
-        # Presigned URL 생성 (24시간 유효)
-        saved_files['mr_minio_url'] = generate_presigned_url(
-            minio_client,
-            SEPARATED_BUCKET,
-            mr_object_name,
-            expires_hours=24
+    
+    print(f"Audio separation completed")
+    return vocal_numpy, mr_numpy, model.samplerate
+
+
+def separate_mix(model, mix, settings: dict, device):
+    """
+    mix 텐서에 demucs를 적용하여 vocal/MR 텐서 반환
+    
+    Args:
+        model: demucs 모델
+        mix: (1, channels, samples) 형태의 텐서 (device에 있어야 함)
+        settings: 분리 설정 (model, shifts, overlap, segment, mode)
+        device: 연산 장치
+    
+    Returns:
+        tuple: (vocal 텐서, MR 텐서) - (channels, samples) 형태
+    """
+    vocal_batch, mr_batch = separate_batch(model, mix, settings, device)
+    return vocal_batch[0], mr_batch[0]
+
+
+def separate_batch(model, mix, settings: dict, device):
+    """
+    여러 구간을 묶은 mix 텐서에 demucs를 한 번에 적용
+    
+    Args:
+        model: demucs 모델
+        mix: (batch, channels, samples) 형태의 텐서 (device에 있어야 함)
+        settings: 분리 설정 (model, shifts, overlap, segment, mode)
+        device: 연산 장치
+    
+    Returns:
+        tuple: (vocal 텐서, MR 텐서) - (batch, channels, samples) 형태
+    
+    int8 모델의 추론이 실패하거나 유한하지 않은 값이 나오면 eager 모델로 다시 실행
+    """
+    if is_quantized(model):
+        # 이전 추론 실패로 int8이 eager로 바뀌었으면 eager 모델 사용
+        model = get_model(settings['model'], settings['backend'])[0]
+    if not is_quantized(model):
+        return _apply_separation(model, mix, settings, device)
+    
+    try:
+        vocal_tensor, mr_tensor = _apply_separation(model, mix, settings, device)
+        if not (vocal_tensor.isfinite().all() and mr_tensor.isfinite().all()):
+            raise FloatingPointError('non-finite separation output')
+        return vocal_tensor, mr_tensor
+    except Exception as e:
+        return _apply_separation(fall_back_to_eager(settings['model'], e), mix, settings, device)
+
+
+def _apply_separation(model, mix, settings: dict, device):
+    """separate_batch의 demucs 실행 부분 (모델 종류와 무관)"""
+    # 배포 환경에서만 사용되는 패키지 (로컬 개발 환경에는 설치되지 않음)
+    # Docker 컨테이너에는 설치되어 있으므로 IDE 경고 무시
+    from demucs.apply import apply_model  # pyright: ignore[reportMissingImports]
+    
+    vocal_idx = model.sources.index('vocals')
+    apply_options = {
+        'shifts': settings['shifts'],
+        'overlap': settings['overlap'],
+        'segment': settings['segment'],
+        'progress': False,
+        'device': device
+    }
+    
+    if settings['mode'] == 'vocals':
+        # vocal 전용 모델만 실행하고 MR = 원본 - vocal
+        vocal_model = get_source_model(model, 'vocals')
+        separated_stems = apply_model(vocal_model, mix, **apply_options)
+        vocal_tensor = separated_stems[:, vocal_idx]
+        mr_tensor = mix - vocal_tensor
+    else:
+        separated_stems = apply_model(model, mix, **apply_options)
+        vocal_tensor = separated_stems[:, vocal_idx]
+        mr_indices = [i for i, s in enumerate(model.sources) if s != 'vocals']
+        mr_tensor = separated_stems[:, mr_indices].sum(dim=1)
+    
+    return vocal_tensor, mr_tensor
+
+
+def separate_audio_locally(file_data: bytes, unique_filename: str, separated_folder: str, minio_client: Minio,
+                           profile: str = DEFAULT_SEPARATION_PROFILE):
+    """
+    로컬에서 demucs를 사용하여 보컬/MR 분리 후 MinIO에 저장
+    
+    디스크를 거치지 않고 메모리에서 디코딩/인코딩하며, 분리된 vocal 신호(mono)를
+    결과에 포함하여 음정 분석 단계에서 다시 다운로드하지 않도록 함
+    작업 안에서 실행되면 vocal/MR 업로드를 시작만 하고 바로 반환하여 음정 분석과 업로드가
+    함께 진행되도록 함. 업로드 결과((object_name, presigned URL))는 report_transfer()로
+    API 프로세스에 전달되며, 결과의 pending_transfers에 기다릴 전송 이름이 들어 있음
+    
+    Args:
+        file_data: 원본 파일 바이너리 데이터
+        unique_filename: 원본 파일명 (확장자 포함)
+        separated_folder: MinIO에 저장할 폴더명
+        minio_client: MinIO 클라이언트 인스턴스
+        profile: 분리 품질 프로필 이름 (SEPARATION_PROFILES의 키)
+    
+    Returns:
+        dict: 저장된 파일 정보 {'vocal_object_name': str, 'mr_object_name': str,
+                               'vocal_minio_url': str, 'mr_minio_url': str (업로드를 기다린 경우만),
+                               'pending_transfers': 진행 중인 업로드 이름 list,
+                               'vocal_audio': numpy 배열 (mono), 'vocal_samplerate': int}
+    
+    Raises:
+        Exception: demucs 실행 또는 (업로드를 기다린 경우) 파일 저장 실패 시
+    """
+    vocal_numpy, mr_numpy, samplerate = separate_stems(
+        file_data, unique_filename, SEPARATION_PROFILES[profile]
+    )
+    # 분리 중 취소되었으면 업로드하지 않음
+    check_cancelled()
+    
+    # vocal/MR 업로드 및 presigned URL 생성을 동시에 실행 (메모리에서 WAV 인코딩)
+    saved_files = {
+        'vocal_object_name': f"{separated_folder}/vocal.wav",
+        'mr_object_name': f"{separated_folder}/mr.wav",
+        'pending_transfers': []
+    }
+    uploads = {
+        name: transfer_executor.submit(
+            upload_separated_stem, minio_client, saved_files[f'{name}_object_name'], audio, samplerate
         )
-        print(f"Uploaded MR to MinIO: {mr_object_name}")
-        
-        return saved_files
-        
-    finally:
-        # 9. 임시 파일 정리
-        try:
-            if temp_input_path and os.path.exists(temp_input_path):
-                os.remove(temp_input_path)
-            if temp_output_dir and os.path.exists(temp_output_dir):
-                import shutil
-                shutil.rmtree(temp_output_dir)
-        except Exception as e:
-            print(f"Failed to clean up temp files: {str(e)}")
+        for name, audio in (('vocal', vocal_numpy), ('mr', mr_numpy))
+    }
+    
+    job_id = current_job_id()
+    if job_id is not None:
+        # 업로드가 끝나면 API 프로세스에 알림 (이 단계는 기다리지 않고 반환)
+        for name, upload in uploads.items():
+            upload.add_done_callback(partial(_report_stem_upload, job_id, name, saved_files[f'{name}_object_name']))
+        saved_files['pending_transfers'] = list(uploads)
+    else:
+        with stage('stem_upload'):
+            for name, upload in uploads.items():
+                saved_files[f'{name}_minio_url'] = upload.result()
+                print(f"Uploaded {name} to MinIO: {saved_files[f'{name}_object_name']}")
+    
+    # 음정 분석용 vocal 신호 (librosa와 같은 방식으로 채널 평균)
+    saved_files['vocal_audio'] = vocal_numpy.mean(axis=1)
+    saved_files['vocal_samplerate'] = samplerate
+    
+    return saved_files
+
 
+def _report_stem_upload(job_id: str, name: str, object_name: str, upload):
+    """분리 파일 업로드 완료/실패를 API 프로세스에 알림 (업로드 Future 완료 콜백)"""
+    error = upload.exception()
+    if error is not None:
+        report_transfer(job_id, name, error=f"{name} 업로드 실패: {str(error)}")
+        return
+    print(f"Uploaded {name} to MinIO: {object_name}")
+    report_transfer(job_id, name, result=(object_name, upload.result()))
@@ -4,6 +4,7 @@ from datetime import timedelta
 import json
 
 from config import (
+    STORAGE_PART_SIZE_MB,
     MINIO_ENDPOINT,
     MINIO_PUBLIC_ENDPOINT,
     MINIO_ACCESS_KEY,
@@ -11,6 +12,7 @@ from config import (
     ORIGINAL_BUCKET,
     SEPARATED_BUCKET
 )
+from metrics import add_storage_bytes, stage
 
 
 def init_minio_client():
@@ -79,11 +81,12 @@ def generate_presigned_url(minio_client, bucket_name: str, object_name: str, exp
     """
     try:
         # MinIO에서 Presigned URL 생성
-        url = minio_client.presigned_get_object(
-            bucket_name,
-            object_name,
-            expires=timedelta(hours=expires_hours)
-        )
+        with stage('presign'):
+            url = minio_client.presigned_get_object(
+                bucket_name,
+                object_name,
+                expires=timedelta(hours=expires_hours)
+            )
         
         # 내부 엔드포인트를 외부 공개 엔드포인트로 교체
         # 예: http://fileserver:9000 → http://files.my-pitch.work
@@ -96,3 +99,53 @@ def generate_presigned_url(minio_client, bucket_name: str, object_name: str, exp
         print(f"Presigned URL 생성 중 오류: {e}")
         raise
 
+
+class ChunkStream:
+    """
+    bytes 청크 이터레이터를 read(size)가 가능한 스트림으로 변환
+    (MinIO 멀티파트 업로드 입력용, 한 번에 파트 하나 분량만 메모리에 유지)
+    """
+
+    def __init__(self, chunks):
+        self.chunks = iter(chunks)
+        self.buffer = bytearray()
+        self.bytes_read = 0  # 지금까지 내보낸 바이트 수
+
+    def read(self, size: int = -1) -> bytes:
+        while size < 0 or len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+
+        if size < 0:
+            size = len(self.buffer)
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        self.bytes_read += len(data)
+        return data
+
+
+def put_stream(minio_client, bucket_name: str, object_name: str, chunks,
+               length: int = -1, content_type: str = 'application/octet-stream'):
+    """
+    청크 단위로 생성되는 데이터를 멀티파트로 업로드
+
+    Args:
+        minio_client: MinIO 클라이언트 인스턴스
+        bucket_name: 버킷 이름
+        object_name: 객체(파일) 이름
+        chunks: bytes 청크 이터레이터
+        length: 전체 크기 (모르면 -1)
+        content_type: 컨텐츠 타입
+    """
+    stream = ChunkStream(chunks)
+    minio_client.put_object(
+        bucket_name,
+        object_name,
+        stream,
+        length,
+        content_type=content_type,
+        part_size=STORAGE_PART_SIZE_MB * 1024 * 1024
+    )
+    add_storage_bytes('upload', stream.bytes_read)
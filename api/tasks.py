@@ -0,0 +1,187 @@
+"""
+작업 단계별 실행 함수 (실행기 풀에서 호출)
+
+프로세스 풀에서도 실행될 수 있도록 인자/반환값은 pickle 가능한 값만 사용하고,
+MinIO 클라이언트는 프로세스마다 새로 생성
+"""
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+import multiprocessing
+
+from config import (
+    ORIGINAL_BUCKET,
+    USE_EXTERNAL_SEPARATOR,
+    PRELOAD_SEPARATION_MODEL,
+    JOB_EXECUTOR,
+    SEPARATION_WINDOW_SECONDS
+)
+from services import (
+    load_original_file,
+    send_file_to_analysis_server,
+    analyze_vocal_pitch_from_minio,
+    analyze_vocal_pitch_from_audio,
+    separate_audio_locally
+)
+from segmented_separation import separate_audio_segmented
+from storage import init_minio_client
+from model_registry import preload_model
+from cpu_scheduler import pool_initializer, configure_shared_process
+from metrics import track_stages, stage, drain_counters
+from progress import (
+    create_progress_queue,
+    share_cancellations,
+    init_worker as init_progress_worker,
+    track_progress,
+    check_cancelled
+)
+
+
+_minio_client = None  # 프로세스별 MinIO 클라이언트
+_progress_queue = None  # 프로세스 풀 워커 -> API 프로세스 진행률 큐 (API 프로세스에서 생성)
+_cancellations = None   # API 프로세스 -> 프로세스 풀 워커 취소 목록 (API 프로세스에서 생성)
+
+
+def get_minio_client():
+    """현재 프로세스의 MinIO 클라이언트 반환 (최초 호출 시 생성)"""
+    global _minio_client
+    if _minio_client is None:
+        _minio_client = init_minio_client()
+    return _minio_client
+
+
+def init_separation_worker():
+    """분리 워커 프로세스 초기화 (모델 미리 로드)"""
+    if not USE_EXTERNAL_SEPARATOR and PRELOAD_SEPARATION_MODEL:
+        preload_model()
+
+
+def init_pool_process(progress_queue, cancellations, initializer=None):
+    """프로세스 풀 워커 초기화 (진행률 큐/취소 목록 연결 -> 추가 초기화)"""
+    init_progress_worker(progress_queue, cancellations)
+    if initializer is not None:
+        initializer()
+
+
+def create_executor(max_workers: int, role: str, initializer=None):
+    """
+    설정(JOB_EXECUTOR)에 맞는 실행기 생성
+
+    Args:
+        max_workers: 최대 워커 수
+        role: 워커 역할 ('separation' 또는 'pitch', 코어 배분에 사용)
+        initializer: 워커 프로세스 시작 시 실행할 함수 (프로세스 풀에서만 사용)
+
+    Returns:
+        Executor: ProcessPoolExecutor 또는 ThreadPoolExecutor
+    """
+    global _progress_queue, _cancellations
+
+    if JOB_EXECUTOR == 'process':
+        # fork는 스레드/torch 상태를 복제하므로 spawn 사용
+        mp_context = multiprocessing.get_context('spawn')
+        if _progress_queue is None:
+            _progress_queue = create_progress_queue(mp_context)
+            _cancellations = share_cancellations(mp_context)
+        pool_init, pool_initargs = pool_initializer(
+            role, mp_context, partial(init_pool_process, _progress_queue, _cancellations, initializer)
+        )
+        return ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=mp_context,
+            initializer=pool_init,
+            initargs=pool_initargs
+        )
+
+    configure_shared_process()
+    return ThreadPoolExecutor(max_workers=max_workers)
+
+
+def run_separation(file_info: dict, job_id: str, profile: str, vocal_type: str = None) -> dict:
+    """
+    음원 분리 단계 실행
+
+    Args:
+        file_info: 파일 정보 (unique_filename, separated_folder 등)
+        job_id: 작업 ID (로그용)
+        profile: 분리 품질 프로필 이름 (로컬 분리 시 사용)
+        vocal_type: 보컬 타입 (구간별 분리와 함께 하는 음정 분석의 음역 선택용)
+
+    Returns:
+        dict: 외부 서버 사용 시 분석 서버 응답 (vocal_url, mr_url),
+              로컬 분리 시 저장된 파일 정보 (vocal_object_name, mr_object_name, vocal_audio 등),
+              구간별 분리 시 음정 분석 결과(notes)도 포함.
+              모두 'metrics' (단계 시간, 워커 카운터) 포함
+    """
+    with track_stages() as timings, track_progress(job_id, 'separation'):
+        result = _separate(file_info, job_id, profile, vocal_type)
+    result['metrics'] = {'timings': timings, 'counters': drain_counters()}
+    return result
+
+
+def _separate(file_info: dict, job_id: str, profile: str, vocal_type: str = None) -> dict:
+    """분리 방식(외부 서버/구간별/전체)에 따라 음원 분리 실행"""
+    minio_client = get_minio_client()
+
+    # 대기 중에는 원본 바이트를 보관하지 않으므로 처리 시작 시 MinIO에서 읽음
+    with stage('original_download'):
+        file_data = load_original_file(
+            file_info['unique_filename'],
+            minio_client,
+            ORIGINAL_BUCKET
+        )
+    check_cancelled()
+
+    if USE_EXTERNAL_SEPARATOR:
+        print(f"[{job_id}] Using external separator (Colab server)")
+        # 분리 파일 전송은 음정 분석과 겹쳐 실행하도록 작업 스레드에서 처리
+        with stage('external_separation'):
+            return send_file_to_analysis_server(
+                file_data,
+                file_info['unique_filename'],
+                file_info['content_type']
+            )
+
+    if SEPARATION_WINDOW_SECONDS > 0:
+        # 구간별 분리 + 음정 분석까지 함께 진행 (결과에 notes 포함)
+        print(f"[{job_id}] Using segmented demucs separator (profile: {profile})")
+        return separate_audio_segmented(
+            file_data,
+            file_info['unique_filename'],
+            file_info['separated_folder'],
+            minio_client,
+            profile,
+            vocal_type
+        )
+
+    print(f"[{job_id}] Using local demucs separator (profile: {profile})")
+    return separate_audio_locally(
+        file_data,
+        file_info['unique_filename'],
+        file_info['separated_folder'],
+        minio_client,
+        profile
+    )
+
+
+def run_pitch_analysis(vocal_object_name: str, vocal_audio=None, vocal_samplerate: int = None,
+                       job_id: str = None, vocal_type: str = None) -> dict:
+    """
+    음정 분석 단계 실행
+
+    Args:
+        vocal_object_name: MinIO의 vocal 파일 경로
+        vocal_audio: 분리 단계에서 넘겨받은 mono vocal 신호 (있으면 다운로드 생략)
+        vocal_samplerate: vocal_audio의 샘플링 레이트
+        job_id: 작업 ID (진행률 보고용)
+        vocal_type: 보컬 타입 (female/male, 분석 음역 선택용)
+
+    Returns:
+        dict: {'notes': 음정 분석 결과 리스트, 'metrics': 단계 시간/워커 카운터}
+    """
+    with track_stages() as timings, track_progress(job_id, 'pitch'):
+        check_cancelled()
+        if vocal_audio is not None:
+            notes = analyze_vocal_pitch_from_audio(vocal_audio, vocal_samplerate, vocal_type)
+        else:
+            notes = analyze_vocal_pitch_from_minio(vocal_object_name, get_minio_client(), vocal_type)
+    return {'notes': notes, 'metrics': {'timings': timings, 'counters': drain_counters()}}
@@ -0,0 +1,14 @@
+"""
+테스트 공통 설정
+
+config.py는 로컬 demucs(배포 환경) 설정으로 import되도록 임시 폴더 환경변수를 지정
+"""
+import os
+import sys
+import tempfile
+
+_temp_dir = tempfile.mkdtemp(prefix='my-pitch-test-')
+os.environ.setdefault('TEMP_UPLOAD_FOLDER', os.path.join(_temp_dir, 'uploads'))
+os.environ.setdefault('TEMP_OUTPUT_FOLDER', os.path.join(_temp_dir, 'outputs'))
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,65 @@
+"""분석 서버 공유 세션(get_analysis_session)의 연결 재사용 테스트"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import http_client
+
+
+class StubAnalysisHandler(BaseHTTPRequestHandler):
+    """요청마다 클라이언트 포트를 기록하는 keep-alive 분석 서버 stub"""
+    protocol_version = 'HTTP/1.1'  # keep-alive 응답
+
+    def _reply(self, body: bytes):
+        self.server.client_ports.append(self.client_address[1])
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/octet-stream')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply(b'\x00' * 64 * 1024)  # 분리 파일 다운로드
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self._reply(b'{"vocal_url": "/vocal.wav", "mr_url": "/mr.wav"}')  # 분석 요청
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stub_server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubAnalysisHandler)
+    server.client_ports = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def fresh_session(monkeypatch):
+    monkeypatch.setattr(http_client, '_session', None)
+    monkeypatch.setattr(http_client, '_adapter', None)
+
+
+def test_shared_session_reuses_one_connection(stub_server):
+    base_url = f"http://127.0.0.1:{stub_server.server_address[1]}"
+    session = http_client.get_analysis_session()
+
+    for _ in range(3):
+        # 분석 요청 (multipart POST) + vocal/MR 스트리밍 다운로드
+        response = session.post(f"{base_url}/v2/tracks/analyze", files={'file': ('a.wav', b'RIFF' * 1024)})
+        assert response.status_code == 200
+        for path in ('/vocal.wav', '/mr.wav'):
+            with session.get(f"{base_url}{path}", stream=True) as download:
+                assert sum(len(chunk) for chunk in download.iter_content(8192)) == 64 * 1024
+
+    assert http_client.get_analysis_session() is session
+    assert len(stub_server.client_ports) == 9
+    assert len(set(stub_server.client_ports)) == 1  # TCP 연결 하나로 모든 요청 처리
+    assert http_client.get_connection_stats() == {'requests': 9, 'new_connections': 1, 'reused_connections': 8}
@@ -0,0 +1,133 @@
+"""대기열 정책(SJF aging, 끝난 작업 정리)과 연결된 작업 취소 테스트"""
+import pytest
+
+import job_queue
+import job_scheduler
+from job_store import MemoryJobStore
+from job_scheduler import ShortestJobFirstScheduler, order_jobs
+
+
+@pytest.fixture
+def sjf(monkeypatch):
+    monkeypatch.setattr(job_scheduler, 'scheduler', ShortestJobFirstScheduler(aging_factor=1.0))
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    """빈 인메모리 저장소 + 워커/MinIO 없이 실행"""
+    monkeypatch.setattr(job_queue, 'job_store', MemoryJobStore())
+    monkeypatch.setattr(job_queue, 'start_worker', lambda: None)
+    monkeypatch.setattr(job_queue, 'remove_job_files', lambda file_info, minio_client: None)
+    monkeypatch.setattr(job_queue, 'JOB_COALESCE_ENABLED', True)
+    return job_queue
+
+
+def _ids(jobs: list) -> list:
+    return [job_id for job_id, _ in jobs]
+
+
+def test_sjf_runs_short_jobs_first_then_ages_long_job_forward(sjf):
+    long_job = ('long', {'cost': 100.0, 'enqueued_at': 0.0})
+
+    def short_job(now):
+        return ('short', {'cost': 10.0, 'enqueued_at': now})
+
+    # 막 들어온 짧은 작업이 먼저
+    assert _ids(order_jobs([long_job, short_job(10.0)], now=10.0)) == ['short', 'long']
+    # 대기 1초마다 1초씩 깎여 (100 - 95 < 10) 새로 들어온 짧은 작업보다 앞섬
+    assert _ids(order_jobs([long_job, short_job(95.0)], now=95.0)) == ['long', 'short']
+
+
+def test_priority_class_is_compared_before_aging(sjf):
+    old_low = ('low', {'cost': 1.0, 'enqueued_at': 0.0, 'priority': 'low'})
+    new_high = ('high', {'cost': 500.0, 'enqueued_at': 1000.0, 'priority': 'high'})
+    assert _ids(order_jobs([old_low, new_high], now=1000.0)) == ['high', 'low']
+
+
+def test_eviction_honours_ttl_and_count_limit(monkeypatch):
+    monkeypatch.setattr(job_queue, 'JOB_RETENTION_SECONDS', 100)
+    monkeypatch.setattr(job_queue, 'JOB_RETENTION_MAX_JOBS', 3)
+    now = 1000.0
+    finished = [
+        ('expired', {'finished_at': now - 101}),
+        ('recent-1', {'finished_at': now - 10}),
+        ('recent-2', {'finished_at': now - 20}),
+        ('recent-3', {'finished_at': now - 30}),
+        ('recent-4', {'finished_at': now - 40}),
+        ('legacy', {}),  # finished_at 없음: 가장 오래된 것으로 취급
+    ]
+
+    evicted = set(_ids(job_queue.select_jobs_to_evict(finished, now)))
+
+    # 보관 시간 초과 2개 + 남은 4개 중 가장 오래된 1개 (최대 3개 유지)
+    assert evicted == {'legacy', 'expired', 'recent-4'}
+
+
+def test_eviction_limits_can_be_disabled(monkeypatch):
+    monkeypatch.setattr(job_queue, 'JOB_RETENTION_SECONDS', 0)
+    monkeypatch.setattr(job_queue, 'JOB_RETENTION_MAX_JOBS', 0)
+    finished = [('old', {'finished_at': 0.0})]
+    assert job_queue.select_jobs_to_evict(finished, now=1e9) == []
+
+
+def _create(queue, content_hash: str = 'hash') -> str:
+    file_info = {'original_filename': 'a.mp3', 'unique_filename': 'u.mp3', 'content_hash': content_hash, 'duration': 30.0}
+    return queue.create_job(file_info, 'female', 'best')['job_id']
+
+
+def test_cancel_keeps_primary_with_attached_requests(queue):
+    primary = _create(queue)
+    attached = queue.attach_to_inflight_job('hash', 'female', 'best', 'b.mp3')['job_id']
+
+    result = queue.cancel_job(primary)
+    assert result['error'] is True
+    assert queue.job_store.get_job(primary)['status'] == 'waiting'
+
+    # 연결된 요청을 취소하면 그 기록만 지워지고 원래 작업은 계속 대기
+    assert queue.cancel_job(attached)['status'] == 'cancelled'
+    assert queue.job_store.get_job(attached) is None
+    assert queue.cancel_job(primary)['status'] == 'cancelled'
+
+
+def test_attached_request_follows_primary_result(queue):
+    primary = _create(queue)
+    attached = queue.attach_to_inflight_job('hash', 'female', 'best', 'b.mp3')['job_id']
+
+    queue.job_store.update_job(primary, status='completed', result={'clef': 'treble', 'notes': [], 'original_filename': 'a'})
+    queue.settle_attached_jobs(primary)
+
+    job = queue.job_store.get_job(attached)
+    assert job['status'] == 'completed'
+    assert job['result']['original_filename'] == 'b'
+
+
+def test_attach_falls_back_to_enqueue_when_primary_is_cancelled_meanwhile(queue, monkeypatch):
+    primary = _create(queue)
+    find = queue.find_inflight_job
+
+    def find_then_cancel(dedup_key):
+        # 찾은 직후(연결 전) 다른 요청이 원래 작업을 취소
+        job_id = find(dedup_key)
+        assert queue.cancel_job(job_id)['status'] == 'cancelled'
+        return job_id
+
+    monkeypatch.setattr(queue, 'find_inflight_job', find_then_cancel)
+
+    assert queue.attach_to_inflight_job('hash', 'female', 'best', 'b.mp3') is None
+    assert queue.job_store.list_jobs('attached') == []
+    assert queue.job_store.get_job(primary)['status'] == 'cancelled'
+
+
+def test_cancel_after_attach_promotes_attached_request(queue):
+    primary = _create(queue)
+    attached = queue.attach_to_inflight_job('hash', 'female', 'best', 'b.mp3')['job_id']
+
+    # 취소 확인(연결 없음) 뒤에 연결이 끝난 경우와 같은 상태: 저장소에서 바로 취소
+    assert queue.job_store.cancel_waiting_job(primary)
+    promoted = queue.promote_attached_jobs(primary, queue.job_store.get_job(primary))
+    queue.settle_attached_jobs(primary)
+
+    assert promoted is not None
+    assert queue.job_store.get_job(promoted)['status'] == 'waiting'
+    assert queue.job_store.get_job(attached)['primary_job_id'] == promoted
+    assert queue.get_job_status(attached)['status'] == 'waiting'
@@ -0,0 +1,147 @@
+"""작업 저장소(SQLiteJobStore/MemoryJobStore)의 선점/복구/취소 테스트"""
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from job_store import MemoryJobStore, SQLiteJobStore
+
+
+def _waiting_job(index: int) -> dict:
+    return {'status': 'waiting', 'index': index}
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'jobs.sqlite3')
+
+
+def _set_owner(store: SQLiteJobStore, job_id: str, pid):
+    store._connect().execute('UPDATE jobs SET owner_pid = ? WHERE job_id = ?', (pid, job_id))
+
+
+def _dead_pid() -> int:
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def test_concurrent_claims_from_one_sqlite_file_get_different_jobs(db_path):
+    n_jobs = 40
+    setup = SQLiteJobStore(db_path)
+    for index in range(n_jobs):
+        setup.add_job(f'job-{index}', _waiting_job(index))
+
+    claimed = []
+    claimed_lock = threading.Lock()
+    barrier = threading.Barrier(4)
+
+    def claim_all():
+        # 스레드마다 다른 저장소 인스턴스 (다른 worker 프로세스와 같은 조건: 연결 분리)
+        store = SQLiteJobStore(db_path)
+        barrier.wait()
+        while True:
+            result = store.claim_next_job()
+            if result is None:
+                return
+            with claimed_lock:
+                claimed.append(result[0])
+
+    threads = [threading.Thread(target=claim_all) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(claimed) == n_jobs
+    assert len(set(claimed)) == n_jobs
+    assert setup.count_waiting() == 0
+    assert all(job['status'] == 'processing' for _, job in setup.list_jobs('processing'))
+
+
+def test_claim_uses_choose_and_records_owner_pid(db_path):
+    store = SQLiteJobStore(db_path)
+    for index in range(3):
+        store.add_job(f'job-{index}', _waiting_job(index))
+
+    job_id, job = store.claim_next_job(lambda waiting: waiting[-1][0])
+
+    assert job_id == 'job-2'
+    assert job['status'] == 'processing'
+    owner = store._connect().execute('SELECT owner_pid FROM jobs WHERE job_id = ?', (job_id,)).fetchone()[0]
+    assert owner == os.getpid()
+
+
+def test_recover_jobs_resets_only_dead_or_own_owners(db_path):
+    store = SQLiteJobStore(db_path)
+    for name in ('dead', 'own', 'alive'):
+        store.add_job(name, {'status': 'waiting'})
+        store.claim_next_job()
+    _set_owner(store, 'dead', _dead_pid())
+    _set_owner(store, 'own', os.getpid())
+    _set_owner(store, 'alive', os.getppid())
+
+    assert store.recover_jobs() == 2
+
+    assert store.get_job('dead')['status'] == 'waiting'
+    assert store.get_job('own')['status'] == 'waiting'
+    assert store.get_job('alive')['status'] == 'processing'
+    assert [job_id for job_id, _ in store.list_jobs('waiting')] == ['dead', 'own']
+
+
+@pytest.mark.parametrize('make_store', [MemoryJobStore, None], ids=['memory', 'sqlite'])
+def test_cancel_and_claim_exclude_each_other(make_store, db_path):
+    store = make_store() if make_store else SQLiteJobStore(db_path)
+    store.add_job('first', _waiting_job(0))
+    store.add_job('second', _waiting_job(1))
+
+    # 취소된 작업은 선점되지 않음
+    assert store.cancel_waiting_job('first') is True
+    assert store.claim_next_job()[0] == 'second'
+    # 이미 선점된 작업은 취소되지 않음
+    assert store.cancel_waiting_job('second') is False
+    assert store.get_job('second')['status'] == 'processing'
+    assert store.claim_next_job() is None
+
+
+def test_concurrent_cancel_and_claim_settle_each_job_once(db_path):
+    n_jobs = 30
+    setup = SQLiteJobStore(db_path)
+    for index in range(n_jobs):
+        setup.add_job(f'job-{index}', _waiting_job(index))
+
+    claimed, cancelled = [], []
+    barrier = threading.Barrier(2)
+
+    def claimer():
+        store = SQLiteJobStore(db_path)
+        barrier.wait()
+        while (result := store.claim_next_job()) is not None:
+            claimed.append(result[0])
+
+    def canceller():
+        store = SQLiteJobStore(db_path)
+        barrier.wait()
+        for index in reversed(range(n_jobs)):
+            if store.cancel_waiting_job(f'job-{index}'):
+                cancelled.append(f'job-{index}')
+
+    threads = [threading.Thread(target=claimer), threading.Thread(target=canceller)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not set(claimed) & set(cancelled)
+    assert len(claimed) + len(cancelled) == n_jobs
+
+
+def test_add_job_respects_max_waiting(db_path):
+    for store in (MemoryJobStore(), SQLiteJobStore(db_path)):
+        assert store.add_job('a', _waiting_job(0), max_waiting=2) == 1
+        assert store.add_job('b', _waiting_job(1), max_waiting=2) == 2
+        assert store.add_job('c', _waiting_job(2), max_waiting=2) is None
+        # 대기 중이 아닌 작업은 대기열 제한과 무관
+        assert store.add_job('d', {'status': 'completed'}, max_waiting=2) == 0
@@ -0,0 +1,96 @@
+"""업로드 오디오 헤더 확인(probe_uploaded_audio) 테스트"""
+import random
+from io import BytesIO
+
+import numpy as np
+import pytest
+import soundfile as sf
+from flask import Flask
+from werkzeug.datastructures import FileStorage
+
+from validators import probe_uploaded_audio, _sniff_mp3
+
+
+MP3_FRAME_HEADER = b'\xff\xfb\x90\x64'  # MPEG1 Layer III, 128kbps, 44.1kHz, padding 없음
+MP3_FRAME_LENGTH = 417
+MP3_FRAME_SAMPLES = 1152
+
+
+@pytest.fixture(autouse=True)
+def app_context():
+    with Flask(__name__).app_context():
+        yield
+
+
+def _probe(data: bytes, filename: str):
+    return probe_uploaded_audio(FileStorage(stream=BytesIO(data), filename=filename))
+
+
+def _wav_bytes(seconds: float = 1.0, sr: int = 44100) -> bytes:
+    buffer = BytesIO()
+    sf.write(buffer, np.zeros(int(seconds * sr), dtype=np.float32), sr, format='WAV')
+    return buffer.getvalue()
+
+
+def _id3_tag(size: int) -> bytes:
+    syncsafe = bytes((size >> shift) & 0x7F for shift in (21, 14, 7, 0))
+    return b'ID3\x04\x00\x00' + syncsafe + b'\x00' * size
+
+
+def _garbage(size: int) -> bytes:
+    return random.Random(0).randbytes(size)
+
+
+def _assert_rejected(result):
+    (response, status), error = result
+    assert error is True
+    assert status == 400
+
+
+def test_valid_wav_passes_with_header_info():
+    info, error = _probe(_wav_bytes(), 'song.wav')
+    assert error is None
+    assert info['format'] == 'WAV'
+    assert info['duration'] == pytest.approx(1.0)
+    assert info['samplerate'] == 44100
+
+
+def test_corrupt_wav_is_rejected():
+    data = b'RIFF' + (1000).to_bytes(4, 'little') + b'WAVE' + _garbage(1000)
+    _assert_rejected(_probe(data, 'song.wav'))
+
+
+def test_truncated_wav_is_rejected():
+    _assert_rejected(_probe(_wav_bytes()[:30], 'song.wav'))
+
+
+def test_id3_followed_by_garbage_is_rejected():
+    _assert_rejected(_probe(_id3_tag(100) + _garbage(64 * 1024), 'song.mp3'))
+
+
+def _mp3_frame(payload: bytes = b'') -> bytes:
+    return MP3_FRAME_HEADER + payload + b'\x00' * (MP3_FRAME_LENGTH - len(MP3_FRAME_HEADER) - len(payload))
+
+
+def test_id3_followed_by_mp3_frames_passes():
+    info, error = _probe(_id3_tag(100) + _mp3_frame() * 20, 'song.mp3')
+    assert error is None
+    assert info['format'] == 'MP3'
+    assert info['samplerate'] == 44100
+    assert info['channels'] == 2
+
+
+# 아래 두 테스트는 libsndfile로 열리지 않는 MP3의 대체 경로(_sniff_mp3)를 직접 확인
+def test_cbr_mp3_duration_from_bitrate_and_payload_size():
+    # 128kbps: 오디오 데이터 크기(ID3v2/ID3v1 태그 제외) * 8 / 비트레이트
+    id3v1 = b'TAG' + b'\x00' * 125
+    info = _sniff_mp3(BytesIO(_id3_tag(100) + _mp3_frame() * 200 + id3v1))
+    assert info['format'] == 'MP3'
+    assert info['duration'] == pytest.approx(200 * MP3_FRAME_LENGTH * 8 / 128000)
+
+
+def test_vbr_mp3_duration_from_xing_frame_count():
+    # MPEG1 stereo: side information 32바이트 뒤 Xing 헤더 (flags: 프레임 수 있음)
+    xing = b'\x00' * 32 + b'Xing' + (1).to_bytes(4, 'big') + (5000).to_bytes(4, 'big')
+    info = _sniff_mp3(BytesIO(_id3_tag(100) + _mp3_frame(xing) + _mp3_frame() * 20))
+    assert info['duration'] == pytest.approx(5000 * MP3_FRAME_SAMPLES / 44100)
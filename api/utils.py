@@ -1,5 +1,39 @@
+import multiprocessing
+import wave
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
 import librosa
 import numpy as np
+import soxr
+
+from config import (
+    PITCH_CHUNK_SECONDS,
+    PITCH_CHUNK_OVERLAP_SECONDS,
+    PITCH_CHUNK_WORKERS,
+    PITCH_ANALYSIS_SR,
+    PITCH_FRAME_LENGTH,
+    PITCH_HOP_LENGTH,
+    PITCH_RANGE_BY_VOCAL_TYPE
+)
+from cpu_scheduler import chunk_pool_initializer, get_process_cores
+from progress import report_progress
+
+
+# 음정 분석 파라미터 (결과 캐시 키에도 사용)
+PITCH_FMIN_NOTE = 'C2'        # 최소 주파수 (C2 = 약 65Hz)
+PITCH_FMAX_NOTE = 'C7'        # 최대 주파수 (C7 = 약 2093Hz)
+# vocal_type별 분석 음역 (PITCH_RANGE_BY_VOCAL_TYPE, 가성/고음 여유 포함)
+PITCH_VOCAL_RANGES = {
+    'female': ('E3', 'C6'),   # 약 165Hz ~ 1047Hz
+    'male': ('C2', 'G5')      # 약 65Hz ~ 784Hz
+}
+MIN_VOICED_PROB = 0.1         # 유성음 판정 최소 확률
+MIN_NOTE_DURATION = 0.1       # 최소 노트 길이 (초)
+PYIN_FRAME_LENGTH = PITCH_FRAME_LENGTH  # pyin 프레임 길이 (분석 레이트 기준 샘플)
+PYIN_HOP_LENGTH = PITCH_HOP_LENGTH or PYIN_FRAME_LENGTH // 4  # pyin hop
+
+_chunk_executor = None  # 분할 pyin용 프로세스 풀 (get_chunk_executor에서 생성)
 
 
 def allowed_file(filename, allowed_extensions):
@@ -17,92 +51,443 @@ def allowed_file(filename, allowed_extensions):
            filename.rsplit('.', 1)[1].lower() in allowed_extensions
 
 
-def extract_pitch_info(vocal_file_path: str):
+def extract_pitch_info(vocal_file, vocal_type: str = None):
     """
     오디오 파일에서 음정 정보를 추출
     
     Args:
-        vocal_file_path: 분석할 오디오 파일 경로
+        vocal_file: 분석할 오디오 파일 경로 또는 파일 객체 (BytesIO 등)
+        vocal_type: 보컬 타입 (female/male, 분석 음역 선택용)
+    
+    Returns:
+        list: 음정 정보 리스트 [{"note": "C4", "start_time": 0.5, "duration": 1.2, "end_time": 1.7}, ...]
+    """
+    # 오디오 파일 로드 (분석 레이트 변환은 extract_pitch_info_from_audio에서)
+    y, sr = librosa.load(vocal_file, sr=None)
+
+    return extract_pitch_info_from_audio(y, sr, vocal_type)
+
+
+def load_wav_mono_stream(stream, block_frames: int = 65536):
+    """
+    PCM WAV 스트림을 블록 단위로 읽어 mono float32 신호로 변환
+    (librosa.load(sr=None)와 같은 결과, 원본 바이트 전체를 메모리에 두지 않음)
+    
+    Args:
+        stream: read()가 가능한 WAV 스트림 (seek 불필요)
+        block_frames: 한 번에 읽을 프레임 수
+    
+    Returns:
+        tuple: (y, sr)
+    
+    Raises:
+        wave.Error: PCM WAV가 아닌 경우
+    """
+    with wave.open(stream, 'rb') as wav:
+        channels = wav.getnchannels()
+        sample_width = wav.getsampwidth()
+        sr = wav.getframerate()
+        n_frames = wav.getnframes()
+
+        if sample_width != 2:
+            raise wave.Error(f"unsupported sample width: {sample_width}")
+
+        y = np.empty(n_frames, dtype=np.float32)
+        position = 0
+        while position < n_frames:
+            data = wav.readframes(block_frames)
+            if not data:
+                break
+            block = np.frombuffer(data, dtype='<i2').reshape(-1, channels)
+            block = block.astype(np.float32) / 32768.0
+            y[position:position + len(block)] = block.mean(axis=1)
+            position += len(block)
+
+    return y[:position], sr
+
+
+def analysis_samplerate(sr: int, params: dict) -> int:
+    """음정 분석에 사용할 샘플링 레이트 (analysis_sr이 0이거나 원본보다 높으면 원본 레이트)"""
+    target = params['analysis_sr']
+    return target if 0 < target < sr else sr
+
+
+def to_analysis_rate(y, sr: int, params: dict):
+    """
+    신호를 음정 분석용 샘플링 레이트로 변환
+
+    StreamingPitchTracker의 스트리밍 변환(soxr.ResampleStream)과 같은 결과가 나오도록 soxr 사용
+
+    Returns:
+        tuple: (y, sr)
+    """
+    target = analysis_samplerate(sr, params)
+    if target == sr:
+        return y, sr
+    return soxr.resample(np.asarray(y, dtype=np.float32), sr, target, quality='HQ'), target
+
+
+def extract_pitch_info_from_audio(y, sr, vocal_type: str = None, params: dict = None):
+    """
+    디코딩된 오디오 신호에서 음정 정보를 추출
+    
+    Args:
+        y: 오디오 신호 (mono numpy 배열)
+        sr: 샘플링 레이트
+        vocal_type: 보컬 타입 (female/male, 분석 음역 선택용)
+        params: 음정 분석 파라미터 (None이면 get_pitch_params(vocal_type), 비교 스크립트용)
     
     Returns:
         list: 음정 정보 리스트 [{"note": "C4", "start_time": 0.5, "duration": 1.2, "end_time": 1.7}, ...]
     """
-    # 오디오 파일 로드
-    y, sr = librosa.load(vocal_file_path, sr=None)
+    if params is None:
+        params = get_pitch_params(vocal_type)
+    y, sr = to_analysis_rate(y, sr, params)
+
+    # 피치 추출 (pyin 알고리즘 사용, 긴 음원은 구간별 병렬 실행)
+    if PITCH_CHUNK_SECONDS > 0 and len(y) > PITCH_CHUNK_SECONDS * sr:
+        f0, voiced_flag, voiced_probs = chunked_pyin(y, sr, params=params)
+    else:
+        f0, voiced_flag, voiced_probs = run_pyin(y, sr, params)
+
+    # 프레임을 시간으로 변환
+    times = librosa.frames_to_time(np.arange(len(f0)), sr=sr, hop_length=params['hop_length'])
+
+    return segment_notes(f0, voiced_flag, voiced_probs, times)
+
+
+def run_pyin(y, sr, params: dict = None):
+    """
+    pyin으로 프레임별 피치 추출
+
+    Args:
+        y: 오디오 신호 (mono, 분석 레이트)
+        sr: 샘플링 레이트
+        params: 음정 분석 파라미터 (None이면 기본 음역)
 
-    # 피치 추출 (pyin 알고리즘 사용)
-    f0, voiced_flag, voiced_probs = librosa.pyin(
+    Returns:
+        tuple: (f0, voiced_flag, voiced_probs)
+    """
+    if params is None:
+        params = get_pitch_params()
+    return librosa.pyin(
         y,
-        fmin=librosa.note_to_hz('C2'),  # 최소 주파수 (C2 = 약 65Hz)
-        fmax=librosa.note_to_hz('C7'),  # 최대 주파수 (C7 = 약 2093Hz)
-        sr=sr
+        fmin=librosa.note_to_hz(params['fmin']),
+        fmax=librosa.note_to_hz(params['fmax']),
+        sr=sr,
+        frame_length=params['frame_length'],
+        hop_length=params['hop_length']
     )
 
-    # 프레임을 시간으로 변환
-    times = librosa.frames_to_time(range(len(f0)), sr=sr)
-
-    # 음정 정보를 담을 리스트
-    notes_data = []
-
-    # 현재 처리 중인 노트 정보
-    current_note = None
-    current_start_time = None
-
-    for i, (frequency, time) in enumerate(zip(f0, times)):
-        # 피치가 감지되지 않은 경우 (묵음 또는 노이즈)
-        if (np.isnan(frequency) or
-            voiced_flag[i] == False or
-            voiced_probs[i] < 0.1):
-
-            # 이전에 처리 중이던 노트가 있다면 저장
-            if current_note is not None:
-                notes_data.append({
-                    "note": current_note,
-                    "start_time": round(current_start_time, 3),
-                    "duration": round(time - current_start_time, 3),
-                    "end_time": round(time, 3)
-                })
-                current_note = None
-                current_start_time = None
-            continue
-
-        # 주파수를 음표 표기법으로 변환 (예: C4, D#4)
-        note_name = librosa.hz_to_note(frequency)
-
-        # 새로운 노트 시작
-        if current_note is None:
-            current_note = note_name
-            current_start_time = time
-        # 같은 노트가 계속되는 경우
-        elif current_note == note_name:
-            continue
-        # 다른 노트로 변경된 경우
-        else:
-            # 이전 노트 저장
-            notes_data.append({
-                "note": current_note,
-                "start_time": round(current_start_time, 3),
-                "duration": round(time - current_start_time, 3),
-                "end_time": round(time, 3)
-            })
-            # 새 노트 시작
-            current_note = note_name
-            current_start_time = time
-
-    # 마지막 노트 처리
-    if current_note is not None:
-        final_time = times[-1]
-        notes_data.append({
-            "note": current_note,
-            "start_time": round(current_start_time, 3),
-            "duration": round(final_time - current_start_time, 3),
-            "end_time": round(final_time, 3)
-        })
+
+def _run_pyin_chunk(y_chunk, sr, keep_from: int, keep_to: int, params: dict):
+    """분할 구간 pyin 실행 후 겹친 부분을 잘라낸 프레임만 반환 (프로세스 풀에서 실행)"""
+    f0, voiced_flag, voiced_probs = run_pyin(y_chunk, sr, params)
+    return (
+        f0[keep_from:keep_to],
+        voiced_flag[keep_from:keep_to],
+        voiced_probs[keep_from:keep_to]
+    )
+
+
+def chunked_pyin(y, sr, chunk_seconds: float = PITCH_CHUNK_SECONDS,
+                 overlap_seconds: float = PITCH_CHUNK_OVERLAP_SECONDS, params: dict = None, executor=None):
+    """
+    긴 신호를 겹치는 구간으로 나눠 pyin을 병렬 실행한 뒤 프레임을 이어붙임
+
+    구간 경계는 hop 단위로 고정되어 있어 결과는 항상 같음. 각 구간은 앞뒤로
+    overlap만큼 더 분석한 뒤 가운데(담당 프레임)만 사용하므로, 프레임 패딩과
+    Viterbi 경로 차이는 겹친 부분에서 흡수됨.
+    허용 오차: 전체 실행과 비교해 구간 경계(chunk_seconds 배수 시각) 근처의 노트만
+    시작/끝이 hop 1~2개(기본 44.1kHz에서 약 12~23ms)만큼 달라질 수 있음
+
+    Args:
+        y: 오디오 신호 (mono, 분석 레이트)
+        sr: 샘플링 레이트
+        chunk_seconds: 구간 길이 (초)
+        overlap_seconds: 구간 앞뒤로 겹쳐 분석할 길이 (초)
+        params: 음정 분석 파라미터 (None이면 기본 음역)
+        executor: 구간을 실행할 실행기 (None이면 get_chunk_executor(), 벤치마크용)
+
+    Returns:
+        tuple: (f0, voiced_flag, voiced_probs) - 전체 실행과 같은 프레임 수
+    """
+    if params is None:
+        params = get_pitch_params()
+    hop = params['hop_length']
+    if executor is None:
+        executor = get_chunk_executor()
+
+    chunks = []
+    for seg_start, seg_end, core_start, core_end in plan_pyin_chunks(len(y), sr, chunk_seconds, overlap_seconds, params):
+        # 구간의 i번째 프레임 = 전체의 seg_start + i번째 프레임
+        y_chunk = y[seg_start * hop:min(len(y), seg_end * hop)]
+        chunks.append((y_chunk, sr, core_start - seg_start, core_end - seg_start, params))
+
+    if executor is None:
+        # 배정된 코어가 1개면 하위 프로세스 없이 현재 워커에서 차례로 실행 (결과는 같음)
+        results = []
+        for done, chunk in enumerate(chunks, 1):
+            results.append(_run_pyin_chunk(*chunk))
+            report_progress(done / len(chunks))
+        return tuple(np.concatenate(parts) for parts in zip(*results))
+
+    futures = [executor.submit(_run_pyin_chunk, *chunk) for chunk in chunks]
+    try:
+        for done, _ in enumerate(as_completed(futures), 1):
+            report_progress(done / len(futures))
+    except BaseException:
+        # 작업 취소 시 아직 시작하지 않은 구간은 실행하지 않음
+        for future in futures:
+            future.cancel()
+        raise
+
+    results = [future.result() for future in futures]
+    return tuple(np.concatenate(parts) for parts in zip(*results))
+
+
+def get_chunk_executor(offload: bool = False):
+    """
+    분할 pyin용 프로세스 풀 반환 (프로세스마다 최초 호출 시 생성)
+
+    구간 워커 수는 PITCH_CHUNK_WORKERS와 현재 프로세스의 음정 분석 코어 몫 중 작은 값이라
+    전체 구간 워커 수가 음정 분석 코어 몫(PITCH_WORKERS x PITCH_THREADS)을 넘지 않음
+    구간 워커는 배정된 코어만 하나씩 나눠 사용 (다른 워커 코어 침범 방지)
+
+    Args:
+        offload: True면 구간 워커가 1개여도 풀 생성 (분리 워커가 음정 분석을 음정 분석 코어로 넘길 때)
+
+    Returns:
+        ProcessPoolExecutor 또는 구간 워커가 1개 이하면 None (현재 워커에서 실행)
+    """
+    global _chunk_executor
+
+    if _chunk_executor is None:
+        cores = get_process_cores('pitch')
+        n_workers = min(PITCH_CHUNK_WORKERS, len(cores))
+        if n_workers <= 1 and not offload:
+            return None
+        n_workers = max(1, n_workers)
+        mp_context = multiprocessing.get_context('spawn')
+        pool_init, pool_initargs = chunk_pool_initializer(mp_context, cores)
+        _chunk_executor = ProcessPoolExecutor(
+            max_workers=n_workers,
+            mp_context=mp_context,
+            initializer=pool_init,
+            initargs=pool_initargs
+        )
+    return _chunk_executor
+
+
+def plan_pyin_chunks(n_samples: int, sr: int, chunk_seconds: float, overlap_seconds: float,
+                     params: dict = None) -> list:
+    """
+    분할 pyin 구간 계획 (프레임 단위)
+
+    Args:
+        n_samples: 전체 신호 길이 (분석 레이트 샘플)
+        sr: 샘플링 레이트
+        chunk_seconds: 구간 길이 (초)
+        overlap_seconds: 구간 앞뒤로 겹쳐 분석할 길이 (초)
+        params: 음정 분석 파라미터 (frame_length, hop_length 사용, None이면 기본값)
+
+    Returns:
+        list: [(seg_start, seg_end, core_start, core_end), ...]
+              seg: 실제 분석할 프레임 범위, core: 결과로 사용할 프레임 범위
+    """
+    if params is None:
+        params = get_pitch_params()
+    hop = params['hop_length']
+    n_frames = 1 + n_samples // hop  # center=True 기준 전체 프레임 수
+    chunk_frames = max(1, int(chunk_seconds * sr) // hop)
+    # 프레임 패딩 영향(frame_length/2)보다 길게 겹침
+    overlap_frames = max(int(overlap_seconds * sr) // hop, params['frame_length'] // hop)
+
+    plan = []
+    for core_start in range(0, n_frames, chunk_frames):
+        core_end = min(core_start + chunk_frames, n_frames)
+        plan.append((
+            max(0, core_start - overlap_frames),
+            min(core_end + overlap_frames, n_frames),
+            core_start,
+            core_end
+        ))
+    return plan
+
+
+class StreamingPitchTracker:
+    """
+    순서대로 들어오는 신호 블록에 대해 구간별 pyin을 미리 실행하는 분석기
+
+    chunked_pyin과 같은 구간 계획을 사용하므로 결과도 같음. 구간에 필요한 샘플이
+    모두 들어오면 바로 실행기에 제출하고, 더 이상 필요 없는 앞부분 샘플은 버림
+    분석 레이트가 원본보다 낮으면 블록을 스트리밍으로 변환 (전체 변환과 같은 결과)
+    """
+
+    def __init__(self, n_samples: int, sr: int, executor, chunk_seconds: float,
+                 overlap_seconds: float = PITCH_CHUNK_OVERLAP_SECONDS, vocal_type: str = None):
+        """
+        Args:
+            n_samples: 전체 신호 길이 (원본 레이트 샘플)
+            sr: 들어오는 신호의 샘플링 레이트
+            executor: pyin 구간을 실행할 실행기
+            chunk_seconds: 구간 길이 (초)
+            overlap_seconds: 구간 앞뒤로 겹쳐 분석할 길이 (초)
+            vocal_type: 보컬 타입 (female/male, 분석 음역 선택용)
+        """
+        self.params = get_pitch_params(vocal_type)
+        self.sr = analysis_samplerate(sr, self.params)
+        self.resampler = None
+        if self.sr != sr:
+            self.resampler = soxr.ResampleStream(sr, self.sr, 1, dtype='float32', quality='HQ')
+            n_samples = round(n_samples * self.sr / sr)
+        self.n_samples = n_samples
+        self.hop = self.params['hop_length']
+        self.executor = executor
+        self.plan = deque(plan_pyin_chunks(n_samples, self.sr, chunk_seconds, overlap_seconds, self.params))
+        self.buffer = np.empty(0, dtype=np.float32)
+        self.buffer_start = 0  # buffer[0]의 전체 신호 기준 샘플 위치
+        self.futures = []
+
+    def _chunk_range(self, chunk):
+        seg_start, seg_end = chunk[0], chunk[1]
+        return seg_start * self.hop, min(self.n_samples, seg_end * self.hop)
+
+    def feed(self, block, last: bool = False):
+        """다음 신호 블록 추가 (mono), 준비된 구간은 바로 제출"""
+        block = np.asarray(block, dtype=np.float32)
+        if self.resampler is not None:
+            block = self.resampler.resample_chunk(block, last=last)
+        self.buffer = np.concatenate([self.buffer, block])
+        received = self.buffer_start + len(self.buffer)
+
+        while self.plan and self._chunk_range(self.plan[0])[1] <= received:
+            seg_start, seg_end, core_start, core_end = self.plan.popleft()
+            start, end = self._chunk_range((seg_start, seg_end))
+            y_chunk = self.buffer[start - self.buffer_start:end - self.buffer_start]
+            self.futures.append(self.executor.submit(
+                _run_pyin_chunk,
+                y_chunk,
+                self.sr,
+                core_start - seg_start,
+                core_end - seg_start,
+                self.params
+            ))
+
+            # 다음 구간 시작 전 샘플은 더 이상 필요 없음
+            if self.plan:
+                drop = self._chunk_range(self.plan[0])[0] - self.buffer_start
+                if drop > 0:
+                    self.buffer = self.buffer[drop:]
+                    self.buffer_start += drop
+
+    def finish(self) -> list:
+        """
+        모든 구간 결과를 모아 노트로 변환
+
+        Returns:
+            list: 음정 정보 리스트 (extract_pitch_info_from_audio와 같은 형식)
+        """
+        if self.resampler is not None:
+            # 변환기에 남은 샘플 내보내기
+            self.feed(np.empty(0, dtype=np.float32), last=True)
+        if self.plan:
+            raise ValueError(f"신호가 부족하여 음정 분석을 마칠 수 없습니다 ({len(self.plan)}개 구간 남음)")
+
+        results = [future.result() for future in self.futures]
+        f0, voiced_flag, voiced_probs = (np.concatenate(parts) for parts in zip(*results))
+        times = librosa.frames_to_time(np.arange(len(f0)), sr=self.sr, hop_length=self.hop)
+        return segment_notes(f0, voiced_flag, voiced_probs, times)
+
+
+def segment_notes(f0, voiced_flag, voiced_probs, times):
+    """
+    프레임별 피치를 노트 구간으로 묶기 (NumPy 벡터 연산)
+
+    같은 음(반올림한 MIDI 번호)이 이어지는 유성음 프레임을 하나의 노트로 보고,
+    무성음 프레임이나 다른 음이 나오는 프레임의 시각을 노트 끝으로 사용
+    (마지막 프레임까지 이어지는 노트는 마지막 프레임 시각에서 끝남)
+
+    Args:
+        f0: 프레임별 기본 주파수 (Hz, 무성음은 NaN)
+        voiced_flag: 프레임별 유성음 여부
+        voiced_probs: 프레임별 유성음 확률
+        times: 프레임별 시각 (초)
+
+    Returns:
+        list: 음정 정보 리스트 [{"note": "C4", "start_time": 0.5, "duration": 1.2, "end_time": 1.7}, ...]
+    """
+    n_frames = len(f0)
+    if n_frames == 0:
+        return []
+
+    # 피치가 감지된 프레임 (묵음 또는 노이즈 제외)
+    voiced = ~np.isnan(f0) & np.asarray(voiced_flag, dtype=bool) & (voiced_probs >= MIN_VOICED_PROB)
+
+    # 프레임별 MIDI 번호 (음 이름과 1:1 대응), 무성음은 -1
+    midi = np.full(n_frames, -1.0)
+    midi[voiced] = np.round(librosa.hz_to_midi(f0[voiced]))
+
+    # 값이 바뀌는 지점으로 구간 나누기 (양 끝에 무성음을 덧붙여 경계 포함)
+    padded = np.concatenate(([-1.0], midi, [-1.0]))
+    boundaries = np.flatnonzero(np.diff(padded) != 0)
+    starts = boundaries[:-1]
+    ends = boundaries[1:]
+
+    # 유성음 구간만 노트로 사용
+    is_note = midi[starts] != -1
+    starts = starts[is_note]
+    ends = ends[is_note]
+
+    # 끝 시각: 다음 구간의 첫 프레임 (마지막 프레임까지 이어지면 마지막 프레임)
+    start_times = times[starts]
+    end_times = times[np.minimum(ends, n_frames - 1)]
+
+    start_rounded = np.round(start_times, 3)
+    durations = np.round(end_times - start_times, 3)
+    end_rounded = np.round(end_times, 3)
 
     # 너무 짧은 노트 필터링 (0.1초 미만)
-    notes_data = [note for note in notes_data if note["duration"] >= 0.1]
+    keep = durations >= MIN_NOTE_DURATION
 
-    return notes_data
+    # 최종 노트에 대해서만 음 이름 생성
+    note_names = librosa.midi_to_note(midi[starts[keep]]) if keep.any() else []
+
+    return [
+        {
+            "note": str(note),
+            "start_time": start_time,
+            "duration": duration,
+            "end_time": end_time
+        }
+        for note, start_time, duration, end_time in zip(
+            note_names,
+            start_rounded[keep].tolist(),
+            durations[keep].tolist(),
+            end_rounded[keep].tolist()
+        )
+    ]
+
+
+def get_pitch_params(vocal_type: str = None):
+    """
+    음정 분석 파라미터 반환 (분석에 사용하고 결과 캐시 키에도 포함)
+
+    Args:
+        vocal_type: 보컬 타입 (PITCH_RANGE_BY_VOCAL_TYPE이면 음역 선택에 사용)
+    """
+    fmin, fmax = PITCH_FMIN_NOTE, PITCH_FMAX_NOTE
+    if PITCH_RANGE_BY_VOCAL_TYPE and vocal_type in PITCH_VOCAL_RANGES:
+        fmin, fmax = PITCH_VOCAL_RANGES[vocal_type]
+    return {
+        'fmin': fmin,
+        'fmax': fmax,
+        'analysis_sr': PITCH_ANALYSIS_SR,
+        'frame_length': PYIN_FRAME_LENGTH,
+        'hop_length': PYIN_HOP_LENGTH,
+        'min_voiced_prob': MIN_VOICED_PROB,
+        'min_note_duration': MIN_NOTE_DURATION
+    }
 
 
 def determine_clef(notes_data):
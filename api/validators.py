@@ -3,6 +3,16 @@ from utils import allowed_file
 from config import ALLOWED_EXTENSIONS
 
 
+SNIFF_BYTES = 64 * 1024  # libsndfile로 열 수 없을 때 MP3 프레임 확인용으로 읽을 크기 (ID3 태그 뒤부터)
+ID3_HEADER_BYTES = 10
+ID3V1_TAG_BYTES = 128
+
+# MP3(MPEG Layer III) 프레임 헤더 해석용 표 (kbps, Hz)
+MPEG1_LAYER3_BITRATES = (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320)
+MPEG2_LAYER3_BITRATES = (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160)
+MPEG_SAMPLERATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
 def validate_uploaded_file(file_key='music_file'):
     """
     업로드된 파일의 유효성을 검사
@@ -39,3 +49,159 @@ def validate_uploaded_file(file_key='music_file'):
     # 유효성 검사 통과
     return file, None
 
+
+def probe_uploaded_audio(file):
+    """
+    업로드된 오디오의 헤더만 읽어 길이/샘플링 레이트/채널/코덱 확인 (전체 디코딩 없음)
+
+    libsndfile로 열리면 헤더 정보를 사용하고, 열리지 않으면 MP3(ID3 태그나 다른 데이터가 앞에 붙은 경우 등)만
+    유효한 프레임 헤더가 연속 두 개 있는지 확인하여 ffmpeg 디코딩에 맡김 (길이는 프레임 헤더로 추정)
+    libsndfile로 열리지 않는 WAV/FLAC/OGG와 그 외 파일은 대기열에 넣기 전에 거절
+
+    Args:
+        file: Flask request.files에서 받은 파일 객체
+
+    Returns:
+        tuple: (audio_info, error_response)
+            - 확인 통과: ({'format', 'codec', 'duration', 'samplerate', 'channels'}, None)
+              (MP3 프레임만 확인한 경우 duration은 추정값)
+            - 확인 실패: (error_response, True)
+    """
+    import soundfile as sf  # librosa 의존성으로 설치됨
+
+    stream = file.stream
+    try:
+        info = sf.info(stream)
+    except (sf.LibsndfileError, RuntimeError):
+        audio_info = _sniff_mp3(stream)
+        if audio_info is None:
+            return (jsonify({
+                'message': '오디오 파일을 읽을 수 없습니다. 손상되었거나 지원하지 않는 형식입니다.',
+            }), 400), True
+        return audio_info, None
+    finally:
+        stream.seek(0)
+
+    if info.samplerate <= 0 or info.channels <= 0 or info.frames <= 0:
+        return (jsonify({
+            'message': '오디오 데이터가 비어있습니다.',
+        }), 400), True
+
+    return {
+        'format': info.format,
+        'codec': info.subtype,
+        'duration': info.frames / info.samplerate,
+        'samplerate': info.samplerate,
+        'channels': info.channels
+    }, None
+
+
+def _sniff_mp3(stream):
+    """
+    libsndfile로 열 수 없는 파일이 MP3인지 확인하고 첫 프레임 헤더로 오디오 정보 추정
+
+    앞의 ID3v2 태그는 크기만큼 건너뛰고, 그 뒤에서 유효한 프레임 헤더가
+    프레임 길이 간격으로 연속 두 번 나와야 MP3로 인정 (ID3 태그만 있는 파일은 거절)
+    길이는 첫 프레임의 Xing/Info 또는 VBRI 헤더에 프레임 수가 있으면 그 값으로,
+    없으면 고정 비트레이트로 보고 오디오 데이터 크기(태그 제외) / 비트레이트로 계산
+
+    Returns:
+        dict: {'format', 'codec', 'duration', 'samplerate', 'channels'} 또는 MP3가 아니면 None
+    """
+    stream.seek(0, 2)
+    file_size = stream.tell()
+    stream.seek(0)
+    header = stream.read(ID3_HEADER_BYTES)
+    offset = 0
+    if header[:3] == b'ID3' and len(header) == ID3_HEADER_BYTES:
+        # 태그 크기: 7비트씩 나눠 저장된 4바이트 (헤더 10바이트 제외, footer 플래그면 10바이트 추가)
+        size = 0
+        for b in header[6:10]:
+            size = (size << 7) | (b & 0x7F)
+        footer = ID3_HEADER_BYTES if header[5] & 0x10 else 0
+        offset = ID3_HEADER_BYTES + size + footer
+
+    # 끝에 붙은 ID3v1 태그(128바이트)는 오디오 데이터에서 제외
+    end = file_size
+    if file_size - offset >= ID3V1_TAG_BYTES:
+        stream.seek(file_size - ID3V1_TAG_BYTES)
+        if stream.read(3) == b'TAG':
+            end -= ID3V1_TAG_BYTES
+
+    stream.seek(offset)
+    data = stream.read(SNIFF_BYTES)
+    for i in range(len(data) - 4):
+        frame = _mp3_frame_header(data, i)
+        if frame is None:
+            continue
+        j = i + frame['length']
+        if j + 4 <= len(data) and _mp3_frame_header(data, j) and _same_mp3_stream(data, i, j):
+            n_frames = _mp3_vbr_frame_count(data, i, frame)
+            if n_frames:
+                duration = n_frames * frame['samples'] / frame['samplerate']
+            else:
+                duration = (end - offset - i) * 8 / (frame['bitrate'] * 1000)
+            return {
+                'format': 'MP3',
+                'codec': 'MPEG_LAYER_III',
+                'duration': duration,
+                'samplerate': frame['samplerate'],
+                'channels': frame['channels']
+            }
+    return None
+
+
+def _same_mp3_stream(data: bytes, i: int, j: int) -> bool:
+    """두 프레임 헤더의 MPEG 버전/레이어/샘플링 레이트가 같은지 (우연히 맞은 바이트 배제)"""
+    return data[i + 1] & 0xFE == data[j + 1] & 0xFE and (data[i + 2] >> 2) & 0x3 == (data[j + 2] >> 2) & 0x3
+
+
+def _mp3_frame_header(data: bytes, i: int):
+    """
+    i 위치가 MP3 프레임 헤더면 헤더 정보, 아니면 None
+
+    Returns:
+        dict: {'length': 프레임 길이(바이트), 'bitrate': kbps, 'samplerate', 'channels',
+               'samples': 프레임당 샘플 수, 'side_info': side information 길이(바이트)}
+    """
+    if data[i] != 0xFF or data[i + 1] & 0xE0 != 0xE0:
+        return None
+    version = (data[i + 1] >> 3) & 0x3  # 3: MPEG1, 2: MPEG2, 0: MPEG2.5
+    layer = (data[i + 1] >> 1) & 0x3    # 1: Layer III
+    bitrate_index = data[i + 2] >> 4
+    samplerate_index = (data[i + 2] >> 2) & 0x3
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or samplerate_index == 3:
+        return None
+
+    padding = (data[i + 2] >> 1) & 0x1
+    mono = data[i + 3] >> 6 == 3
+    bitrates = MPEG1_LAYER3_BITRATES if version == 3 else MPEG2_LAYER3_BITRATES
+    bitrate = bitrates[bitrate_index]
+    samplerate = MPEG_SAMPLERATES[version][samplerate_index]
+    if version == 3:
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+    return {
+        'length': (144 if version == 3 else 72) * bitrate * 1000 // samplerate + padding,
+        'bitrate': bitrate,
+        'samplerate': samplerate,
+        'channels': 1 if mono else 2,
+        'samples': 1152 if version == 3 else 576,
+        'side_info': side_info
+    }
+
+
+def _mp3_vbr_frame_count(data: bytes, i: int, frame: dict) -> int:
+    """첫 프레임의 Xing/Info 또는 VBRI 헤더에 기록된 전체 프레임 수 (없으면 0)"""
+    xing = i + 4 + frame['side_info']
+    if data[xing:xing + 4] in (b'Xing', b'Info') and len(data) >= xing + 12:
+        flags = int.from_bytes(data[xing + 4:xing + 8], 'big')
+        if flags & 0x1:
+            return int.from_bytes(data[xing + 8:xing + 12], 'big')
+
+    # VBRI 헤더는 side information 길이와 관계없이 프레임 헤더 뒤 32바이트 위치
+    vbri = i + 4 + 32
+    if data[vbri:vbri + 4] == b'VBRI' and len(data) >= vbri + 18:
+        return int.from_bytes(data[vbri + 14:vbri + 18], 'big')
+    return 0
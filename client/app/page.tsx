@@ -1,12 +1,30 @@
 "use client";
 
-import { useState, useRef, DragEvent, ChangeEvent, useCallback } from "react";
+import { useState, useRef, useEffect, DragEvent, ChangeEvent, useCallback } from "react";
 import { useRouter } from "next/navigation";
 import { API_BASE_URL, MAX_FILE_SIZE_MB, MAX_FILE_SIZE, AUDIO_FILE_EXTENSIONS } from "./constants";
 import UploadingModal from "./components/UploadingModal";
 
-// Polling 간격 (3초)
-const POLLING_INTERVAL = 3000;
+// long-poll 요청당 최대 대기 시간 (초, 서버 JOB_LONG_POLL_MAX_SECONDS 이하)
+const LONG_POLL_WAIT = 25;
+
+interface JobStatus {
+  status: string;
+  state?: string;
+  position?: number;
+  message?: string;
+  progress?: number;
+  eta_seconds?: number;
+  error?: string;
+  result?: unknown;
+}
+
+// 남은 시간 표시 (예: "약 3분 남음")
+const formatEta = (seconds?: number): string => {
+  if (seconds === undefined || seconds === null) return "";
+  if (seconds < 60) return "1분 이내 완료 예정";
+  return `약 ${Math.ceil(seconds / 60)}분 남음`;
+};
 
 export default function Home() {
   const router = useRouter();
@@ -18,52 +36,123 @@ export default function Home() {
   const [isGuideOpen, setIsGuideOpen] = useState(false);
   const [statusMessage, setStatusMessage] = useState<string>("잠시만 기다려주세요...");
   const fileInputRef = useRef<HTMLInputElement>(null);
+  // 진행 중인 작업 ID (페이지를 떠나면 취소 요청)
+  const activeJobRef = useRef<string | null>(null);
+
+  useEffect(() => {
+    const cancelActiveJob = () => {
+      if (!activeJobRef.current) return;
+      // 페이지가 닫혀도 요청이 전송되도록 keepalive 사용
+      fetch(`${API_BASE_URL}/jobs/${activeJobRef.current}`, { method: "DELETE", keepalive: true });
+      activeJobRef.current = null;
+    };
+    window.addEventListener("pagehide", cancelActiveJob);
+    return () => window.removeEventListener("pagehide", cancelActiveJob);
+  }, []);
+
+  // 작업 상태 반영 (완료/실패/취소면 true 반환)
+  const handleJobStatus = useCallback((data: JobStatus): boolean => {
+    if (["completed", "failed", "cancelled"].includes(data.status)) {
+      activeJobRef.current = null;
+    }
+
+    switch (data.status) {
+      case "waiting": {
+        const eta = formatEta(data.eta_seconds);
+        setStatusMessage(`${data.message || `현재 대기 인원 중 ${data.position}번째입니다.`}${eta ? ` (${eta})` : ""}`);
+        return false;
+      }
+
+      case "processing": {
+        const eta = formatEta(data.eta_seconds);
+        const percent = data.progress !== undefined ? `${Math.round(data.progress * 100)}%` : "";
+        const detail = [percent, eta].filter(Boolean).join(", ");
+        setStatusMessage(`${data.message || "악보 분석 중입니다..."}${detail ? ` (${detail})` : ""}`);
+        return false;
+      }
+
+      case "completed":
+        // 완료 - 결과 저장하고 페이지 이동
+        sessionStorage.setItem("sheetMusicData", JSON.stringify(data.result));
+        router.push("/sheet-music");
+        return true;
+
+      case "failed":
+        // 실패
+        setErrorMessage(data.error || "악보 변환에 실패했습니다.");
+        setIsUploading(false);
+        return true;
+
+      case "cancelled":
+        setErrorMessage(data.message || "작업이 취소되었습니다.");
+        setIsUploading(false);
+        return true;
+
+      default:
+        throw new Error("알 수 없는 상태입니다.");
+    }
+  }, [router]);
 
-  // 작업 상태 polling
-  const pollJobStatus = useCallback(async (jobId: string) => {
+  // 작업 상태 long-poll (상태가 바뀌면 서버가 바로 응답, SSE를 쓸 수 없을 때 사용)
+  const pollJobStatus = useCallback(async (jobId: string, state?: string) => {
     try {
-      const response = await fetch(`${API_BASE_URL}/jobs/${jobId}/status`);
+      const params = state ? `?wait=${LONG_POLL_WAIT}&state=${encodeURIComponent(state)}` : "";
+      const response = await fetch(`${API_BASE_URL}/jobs/${jobId}/status${params}`);
       const data = await response.json();
 
+      if (response.status === 503) {
+        // 서버의 대기 연결이 가득 참 - Retry-After 후 같은 상태로 다시 대기
+        const retryAfter = Number(response.headers.get("Retry-After")) || 5;
+        setTimeout(() => pollJobStatus(jobId, state), retryAfter * 1000);
+        return;
+      }
+
       if (!response.ok) {
         throw new Error(data.error || "상태 조회에 실패했습니다.");
       }
 
-      // 상태에 따른 처리
-      switch (data.status) {
-        case "waiting":
-          setStatusMessage(data.message || `현재 대기 인원 중 ${data.position}번째입니다.`);
-          // 계속 polling
-          setTimeout(() => pollJobStatus(jobId), POLLING_INTERVAL);
-          break;
-
-        case "processing":
-          setStatusMessage(data.message || "악보 분석 중입니다...");
-          // 계속 polling
-          setTimeout(() => pollJobStatus(jobId), POLLING_INTERVAL);
-          break;
-
-        case "completed":
-          // 완료 - 결과 저장하고 페이지 이동
-          sessionStorage.setItem("sheetMusicData", JSON.stringify(data.result));
-          router.push("/sheet-music");
-          break;
-
-        case "failed":
-          // 실패
-          setErrorMessage(data.error || "악보 변환에 실패했습니다.");
-          setIsUploading(false);
-          break;
-
-        default:
-          throw new Error("알 수 없는 상태입니다.");
+      if (!handleJobStatus(data)) {
+        // 바뀐 상태를 기준으로 계속 대기
+        pollJobStatus(jobId, data.state);
       }
     } catch (error) {
       console.error("Polling error:", error);
       setErrorMessage(error instanceof Error ? error.message : "상태 조회 중 오류가 발생했습니다.");
       setIsUploading(false);
     }
-  }, [router]);
+  }, [handleJobStatus]);
+
+  // 작업 상태 구독 (SSE, 연결할 수 없으면 long-poll로 전환)
+  const watchJobStatus = useCallback((jobId: string) => {
+    activeJobRef.current = jobId;
+
+    if (typeof EventSource === "undefined") {
+      pollJobStatus(jobId);
+      return;
+    }
+
+    const events = new EventSource(`${API_BASE_URL}/jobs/${jobId}/events`);
+
+    events.addEventListener("status", (event) => {
+      try {
+        if (handleJobStatus(JSON.parse((event as MessageEvent).data))) {
+          events.close();
+        }
+      } catch (error) {
+        events.close();
+        console.error("Status event error:", error);
+        setErrorMessage(error instanceof Error ? error.message : "상태 조회 중 오류가 발생했습니다.");
+        setIsUploading(false);
+      }
+    });
+
+    events.onerror = () => {
+      // 연결이 끊기면 브라우저가 자동 재연결, 재연결도 불가능하면(CLOSED) long-poll로 전환
+      if (events.readyState === EventSource.CLOSED) {
+        pollJobStatus(jobId);
+      }
+    };
+  }, [handleJobStatus, pollJobStatus]);
   
   const isAudioFile = (file: File): boolean => {
     const fileName = file.name.toLowerCase();
@@ -171,9 +260,9 @@ export default function Home() {
       const data = await response.json();
 
       if (response.status === 202) {
-        // 작업이 대기열에 추가됨 - polling 시작
+        // 작업이 대기열에 추가됨 - 상태 구독 시작
         setStatusMessage(data.message || "대기열에 추가되었습니다.");
-        pollJobStatus(data.job_id);
+        watchJobStatus(data.job_id);
       } else if (response.status === 503) {
         // 대기열 가득 참
         setErrorMessage(data.message || "현재 대기열이 가득 찼습니다. 잠시 후 다시 시도해주세요.");